@@ -0,0 +1,233 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import hashlib
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AnyMessage
+from prometheus_client import Counter
+from dotenv import load_dotenv
+from tools.rag.connect import kedb_version
+from tools.http_client import http_client_kwargs
+
+load_dotenv()
+
+# ---- Env config ----
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", 0.92))
+ANSWER_CACHE_TTL_SEC = float(os.getenv("ANSWER_CACHE_TTL_SEC", 3600))
+ANSWER_CACHE_MAX_SIZE = int(os.getenv("ANSWER_CACHE_MAX_SIZE", 512))
+# How long a read of the KEDB version is trusted; a re-ingestion shows up this late
+ANSWER_CACHE_VERSION_CHECK_SEC = float(os.getenv("ANSWER_CACHE_VERSION_CHECK_SEC", 5))
+# Tools an answer may depend on and still be replayed: read-only and not tied
+# to the live state of the machine (metrics answers go stale within seconds)
+ANSWER_CACHE_TOOLS = {"query_kedb"}
+
+ANSWER_CACHE_REQUESTS = Counter(
+    "agent_answer_cache_requests",
+    "Questions looked up in the semantic answer cache",
+    ["result"],
+)
+
+class CachedAnswer(NamedTuple):
+    question: str
+    answer: str
+    expires_at: float
+    context: str
+
+def conversation_key(messages: Iterable[AnyMessage]) -> str:
+    """
+    Fingerprint of the conversation before a question, "" when there is none.
+
+    "And on the other host?" means something else in every thread, so an
+    answer is only replayed after the same preceding conversation.
+    """
+    digest = hashlib.sha256()
+    empty = True
+    for message in messages:
+        digest.update(f"{message.type}\0{message.text()}\0".encode())
+        empty = False
+    return "" if empty else digest.hexdigest()
+
+class SemanticAnswerCache:
+    """
+    Answers to earlier questions, matched by embedding similarity.
+
+    A question whose cosine similarity with a stored one reaches `threshold`
+    gets the stored answer back, provided both followed the same conversation
+    (see `conversation_key`). Entries expire after `ttl` seconds, the least
+    recently used ones are evicted beyond `max_size`, and everything is
+    dropped when `version()` changes (the KEDB was re-ingested); it is read
+    at most every `version_ttl` seconds.
+
+    The embedding of a question that missed is kept until its answer is
+    stored or discarded, so storing it does not embed the question again.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL_SEC,
+        max_size: int = ANSWER_CACHE_MAX_SIZE,
+        cacheable_tools: Iterable[str] = ANSWER_CACHE_TOOLS,
+        version: Optional[Callable[[], Any]] = kedb_version,
+        version_ttl: float = ANSWER_CACHE_VERSION_CHECK_SEC,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cacheable_tools = set(cacheable_tools)
+        self.version = version
+        self.version_ttl = version_ttl
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._vectors: Dict[int, np.ndarray] = {}
+        # Embeddings of questions that missed, by (question, context), awaiting their answer
+        self._pending: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._ids = itertools.count()
+        # Stacked vectors and contexts of all entries, rebuilt lazily after a change
+        self._matrix: Optional[Tuple[List[int], np.ndarray, np.ndarray]] = None
+        self._version = version() if version else None
+        self._version_checked_at = time.monotonic()
+        self._hits = 0
+        self._misses = 0
+
+    async def lookup(self, question: str, context: str = "") -> Optional[AIMessage]:
+        """Return the cached answer to the question asked after `context`, if any"""
+        self._check_version()
+        try:
+            vector = self._normalize(await self.embeddings.aembed_query(question))
+        except Exception as e:
+            logger.warning(f"Answer cache lookup skipped, embedding failed: {e}")
+            return None
+
+        match = self._best_match(vector, context)
+        if match is None:
+            self._record("miss")
+            self._pending[(question, context)] = vector
+            while len(self._pending) > self.max_size:
+                self._pending.popitem(last=False)
+            return None
+
+        entry_id, similarity = match
+        entry = self._entries[entry_id]
+        self._entries.move_to_end(entry_id)
+        self._record("hit")
+        logger.info(f"Answer cache hit ({similarity:.3f}) for '{question[:50]}' ~ '{entry.question[:50]}'")
+        return AIMessage(
+            content=entry.answer,
+            response_metadata={"answer_cache": {"similarity": similarity, "question": entry.question}},
+        )
+
+    def store(self, question: str, answer: str, context: str = ""):
+        """Store the answer to a question that missed; one not looked up here is skipped"""
+        vector = self._pending.pop((question, context), None)
+        if vector is None:
+            return
+        entry_id = next(self._ids)
+        self._entries[entry_id] = CachedAnswer(question, answer, time.monotonic() + self.ttl, context)
+        self._vectors[entry_id] = vector
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            del self._vectors[evicted]
+        self._matrix = None
+
+    def discard(self, question: str, context: str = ""):
+        """Forget a question that missed and whose answer may not be replayed"""
+        self._pending.pop((question, context), None)
+
+    def cacheable(self, messages: Iterable[AnyMessage]) -> bool:
+        """Whether the messages of a turn only used tools whose answers may be replayed"""
+        for message in messages:
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                if tool_call["name"] not in self.cacheable_tools:
+                    return False
+        return True
+
+    def invalidate(self):
+        # Answers still being produced may already be stale; they are not stored
+        self._pending.clear()
+        self._entries.clear()
+        self._vectors.clear()
+        self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "threshold": self.threshold,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / total if total else 0.0,
+        }
+
+    def _best_match(self, vector: np.ndarray, context: str) -> Optional[Tuple[int, float]]:
+        self._expire()
+        if not self._entries:
+            return None
+        if self._matrix is None:
+            ids = list(self._entries)
+            self._matrix = (
+                ids,
+                np.stack([self._vectors[i] for i in ids]),
+                np.array([self._entries[i].context for i in ids]),
+            )
+        ids, matrix, contexts = self._matrix
+        similarities = np.where(contexts == context, matrix @ vector, -np.inf)
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            return None
+        return ids[best], similarity
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [i for i, entry in self._entries.items() if entry.expires_at <= now]
+        for entry_id in expired:
+            del self._entries[entry_id]
+            del self._vectors[entry_id]
+        if expired:
+            self._matrix = None
+
+    def _check_version(self):
+        if self.version is None:
+            return
+        # The version is a file read; not one on every message
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_ttl:
+            return
+        self._version_checked_at = now
+        version = self.version()
+        if version != self._version:
+            logger.info(f"KEDB version changed ({self._version} -> {version}), dropping cached answers")
+            self.invalidate()
+            self._version = version
+
+    def _record(self, result: str):
+        if result == "hit":
+            self._hits += 1
+        else:
+            self._misses += 1
+        ANSWER_CACHE_REQUESTS.labels(result=result).inc()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+def init_answer_cache(embeddings: Optional[Embeddings] = None) -> SemanticAnswerCache:
+    """Create the answer cache, embedding questions like the KEDB does by default."""
+    if embeddings is None:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(model="text-embedding-3-small", **http_client_kwargs())
+    return SemanticAnswerCache(embeddings=embeddings)
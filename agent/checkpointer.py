@@ -0,0 +1,444 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+from loguru import logger
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ---- Env config ----
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "memory")
+CHECKPOINT_DB_PATH = os.getenv(
+    "CHECKPOINT_DB_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "checkpoints.sqlite"),
+)
+# Number of checkpoints kept per thread and namespace, 0 keeps everything
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", 20))
+CHECKPOINT_COMPACTION_INTERVAL_SEC = float(os.getenv("CHECKPOINT_COMPACTION_INTERVAL_SEC", 300))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "agent")
+
+
+class CompactionMixin(ABC):
+    """
+    Retention policy and background compaction shared by all checkpointers.
+
+    Subclasses implement `acompact`, which deletes all but the newest
+    `keep_last` checkpoints of every thread and returns how many were removed.
+    Checkpoint ids are time-ordered (uuid6), so "newest" is "largest id".
+    """
+
+    keep_last: int = 0
+    _compaction_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def acompact(self) -> int:
+        raise NotImplementedError
+
+    def start_compaction(self, interval: float):
+        if self.keep_last <= 0 or interval <= 0 or self._compaction_task is not None:
+            return
+        self._compaction_task = asyncio.create_task(self._compaction_loop(interval))
+
+    async def _compaction_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.acompact()
+                if removed:
+                    logger.info(f"Checkpoint compaction removed {removed} checkpoints")
+            except Exception as e:
+                logger.error(f"Checkpoint compaction failed: {e}")
+
+    async def aclose(self):
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            try:
+                await self._compaction_task
+            except asyncio.CancelledError:
+                pass
+            self._compaction_task = None
+
+
+class MemoryCheckpointer(CompactionMixin, InMemorySaver):
+    """In-process checkpointer; fast but lost on restart."""
+
+    def __init__(self, keep_last: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.keep_last = keep_last
+
+    async def acompact(self) -> int:
+        if self.keep_last <= 0:
+            return 0
+        removed = 0
+        for thread_id, namespaces in list(self.storage.items()):
+            for checkpoint_ns, checkpoints in list(namespaces.items()):
+                stale = sorted(checkpoints)[:-self.keep_last]
+                if not stale:
+                    continue
+                for checkpoint_id in stale:
+                    del checkpoints[checkpoint_id]
+                    self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+                removed += len(stale)
+
+                # Channel blobs are shared between checkpoints; keep the referenced ones
+                referenced = set()
+                for saved, _, _ in checkpoints.values():
+                    checkpoint = self.serde.loads_typed(saved)
+                    for channel, version in checkpoint["channel_versions"].items():
+                        referenced.add((thread_id, checkpoint_ns, channel, version))
+                for key in list(self.blobs):
+                    if key[:2] == (thread_id, checkpoint_ns) and key not in referenced:
+                        del self.blobs[key]
+        return removed
+
+
+def _sqlite_checkpointer_cls():
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    class SqliteCheckpointer(CompactionMixin, AsyncSqliteSaver):
+        """On-disk checkpointer backed by SQLite; threads survive restarts."""
+
+        def __init__(self, conn, keep_last: int = 0, **kwargs):
+            super().__init__(conn, **kwargs)
+            self.keep_last = keep_last
+
+        async def acompact(self) -> int:
+            if self.keep_last <= 0:
+                return 0
+            await self.setup()
+            async with self.lock:
+                cursor = await self.conn.execute(
+                    """
+                    DELETE FROM checkpoints WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, ROW_NUMBER() OVER (
+                                PARTITION BY thread_id, checkpoint_ns
+                                ORDER BY checkpoint_id DESC
+                            ) AS position
+                            FROM checkpoints
+                        ) WHERE position > ?
+                    )
+                    """,
+                    (self.keep_last,),
+                )
+                removed = cursor.rowcount
+                await self.conn.execute(
+                    """
+                    DELETE FROM writes WHERE NOT EXISTS (
+                        SELECT 1 FROM checkpoints c
+                        WHERE c.thread_id = writes.thread_id
+                          AND c.checkpoint_ns = writes.checkpoint_ns
+                          AND c.checkpoint_id = writes.checkpoint_id
+                    )
+                    """
+                )
+                await self.conn.commit()
+                if removed:
+                    await self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return removed
+
+        async def aclose(self):
+            await super().aclose()
+            await self.conn.close()
+
+    return SqliteCheckpointer
+
+
+class RedisCheckpointer(CompactionMixin, BaseCheckpointSaver):
+    """
+    Checkpointer shared by workers on any number of hosts.
+
+    Only basic set, sorted-set and hash commands are used, so any
+    Redis-compatible server (Valkey, KeyDB, Dragonfly, fakeredis) can serve
+    it; no search or JSON modules are required. Checkpoint ids of a thread
+    and namespace live in a sorted set with equal scores, which orders them
+    lexicographically, i.e. by time for uuid6 ids.
+    """
+
+    def __init__(self, client, prefix: str, keep_last: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.prefix = prefix
+        self.keep_last = keep_last
+
+    # ---- Keys ----
+    def _threads_key(self) -> str:
+        return f"{self.prefix}:checkpoint_threads"
+
+    def _namespaces_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:checkpoint_ns:{thread_id}"
+
+    def _ids_key(self, thread_id: str, checkpoint_ns: str) -> str:
+        return f"{self.prefix}:checkpoint_ids:{thread_id}:{checkpoint_ns}"
+
+    def _checkpoint_key(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:checkpoint:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+    def _writes_key(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:checkpoint_writes:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+    # ---- Reads ----
+    async def _load(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._checkpoint_key(thread_id, checkpoint_ns, checkpoint_id))
+            pipe.hgetall(self._writes_key(thread_id, checkpoint_ns, checkpoint_id))
+            saved, writes = await pipe.execute()
+        if not saved:
+            return None
+
+        pending_writes = []
+        for field in sorted(writes, key=self._write_order):
+            channel, type_, value = self.serde.loads_typed(("msgpack", writes[field]))
+            task_id = field.decode().split("|", 1)[0]
+            pending_writes.append((task_id, channel, self.serde.loads_typed((type_, value))))
+
+        parent_id = saved[b"parent"].decode()
+        return CheckpointTuple(
+            {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            self.serde.loads_typed((saved[b"type"].decode(), saved[b"checkpoint"])),
+            self.serde.loads_typed(("msgpack", saved[b"metadata"])),
+            (
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes,
+        )
+
+    @staticmethod
+    def _write_order(field: bytes):
+        task_id, idx = field.decode().split("|", 1)
+        return task_id, int(idx)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        if not checkpoint_id:
+            latest = await self.client.zrevrange(self._ids_key(thread_id, checkpoint_ns), 0, 0)
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode()
+        return await self._load(thread_id, checkpoint_ns, checkpoint_id)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is not None:
+            thread_ids = [str(config["configurable"]["thread_id"])]
+        else:
+            thread_ids = sorted(m.decode() for m in await self.client.smembers(self._threads_key()))
+        before_id = get_checkpoint_id(before) if before else None
+
+        for thread_id in thread_ids:
+            if config is not None and config["configurable"].get("checkpoint_ns") is not None:
+                namespaces = [config["configurable"]["checkpoint_ns"]]
+            else:
+                namespaces = sorted(
+                    m.decode() for m in await self.client.smembers(self._namespaces_key(thread_id))
+                )
+            for checkpoint_ns in namespaces:
+                if config is not None and get_checkpoint_id(config):
+                    checkpoint_ids = [get_checkpoint_id(config)]
+                else:
+                    checkpoint_ids = [
+                        m.decode()
+                        for m in await self.client.zrevrange(self._ids_key(thread_id, checkpoint_ns), 0, -1)
+                    ]
+                for checkpoint_id in checkpoint_ids:
+                    if before_id and checkpoint_id >= before_id:
+                        continue
+                    saved = await self._load(thread_id, checkpoint_ns, checkpoint_id)
+                    if saved is None:
+                        continue
+                    if filter and any(saved.metadata.get(k) != v for k, v in filter.items()):
+                        continue
+                    yield saved
+                    if limit is not None:
+                        limit -= 1
+                        if limit <= 0:
+                            return
+
+    # ---- Writes ----
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        _, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._checkpoint_key(thread_id, checkpoint_ns, checkpoint["id"]),
+                mapping={
+                    "type": type_,
+                    "checkpoint": serialized_checkpoint,
+                    "metadata": serialized_metadata,
+                    "parent": config["configurable"].get("checkpoint_id") or "",
+                },
+            )
+            pipe.zadd(self._ids_key(thread_id, checkpoint_ns), {checkpoint["id"]: 0})
+            pipe.sadd(self._namespaces_key(thread_id), checkpoint_ns)
+            pipe.sadd(self._threads_key(), thread_id)
+            await pipe.execute()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        key = self._writes_key(
+            str(config["configurable"]["thread_id"]),
+            str(config["configurable"]["checkpoint_ns"]),
+            str(config["configurable"]["checkpoint_id"]),
+        )
+        # Special channels overwrite earlier writes; regular ones keep the first
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        async with self.client.pipeline(transaction=True) as pipe:
+            for idx, (channel, value) in enumerate(writes):
+                field = f"{task_id}|{WRITES_IDX_MAP.get(channel, idx)}"
+                _, packed = self.serde.dumps_typed([channel, *self.serde.dumps_typed(value)])
+                if replace:
+                    pipe.hset(key, field, packed)
+                else:
+                    pipe.hsetnx(key, field, packed)
+            await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        thread_id = str(thread_id)
+        namespaces = [m.decode() for m in await self.client.smembers(self._namespaces_key(thread_id))]
+        keys = [self._namespaces_key(thread_id)]
+        for checkpoint_ns in namespaces:
+            ids_key = self._ids_key(thread_id, checkpoint_ns)
+            for checkpoint_id in await self.client.zrange(ids_key, 0, -1):
+                checkpoint_id = checkpoint_id.decode()
+                keys.append(self._checkpoint_key(thread_id, checkpoint_ns, checkpoint_id))
+                keys.append(self._writes_key(thread_id, checkpoint_ns, checkpoint_id))
+            keys.append(ids_key)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys)
+            pipe.srem(self._threads_key(), thread_id)
+            await pipe.execute()
+
+    async def acompact(self) -> int:
+        if self.keep_last <= 0:
+            return 0
+        removed = 0
+        for thread_id in await self.client.smembers(self._threads_key()):
+            thread_id = thread_id.decode()
+            for checkpoint_ns in await self.client.smembers(self._namespaces_key(thread_id)):
+                checkpoint_ns = checkpoint_ns.decode()
+                ids_key = self._ids_key(thread_id, checkpoint_ns)
+                stale = await self.client.zrange(ids_key, 0, -(self.keep_last + 1))
+                if not stale:
+                    continue
+                keys = []
+                for checkpoint_id in stale:
+                    checkpoint_id = checkpoint_id.decode()
+                    keys.append(self._checkpoint_key(thread_id, checkpoint_ns, checkpoint_id))
+                    keys.append(self._writes_key(thread_id, checkpoint_ns, checkpoint_id))
+                async with self.client.pipeline(transaction=True) as pipe:
+                    pipe.zrem(ids_key, *stale)
+                    pipe.delete(*keys)
+                    await pipe.execute()
+                removed += len(stale)
+        return removed
+
+    async def aclose(self):
+        await super().aclose()
+        await self.client.aclose()
+
+
+async def _create_sqlite_checkpointer(keep_last: int) -> BaseCheckpointSaver:
+    import aiosqlite
+
+    os.makedirs(os.path.dirname(os.path.abspath(CHECKPOINT_DB_PATH)), exist_ok=True)
+    # Workers share the file; wait on their write locks instead of failing fast
+    conn = await aiosqlite.connect(CHECKPOINT_DB_PATH, timeout=30)
+    return _sqlite_checkpointer_cls()(conn, keep_last=keep_last)
+
+
+async def _create_redis_checkpointer(keep_last: int) -> BaseCheckpointSaver:
+    import redis.asyncio as redis
+
+    client = redis.from_url(REDIS_URL)
+    await client.ping()
+    return RedisCheckpointer(client, REDIS_KEY_PREFIX, keep_last=keep_last)
+
+
+async def _create_memory_checkpointer(keep_last: int) -> BaseCheckpointSaver:
+    return MemoryCheckpointer(keep_last=keep_last)
+
+
+CHECKPOINTER_BACKENDS = {
+    "memory": _create_memory_checkpointer,
+    "sqlite": _create_sqlite_checkpointer,
+    "redis": _create_redis_checkpointer,
+}
+
+
+async def create_checkpointer(
+    backend: Optional[str] = None,
+    keep_last: Optional[int] = None,
+    compaction_interval: Optional[float] = None,
+) -> BaseCheckpointSaver:
+    """Create the configured checkpointer and start its compaction loop."""
+    backend = (backend or CHECKPOINTER_BACKEND).lower()
+    keep_last = CHECKPOINT_KEEP_LAST if keep_last is None else keep_last
+    compaction_interval = CHECKPOINT_COMPACTION_INTERVAL_SEC if compaction_interval is None else compaction_interval
+
+    if backend not in CHECKPOINTER_BACKENDS:
+        raise ValueError(f"Unknown checkpointer backend: {backend}")
+
+    checkpointer = await CHECKPOINTER_BACKENDS[backend](keep_last)
+    checkpointer.start_compaction(compaction_interval)
+    logger.info(f"Checkpointer initialized with backend={backend}, keep_last={keep_last}")
+    return checkpointer
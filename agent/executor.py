@@ -3,7 +3,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from loguru import logger
 from langgraph.prebuilt import create_react_agent
+from typing import List, Optional
 from langchain_core.language_models import BaseChatModel
+from langchain_core.tools import BaseTool
 from langgraph.checkpoint.memory import InMemorySaver
 from tools import init_tools
 from dotenv import load_dotenv
@@ -28,8 +30,9 @@ logger.add(
 )
 
 # ---- Executor ----
-async def init_executor(model: BaseChatModel):        
-    tools = await init_tools()
+async def init_executor(model: BaseChatModel, tools: Optional[List[BaseTool]] = None):        
+    if tools is None:
+        tools = await init_tools()
     
     agent = create_react_agent(
         model=model,
@@ -0,0 +1,72 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Combining marks of decomposed (NFD) Vietnamese letters
+GRAVE, ACUTE, TILDE, HOOK_ABOVE, DOT_BELOW = "̀", "́", "̃", "̉", "̣"
+CIRCUMFLEX, BREVE, HORN = "̂", "̆", "̛"
+# Marks that other Latin-script text we see (English loanwords, French
+# names) practically never uses: ă ơ ư, hook above and dot below
+STRONG_MARKS = {HOOK_ABOVE, DOT_BELOW, BREVE, HORN}
+WEAK_MARKS = {GRAVE, ACUTE, TILDE, CIRCUMFLEX}
+# Frequent Vietnamese words typed without diacritics. A few ("may", "o") are
+# English too, which is why detection needs several of them in one message
+UNACCENTED_WORDS = {
+    "toi", "khong", "cua", "nhung", "duoc", "nhieu", "kiem", "tra", "giup",
+    "xem", "bao", "dung", "luong", "chu", "loi", "sao", "nao", "voi", "trong",
+    "dang", "hien", "thi", "tai", "nguyen", "bo", "nho", "may", "o", "dia",
+    "xin", "chao", "cam", "ban",
+}
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+@lru_cache(maxsize=4096)
+def _char_signal(char: str) -> int:
+    """2 for a letter only Vietnamese uses, 1 for an accent it shares, else 0"""
+    if char in "đĐ":
+        return 2
+    marks = unicodedata.normalize("NFD", char)[1:]
+    if not marks:
+        return 0
+    # Stacked marks (ế, ộ, ữ, ...) are Vietnamese too
+    if STRONG_MARKS.intersection(marks) or len(marks) > 1:
+        return 2
+    return 1 if WEAK_MARKS.intersection(marks) else 0
+
+def detect_language(text: str) -> str:
+    """
+    "vi" or "en", from characters alone.
+
+    Vietnamese is recognised by letters no other language we expect uses
+    (đ, ơ, ư, ạ, ả, ế, ...), or by accents dense enough that they cannot be
+    the odd loanword ("café", "résumé"). Messages typed without diacritics
+    count as Vietnamese when most of their words are common unaccented
+    Vietnamese words. Anything else is treated as English.
+    """
+    letters = 0
+    strong = 0
+    weak = 0
+    for char in text:
+        if not char.isalpha():
+            continue
+        letters += 1
+        if ord(char) > 127:
+            signal = _char_signal(char)
+            if signal == 2:
+                strong += 1
+            elif signal == 1:
+                weak += 1
+    if letters == 0:
+        return "en"
+    if strong or (weak >= 2 and weak / letters >= 0.15):
+        return "vi"
+
+    # Sparse accents ("Xin chào") are looked up without them
+    plain = "".join(c for c in unicodedata.normalize("NFD", text) if not unicodedata.combining(c))
+    words = [word.lower() for word in _WORD.findall(plain)]
+    hits = sum(word in UNACCENTED_WORDS for word in words)
+    if hits >= 2 and hits / len(words) >= 0.4:
+        return "vi"
+    return "en"
@@ -0,0 +1,210 @@
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import re
+import uuid
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from loguru import logger
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from prometheus_client import Counter
+from dotenv import load_dotenv
+from tools.output import expand_output
+
+load_dotenv()
+
+# ---- Env config ----
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+
+FAST_PATH_REQUESTS = Counter(
+    "agent_fast_path_requests",
+    "User messages answered by the fast-path router instead of the executor",
+    ["route"],
+)
+
+# ---- Formatting ----
+def _format_bytes(value: Any) -> str:
+    try:
+        size = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def _format_system(info: Dict[str, Any]) -> str:
+    return (
+        f"**System:** {info.get('system', '?')} {info.get('release', '')} "
+        f"on {info.get('machine', '?')}, host `{info.get('node_name', '?')}`"
+    )
+
+def _format_cpu(info: Dict[str, Any]) -> str:
+    return (
+        f"**CPU:** {info.get('cpu_percent', '?')}% used across "
+        f"{info.get('cpu_count_logical', '?')} logical cores "
+        f"({info.get('cpu_count_physical', '?')} physical)"
+    )
+
+def _format_ram(info: Dict[str, Any]) -> str:
+    return (
+        f"**RAM:** {_format_bytes(info.get('used'))} used of {_format_bytes(info.get('total'))} "
+        f"({info.get('percent', '?')}%), {_format_bytes(info.get('available'))} available"
+    )
+
+def _format_disks(disks: List[Dict[str, Any]]) -> str:
+    if not disks:
+        return "**Disks:** no mounted partitions found"
+    lines = [
+        "**Disks:**",
+        "",
+        "| Mount | Device | Type | Used | Total | Use% |",
+        "|---|---|---|---|---|---|",
+    ]
+    for disk in disks:
+        lines.append(
+            f"| {disk.get('mountpoint')} | {disk.get('device')} | {disk.get('fstype')} | "
+            f"{_format_bytes(disk.get('used'))} | {_format_bytes(disk.get('total'))} | {disk.get('percent')}% |"
+        )
+    return "\n".join(lines)
+
+def format_system_metrics(result: Any) -> str:
+    if isinstance(result, list) and len(result) == 1 and "mountpoint" not in result[0]:
+        result = result[0]
+    if isinstance(result, list):
+        return _format_disks(result)
+    # A single partition arrives as one object rather than a list
+    if "mountpoint" in result:
+        return _format_disks([result])
+    if "system_info" in result:
+        return "\n\n".join([
+            _format_system(result.get("system_info", {})),
+            _format_cpu(result.get("cpu_info", {})),
+            _format_ram(result.get("ram_info", {})),
+            _format_disks(result.get("disk_info", [])),
+        ])
+    if "cpu_percent" in result:
+        return _format_cpu(result)
+    if "available" in result:
+        return _format_ram(result)
+    return _format_system(result)
+
+def format_process_metrics(result: Any) -> str:
+    processes = result.get("processes", []) if isinstance(result, dict) else []
+    if not processes:
+        return "No matching process is using CPU or memory right now."
+    lines = [
+        "| PID | Name | User | Status | CPU% | Mem% |",
+        "|---|---|---|---|---|---|",
+    ]
+    for proc in processes:
+        lines.append(
+            f"| {proc.get('pid')} | {proc.get('name')} | {proc.get('user')} | {proc.get('status')} | "
+            f"{float(proc.get('cpu_percent') or 0):.1f} | {float(proc.get('memory_percent') or 0):.2f} |"
+        )
+    title = "Top processes by memory:" if len(processes) > 1 else "Process details:"
+    return "\n".join([title, ""] + lines)
+
+# ---- Routes ----
+class Route(NamedTuple):
+    name: str
+    pattern: re.Pattern
+    tool: str
+    args: Callable[[re.Match], Dict[str, Any]]
+    template: Callable[[Any], str]
+
+def _route(name: str, pattern: str, tool: str, args, template) -> Route:
+    # Whole-message matches only; anything more specific goes to the executor
+    return Route(name, re.compile(rf"^(?:{pattern})$", re.IGNORECASE), tool, args, template)
+
+_ASK = r"(?:(?:please\s+)?(?:show|get|display|check|give|list|what\s+(?:is|are))\s+(?:me\s+)?)?(?:my\s+|the\s+|current\s+)*"
+
+ROUTES: List[Route] = [
+    _route("system_metrics", _ASK + r"(?:system|server|machine)\s+(?:metrics|stats|statistics|status|overview)",
+           "get_system_metrics", lambda m: {"metrics_type": "all"}, format_system_metrics),
+    _route("cpu_usage", _ASK + r"cpu\s+(?:usage|load|utili[sz]ation|percent(?:age)?)",
+           "get_system_metrics", lambda m: {"metrics_type": "cpu"}, format_system_metrics),
+    _route("ram_usage", _ASK + r"(?:ram|memory|mem)\s+(?:usage|use|utili[sz]ation)",
+           "get_system_metrics", lambda m: {"metrics_type": "ram"}, format_system_metrics),
+    _route("disk_usage", _ASK + r"disk\s+(?:usage|space|utili[sz]ation)",
+           "get_system_metrics", lambda m: {"metrics_type": "disk"}, format_system_metrics),
+    _route("top_processes", _ASK + r"(?:top\s+)?(?:10\s+)?processes(?:\s+by\s+(?:memory|ram|mem(?:ory)?\s+usage))?",
+           "get_process_metrics", lambda m: {}, format_process_metrics),
+    _route("process_by_pid", _ASK + r"(?:process|pid)\s+(?:with\s+pid\s+)?(?P<pid>\d+)",
+           "get_process_metrics", lambda m: {"pid": int(m.group("pid"))}, format_process_metrics),
+]
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.strip())
+    return text.rstrip("?.! ")
+
+def _parse(result: Any) -> Any:
+    """Tool output as JSON; MCP tools return it as text, lists as one text per item"""
+    if isinstance(result, list):
+        return [_parse(item) for item in result]
+    if isinstance(result, str):
+        return json.loads(result)
+    return result
+
+class IntentRouter:
+    """
+    Answers the commonest requests without the LLM.
+
+    A user message that matches a route as a whole is answered by calling the
+    route's tool directly and formatting its result with a template. The
+    router records the tool call and result in the thread like the executor
+    would, so later turns see them. Anything else, including failed tool
+    calls and unexpected output, falls through to the executor.
+    """
+
+    def __init__(self, tools: List[BaseTool], routes: List[Route] = ROUTES):
+        self.tools = {tool.name: tool for tool in tools}
+        self.routes = [route for route in routes if route.tool in self.tools]
+
+    def match(self, text: str) -> Optional[tuple]:
+        normalized = _normalize(text)
+        for route in self.routes:
+            match = route.pattern.match(normalized)
+            if match:
+                return route, route.args(match)
+        return None
+
+    async def ainvoke(self, text: str, config: Optional[RunnableConfig] = None) -> Optional[List[AnyMessage]]:
+        matched = self.match(text)
+        if matched is None:
+            return None
+        route, args = matched
+
+        try:
+            raw = await self.tools[route.tool].ainvoke(args, config)
+            # The template needs the whole result; the thread keeps the bounded one
+            result = _parse(await expand_output(raw))
+            if isinstance(result, dict) and result.get("error"):
+                raise RuntimeError(result["error"])
+            answer = route.template(result)
+        except Exception as e:
+            logger.warning(f"Fast path {route.name} failed, falling back to the executor: {e}")
+            return None
+
+        FAST_PATH_REQUESTS.labels(route=route.name).inc()
+        logger.info(f"Fast path {route.name} answered '{text[:50]}'")
+        tool_call_id = f"call_{uuid.uuid4().hex[:24]}"
+        return [
+            AIMessage(content="", tool_calls=[{"name": route.tool, "args": args, "id": tool_call_id}]),
+            ToolMessage(
+                content=raw if isinstance(raw, str) else json.dumps(raw, default=str),
+                name=route.tool,
+                tool_call_id=tool_call_id,
+            ),
+            AIMessage(content=answer, response_metadata={"fast_path": route.name}),
+        ]
+
+def init_router(tools: List[BaseTool]) -> Optional[IntentRouter]:
+    """Create the fast-path router, None when disabled."""
+    if not FAST_PATH_ENABLED:
+        return None
+    return IntentRouter(tools)
@@ -1,15 +1,247 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from langmem.short_term import SummarizationNode
-from langchain_core.messages.utils import count_tokens_approximately
+import asyncio
+import contextvars
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from dotenv import load_dotenv
+from langmem.short_term.summarization import (
+    DEFAULT_EXISTING_SUMMARY_PROMPT,
+    DEFAULT_INITIAL_SUMMARY_PROMPT,
+)
+from langchain_core.messages import AnyMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
 from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
 
-def init_summarizer(model: BaseChatModel):
+load_dotenv()
+
+MAX_TOKENS = 1024
+MAX_TOKENS_BEFORE_SUMMARY = 1024
+MAX_SUMMARY_TOKENS = 256
+# inline: summarize before the executor answers; background: after, for the next turn
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "inline")
+
+TokenCounter = Callable[[Iterable[AnyMessage]], int]
+
+class IncrementalSummarizer:
+    """
+    Summarization node whose per-turn cost does not grow with the thread.
+
+    Alongside `messages` it keeps in the graph state:
+    - summary: running summary of messages[:summarized_count]
+    - summarized_count: number of leading messages folded into the summary
+    - message_tokens: cached token count of every message after that
+    - pending_tokens: running total of message_tokens
+
+    Each turn only counts the messages added since the previous one. When the
+    unsummarized tail reaches `max_tokens_before_summary`, its oldest messages
+    are folded into the previous summary, leaving a tail that fits in
+    `max_tokens - max_summary_tokens`.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        max_tokens: int = MAX_TOKENS,
+        max_tokens_before_summary: int = MAX_TOKENS_BEFORE_SUMMARY,
+        max_summary_tokens: int = MAX_SUMMARY_TOKENS,
+        token_counter: TokenCounter = count_tokens_approximately,
+    ):
+        if max_summary_tokens >= max_tokens:
+            raise ValueError("`max_summary_tokens` must be less than `max_tokens`.")
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_tokens_before_summary = max_tokens_before_summary
+        self.max_summary_tokens = max_summary_tokens
+        self.token_counter = token_counter
+
+    async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        update = self.count_new_messages(state)
+        if update["pending_tokens"] < self.max_tokens_before_summary:
+            return update
+
+        messages = state["messages"]
+        start = update["summarized_count"]
+        counts = update["message_tokens"]
+        cut = self._find_cut(messages, start, counts, update["pending_tokens"])
+        if cut == 0:
+            return update
+
+        summary = await self.summarize(state.get("summary", ""), messages[start:start + cut])
+        return {
+            "summary": summary,
+            "summarized_count": start + cut,
+            "message_tokens": counts[cut:],
+            "pending_tokens": update["pending_tokens"] - sum(counts[:cut]),
+        }
+
+    def count_new_messages(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Extend the cached token counts with the messages added since the last turn"""
+        messages = state["messages"]
+        start = state.get("summarized_count", 0)
+        counts = list(state.get("message_tokens") or [])
+        pending = state.get("pending_tokens", 0)
+
+        # The history was rewritten under us; recount the tail once
+        if start + len(counts) > len(messages):
+            start = min(start, len(messages))
+            counts, pending = [], 0
+
+        new_counts = [self.token_counter([m]) for m in messages[start + len(counts):]]
+        return {
+            "summarized_count": start,
+            "message_tokens": counts + new_counts,
+            "pending_tokens": pending + sum(new_counts),
+        }
+
+    def _find_cut(self, messages: List[AnyMessage], start: int, counts: List[int], pending: int) -> int:
+        """Number of tail messages to summarize so that the rest fits the budget"""
+        budget = self.max_tokens - self.max_summary_tokens
+        # The newest message is what the executor answers; never summarize it
+        last = len(counts) - 1
+        cut, remaining = 0, pending
+        while cut < last and remaining > budget:
+            remaining -= counts[cut]
+            cut += 1
+        # Tool results must stay with the AI message that requested them
+        while cut < last and isinstance(messages[start + cut], ToolMessage):
+            cut += 1
+        return cut
+
+    async def summarize(self, summary: str, messages: List[AnyMessage]) -> str:
+        """Fold messages into the running summary with one LLM call"""
+        # Keep the summarization call within the model's budget
+        if self.token_counter(messages) > self.max_tokens:
+            messages = trim_messages(
+                messages,
+                max_tokens=self.max_tokens,
+                token_counter=self.token_counter,
+                strategy="last",
+                allow_partial=True,
+            ) or messages
+        if summary:
+            prompt = DEFAULT_EXISTING_SUMMARY_PROMPT.invoke(
+                {"messages": messages, "existing_summary": summary}
+            )
+        else:
+            prompt = DEFAULT_INITIAL_SUMMARY_PROMPT.invoke({"messages": messages})
+        response = await self.model.ainvoke(prompt.messages)
+        return response.text()
+
+class BackgroundSummarizer(IncrementalSummarizer):
+    """
+    Summarization node that keeps the LLM call off the critical path of a turn.
+
+    When the tail crosses the threshold the summary is computed in a
+    background task and the executor answers with the longer tail. The next
+    turn of the thread applies the finished summary; if it is not ready yet
+    the turn goes on without it, unless the tail has grown past
+    `max_pending_tokens`, in which case it waits.
+
+    Results live in the worker's memory. A turn served by another worker
+    simply starts its own summary.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        max_pending_tokens: Optional[int] = None,
+        max_threads: int = 1024,
+        **kwargs: Any,
+    ):
+        super().__init__(model, **kwargs)
+        self.max_pending_tokens = max_pending_tokens or 2 * self.max_tokens_before_summary
+        self.max_threads = max_threads
+        # thread_id -> task returning (summarized_count, new summarized_count, summary)
+        self._tasks: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
+    async def __call__(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        thread_id = (config.get("configurable") or {}).get("thread_id")
+        if thread_id is None:
+            return await super().__call__(state)
+
+        update = self._collect(thread_id, self.count_new_messages(state))
+        if update["pending_tokens"] >= self.max_tokens_before_summary and thread_id not in self._tasks:
+            self._schedule(thread_id, state, update)
+
+        task = self._tasks.get(thread_id)
+        if task is not None and update["pending_tokens"] >= self.max_pending_tokens:
+            logger.info(f"Waiting for the background summary of thread {thread_id}")
+            # asyncio.wait does not cancel the task if this run is cancelled
+            await asyncio.wait({task})
+            update = self._collect(thread_id, update)
+        return update
+
+    def _schedule(self, thread_id: str, state: Dict[str, Any], update: Dict[str, Any]):
+        start = update["summarized_count"]
+        cut = self._find_cut(state["messages"], start, update["message_tokens"], update["pending_tokens"])
+        if cut == 0:
+            return
+
+        async def run() -> Tuple[int, int, str]:
+            summary = await self.summarize(state.get("summary", ""), state["messages"][start:start + cut])
+            return start, start + cut, summary
+
+        # A fresh context keeps the call out of the current run's callbacks,
+        # so its tokens are not streamed to the client as part of the answer
+        self._tasks[thread_id] = asyncio.create_task(run(), context=contextvars.Context())
+        while len(self._tasks) > self.max_threads:
+            _, stale = self._tasks.popitem(last=False)
+            stale.cancel()
+
+    def _collect(self, thread_id: str, update: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the thread's finished background summary to the update, if any"""
+        task = self._tasks.get(thread_id)
+        if task is None or not task.done():
+            return update
+        del self._tasks[thread_id]
+
+        if task.cancelled():
+            return update
+        if task.exception() is not None:
+            logger.warning(f"Background summary of thread {thread_id} failed: {task.exception()}")
+            return update
+
+        start, end, summary = task.result()
+        counts = update["message_tokens"]
+        # The thread moved on (summarized elsewhere or rewritten); drop the result
+        if start != update["summarized_count"] or end - start > len(counts):
+            return update
+        cut = end - start
+        return {
+            "summary": summary,
+            "summarized_count": end,
+            "message_tokens": counts[cut:],
+            "pending_tokens": update["pending_tokens"] - sum(counts[:cut]),
+        }
+
+    async def aclose(self):
+        """Cancel summaries still running"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def summarized_messages(state: Dict[str, Any]) -> List[AnyMessage]:
+    """The running summary followed by the unsummarized tail, as sent to the executor"""
+    tail = list(state["messages"][state.get("summarized_count", 0):])
+    summary = state.get("summary")
+    if not summary:
+        return tail
+    return [SystemMessage(content=f"Summary of the conversation so far: {summary}")] + tail
+
+def init_summarizer(model: BaseChatModel, mode: str = SUMMARY_MODE):
     """Create and configure the summarization node."""
-    return SummarizationNode(
-        token_counter=count_tokens_approximately,
+    summarizers = {"inline": IncrementalSummarizer, "background": BackgroundSummarizer}
+    if mode not in summarizers:
+        raise ValueError(f"Unknown summary mode: {mode}")
+    summarizer_cls = summarizers[mode]
+    return summarizer_cls(
         model=model,
-        max_tokens=1024,
-        max_tokens_before_summary=1024,
-        max_summary_tokens=256,
+        max_tokens=MAX_TOKENS,
+        max_tokens_before_summary=MAX_TOKENS_BEFORE_SUMMARY,
+        max_summary_tokens=MAX_SUMMARY_TOKENS,
     )
@@ -3,10 +3,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from loguru import logger
 from typing_extensions import TypedDict
-from typing import Annotated
+from typing import Annotated, Optional
 from langchain_core.messages import HumanMessage, AnyMessage
 from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.memory import InMemorySaver
 from langchain.chat_models import init_chat_model
 from langgraph.types import Command
 from langgraph.graph import (
@@ -15,9 +14,27 @@ from langgraph.graph import (
     START, 
     add_messages
 )
+import asyncio
+import time
 import uuid
 from agent.executor import init_executor
-from agent.summarizer import init_summarizer
+from agent.router import init_router
+from tools import init_tools
+from tools.http_client import http_client_kwargs
+from agent.summarizer import init_summarizer, summarized_messages
+from agent.checkpointer import create_checkpointer
+from agent.answer_cache import ANSWER_CACHE_ENABLED, conversation_key, init_answer_cache
+from agent.translator import init_translator
+from agent.language import detect_language
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ---- Env config ----
+# "single": every message goes to the executor as is
+# "multilingual": Vietnamese messages are translated to English first
+GRAPH_MODE = os.getenv("GRAPH_MODE", "single")
+GRAPH_MODES = ("single", "multilingual")
 
 # ---- Logging config ----
 LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
@@ -37,47 +54,166 @@ logger.add(
 )
 
 # ---- State ----
+def merge_translations(left: dict | None, right: dict | None) -> dict:
+    return {**(left or {}), **(right or {})}
+
 class State(TypedDict):
     messages: Annotated[list[AnyMessage], add_messages]
-    summarized_messages: list[AnyMessage]
+    # Running summary of the thread, maintained by the summarize node
+    summary: str
+    summarized_count: int
+    message_tokens: list[int]
+    pending_tokens: int
+    # English translations of Vietnamese user messages, by message id
+    translations: Annotated[dict[str, str], merge_translations]
 
 # ---- Agents ----
 class Agents:
     executor = None
     summarizer = None
+    answer_cache = None
+    router = None
+    translator = None
 
     @classmethod
-    async def init(cls, model: str = "openai:gpt-4o-mini"):
-        logger.info(f"Initializing Agents with model={model}")
-        llm = init_chat_model(model=model, temperature=0)
-        cls.executor = await init_executor(model=llm)
+    async def init(cls, model: str = "openai:gpt-4o-mini", mode: str = GRAPH_MODE):
+        if mode not in GRAPH_MODES:
+            raise ValueError(f"Unknown graph mode: {mode}")
+        logger.info(f"Initializing Agents with model={model}, mode={mode}")
+        # OpenAI only reports token usage of streamed responses when asked to;
+        # its calls share the process-wide connection pool
+        extra = {"stream_usage": True, **http_client_kwargs()} if model.startswith("openai:") else {}
+        llm = init_chat_model(model=model, temperature=0, **extra)
+        tools = await init_tools()
+        cls.executor = await init_executor(model=llm, tools=tools)
+        cls.router = init_router(tools)
         cls.summarizer = init_summarizer(model=llm.bind(max_token=1024))
+        cls.answer_cache = init_answer_cache() if ANSWER_CACHE_ENABLED else None
+        cls.translator = init_translator(model=llm) if mode == "multilingual" else None
+
+def question_text(state: State, question: AnyMessage) -> str:
+    """The user message as the executor sees it, translated when it was Vietnamese"""
+    return (state.get("translations") or {}).get(question.id) or question.text()
+
+def translated_messages(state: State, messages: list[AnyMessage]) -> list[AnyMessage]:
+    translations = state.get("translations") or {}
+    if not translations:
+        return messages
+    return [
+        HumanMessage(content=translations[message.id], id=message.id)
+        if isinstance(message, HumanMessage) and message.id in translations else message
+        for message in messages
+    ]
+
+def executor_messages(state: State) -> list[AnyMessage]:
+    return translated_messages(state, summarized_messages(state))
+
+def cache_key(state: State, messages: list[AnyMessage]) -> tuple[str, str]:
+    """The question and, as its context, the conversation before it"""
+    # Follow-ups only match follow-ups to the same conversation
+    return question_text(state, state["messages"][-1]), conversation_key(messages[:-1])
+
+async def cache_step(state: State):
+    # Kept out of the executor node: resuming an interrupt re-runs that node,
+    # and a cached answer must not replace the tool call that was approved
+    answer = await Agents.answer_cache.lookup(*cache_key(state, executor_messages(state)))
+    return {"messages": answer} if answer is not None else {}
 
 async def execute_step(state: State):
+    question = state["messages"][-1]
+    messages = executor_messages(state)
     response = await Agents.executor.ainvoke(
         {
-            "messages": state['summarized_messages']
+            "messages": messages
         }
-    )    
-    return {"messages": response["messages"][-1]}
+    )
+    answer = response["messages"][-1]
+    cache = Agents.answer_cache
+    if cache is not None and isinstance(question, HumanMessage):
+        text, context = cache_key(state, messages)
+        # Only turns that did not touch the live system or change anything
+        if cache.cacheable(response["messages"][len(messages):]):
+            cache.store(text, answer.text(), context)
+        else:
+            cache.discard(text, context)
+    return {"messages": answer}
 
-async def build_graph():
-    await Agents.init()
+async def route_step(state: State, config: RunnableConfig):
+    question = state["messages"][-1]
+    if Agents.router is None or not isinstance(question, HumanMessage):
+        return {}
+    messages = await Agents.router.ainvoke(question_text(state, question), config)
+    return {"messages": messages} if messages else {}
 
-    graph = (
+def detect_step(state: State) -> str:
+    # Local detection: English skips the translator entirely
+    question = state["messages"][-1]
+    if isinstance(question, HumanMessage) and detect_language(question.text()) == "vi":
+        return "translate"
+    return "router"
+
+async def translate_step(state: State, config: RunnableConfig):
+    question = state["messages"][-1]
+    response = await Agents.translator.ainvoke({"messages": [HumanMessage(content=question.text())]}, config)
+    translation = response["messages"][-1].text().strip().strip('"')
+    logger.info(f"Translated '{question.text()[:50]}' -> '{translation[:50]}'")
+    return {"translations": {question.id: translation}}
+
+def after_route(state: State) -> str:
+    # The router answered when the thread no longer ends with the question
+    if not isinstance(state["messages"][-1], HumanMessage):
+        return END
+    return "executor" if Agents.answer_cache is None else "cache"
+
+def after_cache(state: State) -> str:
+    return "executor" if isinstance(state["messages"][-1], HumanMessage) else END
+
+def compile_graph(checkpointer):
+    """Wire the initialized Agents into the chat graph"""
+    builder = (
         StateGraph(State)
         .add_node("executor", execute_step)
         .add_node("summarize", Agents.summarizer)
+        .add_node("router", route_step)
         .add_edge(START, "summarize")
-        .add_edge("summarize", "executor")
         .add_edge("executor", END)
-        .compile(
-            checkpointer=InMemorySaver()
-        )
+    )
+    if Agents.answer_cache is None:
+        builder.add_conditional_edges("router", after_route, ["executor", END])
+    else:
+        builder.add_node("cache", cache_step)
+        builder.add_conditional_edges("router", after_route, ["cache", END])
+        builder.add_conditional_edges("cache", after_cache, ["executor", END])
+    if Agents.translator is None:
+        builder.add_edge("summarize", "router")
+    else:
+        builder.add_node("translate", translate_step)
+        builder.add_conditional_edges("summarize", detect_step, ["translate", "router"])
+        builder.add_edge("translate", "router")
+
+    graph = builder.compile(
+        checkpointer=checkpointer
     )
 
     return graph
 
+async def _timed(name: str, awaitable, timings: dict):
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = time.perf_counter() - start
+
+async def build_graph(timings: Optional[dict] = None):
+    """Initialize the Agents and the checkpointer concurrently and compile the graph"""
+    timings = {} if timings is None else timings
+    _, checkpointer = await asyncio.gather(
+        _timed("agents", Agents.init(), timings),
+        _timed("checkpointer", create_checkpointer(), timings),
+    )
+    logger.info(f"Graph dependencies initialized in {', '.join(f'{k}={v:.2f}s' for k, v in timings.items())}")
+    return compile_graph(checkpointer)
+
 # ---- Main ----
 async def main():
     graph = await build_graph()
@@ -117,8 +253,11 @@ async def main():
                         print(message_chunk.content, end="\n", flush=True)       
         else:
             for node_name, node_data in chunk.items():
-                if "messages" in node_data:
-                    print(node_data['messages'].content)
+                if node_data and node_data.get("messages"):
+                    # A node returns one message or, like the router, a list of them
+                    messages = node_data["messages"]
+                    message = messages[-1] if isinstance(messages, list) else messages
+                    print(message.content)
                     # for message in node_data["messages"]:                        
                     #     print(message[1], end="", flush=True)         
 
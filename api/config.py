@@ -1,5 +1,8 @@
 import os
 from loguru import logger
+from dotenv import load_dotenv
+
+load_dotenv()
 
 class Config:
     # API Configuration
@@ -14,6 +17,49 @@ class Config:
     MAX_TOKENS = 1024
     RECURSION_LIMIT = 10
     
+    # Startup Configuration
+    # Build the agent graph after the server starts accepting requests; /ready reports when it is done
+    BACKGROUND_STARTUP = os.getenv("BACKGROUND_STARTUP", "true").lower() in ("1", "true", "yes")
+    # How long a request that arrives during startup waits for the graph
+    STARTUP_TIMEOUT_SEC = float(os.getenv("STARTUP_TIMEOUT_SEC", 120))
+    
+    # Shared State Configuration
+    # memory: single worker; sqlite: workers on one host; redis: workers on any host
+    STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+    STATE_DB_PATH = os.getenv(
+        "STATE_DB_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "data", "state.sqlite")
+    )
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "agent")
+    
+    # Thread / Interrupt Registry Configuration
+    MAX_ACTIVE_THREADS = int(os.getenv("MAX_ACTIVE_THREADS", 1000))
+    THREAD_TTL_SEC = float(os.getenv("THREAD_TTL_SEC", 24 * 60 * 60))
+    MAX_PENDING_INTERRUPTS = int(os.getenv("MAX_PENDING_INTERRUPTS", 1000))
+    INTERRUPT_TTL_SEC = float(os.getenv("INTERRUPT_TTL_SEC", 60 * 60))
+    REGISTRY_SWEEP_INTERVAL_SEC = float(os.getenv("REGISTRY_SWEEP_INTERVAL_SEC", 60))
+    
+    # Admission Control Configuration
+    MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", 8))
+    MAX_QUEUED_RUNS = int(os.getenv("MAX_QUEUED_RUNS", 64))
+    QUEUE_TIMEOUT_SEC = float(os.getenv("QUEUE_TIMEOUT_SEC", 30))
+    
+    # Job Configuration
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+    MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 100))
+    MAX_JOBS = int(os.getenv("MAX_JOBS", 1000))
+    JOB_TTL_SEC = float(os.getenv("JOB_TTL_SEC", 60 * 60))
+    JOB_MAX_EVENTS = int(os.getenv("JOB_MAX_EVENTS", 2000))
+    
+    # Chat Title Configuration
+    TITLE_MODEL = os.getenv("TITLE_MODEL", "gpt-3.5-turbo")
+    TITLE_CONCURRENCY = int(os.getenv("TITLE_CONCURRENCY", 4))
+    TITLE_CACHE_PATH = os.getenv(
+        "TITLE_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "..", "data", "titles.sqlite")
+    )
+    
     # Logging Configuration
     LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
     LOG_FILE = os.path.join(LOG_DIR, "api.log")
@@ -4,7 +4,7 @@ from loguru import logger
 
 from api.config import Config, setup_logging
 from api.services import AgentService
-from api.routes import create_router
+from api.routes import create_router, create_jobs_router, create_metrics_router
 
 # Setup logging
 setup_logging()
@@ -36,9 +36,16 @@ async def startup_event():
     # Add routes
     router = create_router(agent_service)
     app.include_router(router)
+    app.include_router(create_jobs_router(agent_service))
+    app.include_router(create_metrics_router())
     
     logger.info("Server started successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    logger.info("Shutting down FastAPI server...")
+    await agent_service.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 class ChatRequest(BaseModel):
     message: str
@@ -11,6 +11,8 @@ class ChatResponse(BaseModel):
     interrupt_id: Optional[str] = None
     interrupt_description: Optional[str] = None
     interrupt_action: Optional[Dict[str, Any]] = None
+    # Every tool call awaiting approval in the interrupted step
+    interrupt_actions: Optional[List[Dict[str, Any]]] = None
     requires_approval: bool = False
 
 class InterruptResolution(BaseModel):
@@ -21,4 +23,17 @@ class InterruptResolution(BaseModel):
 class InterruptApproval(BaseModel):
     interrupt_id: str
     approved: bool
-    thread_id: str
\ No newline at end of file
+    thread_id: str
+    # Per-call decisions by action_id; calls not listed get `approved`
+    decisions: Optional[Dict[str, bool]] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    thread_id: str
+    status: str
+    result: str = ""
+    error: Optional[str] = None
+    interrupt: Optional[Dict[str, Any]] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
\ No newline at end of file
@@ -1,5 +1,9 @@
 from .chat import create_router
+from .jobs import create_jobs_router
+from .metrics import create_metrics_router
 
 all = [
-    "create_router"
+    "create_router",
+    "create_jobs_router",
+    "create_metrics_router"
 ]
\ No newline at end of file
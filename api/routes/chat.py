@@ -1,8 +1,16 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from loguru import logger
-from api.models import ChatRequest, ChatResponse, InterruptResolution
+from api.models import ChatRequest, ChatResponse, InterruptResolution, InterruptApproval
 from api.services import AgentService
+from api.services.admission import AdmissionRejected
+
+def too_many_requests(error: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
 def create_router(agent_service: AgentService) -> APIRouter:
     router = APIRouter()
@@ -15,76 +23,129 @@ def create_router(agent_service: AgentService) -> APIRouter:
     async def health_check():
         return {
             "status": "healthy",
-            "active_threads": len(agent_service.get_all_threads()),
-            "pending_interrupts": len(agent_service.get_all_interrupts())
+            "active_threads": len(await agent_service.get_all_threads()),
+            "pending_interrupts": len(await agent_service.get_all_interrupts()),
+            "registry": await agent_service.get_registry_stats(),
+            "admission": agent_service.get_admission_stats(),
+            "tool_cache": agent_service.get_tool_cache_stats(),
+            "tool_output": agent_service.get_tool_output_stats(),
+            "answer_cache": agent_service.get_answer_cache_stats()
         }
 
+    @router.get("/ready")
+    async def readiness_check():
+        """200 once the agent graph can serve requests, 503 while it starts or if it failed"""
+        readiness = agent_service.readiness()
+        status_code = 200 if readiness["status"] == "ready" else 503
+        return JSONResponse(status_code=status_code, content=readiness)
+
     @router.post("/chat", response_model=ChatResponse)
     async def chat(request: ChatRequest):
         """Send a message to the agent"""
         try:
             response = await agent_service.chat(request)
             return response
+        except AdmissionRejected as e:
+            logger.warning(f"Chat rejected: {str(e)}")
+            raise too_many_requests(e)
         except Exception as e:
             logger.error(f"Chat error: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.post("/chat/stream")
     async def stream_chat(request: ChatRequest):
-        """Stream chat responses"""
+        """Stream chat responses as Server-Sent Events"""
+        try:
+            agent_service.admission.check()
+        except AdmissionRejected as e:
+            logger.warning(f"Stream chat rejected: {str(e)}")
+            raise too_many_requests(e)
+        
         return StreamingResponse(
             agent_service.stream_chat(request),
-            media_type="text/plain",
-            headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",
+            }
         )
 
     @router.post("/interrupt/approve")
     async def approve_interrupt(request: dict):
         """Approve or deny a pending interrupt"""
         try:
-            logger.info(f"[approve_interrupt] Incoming request: {request}")
-
             interrupt_id = request.get("interrupt_id")
             approved = request.get("approved", False)
             thread_id = request.get("thread_id")
+            decisions = request.get("decisions")
 
-            logger.debug(f"[approve_interrupt] Extracted values -> "
-                        f"interrupt_id={interrupt_id}, approved={approved}, thread_id={thread_id}")
+            logger.info(f"[approve_interrupt] interrupt_id={interrupt_id}, "
+                        f"approved={approved}, thread_id={thread_id}, decisions={decisions}")
 
             if not interrupt_id or not thread_id:
                 logger.warning(f"[approve_interrupt] Missing required fields: "
                             f"interrupt_id={interrupt_id}, thread_id={thread_id}")
                 raise ValueError("interrupt_id and thread_id are required")
 
-            logger.info(f"[approve_interrupt] Calling agent_service.resolve_interrupt "
-                        f"with interrupt_id={interrupt_id}, approved={approved}, thread_id={thread_id}")
-
             response = await agent_service.resolve_interrupt(
                 interrupt_id,
                 approved,
-                thread_id
+                thread_id,
+                decisions
             )
 
-            logger.info(f"[approve_interrupt] Resolution response: {response}")
+            logger.info(f"[approve_interrupt] Resolved interrupt_id={interrupt_id} "
+                        f"({len(response)} chars)")
 
-            result = {
+            return {
                 "response": response,
                 "thread_id": thread_id,
                 "status": "resolved",
-                "approved": approved
+                "approved": approved,
+                "decisions": decisions
             }
 
-            logger.info(f"[approve_interrupt] Final response: {result}")
-            return result
-
         except ValueError as e:
             logger.error(f"[approve_interrupt] ValueError: {str(e)} | Request: {request}")
             raise HTTPException(status_code=404, detail=str(e))
 
+        except AdmissionRejected as e:
+            logger.warning(f"[approve_interrupt] Rejected: {str(e)} | Request: {request}")
+            raise too_many_requests(e)
+
         except Exception as e:
             logger.exception(f"[approve_interrupt] Unexpected error: {str(e)} | Request: {request}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.post("/interrupt/approve/stream")
+    async def stream_approve_interrupt(approval: InterruptApproval):
+        """Approve or deny a pending interrupt and stream the resumed run"""
+        logger.info(f"[stream_approve_interrupt] interrupt_id={approval.interrupt_id}, "
+                    f"approved={approval.approved}, thread_id={approval.thread_id}")
+
+        if not await agent_service.get_interrupt(approval.interrupt_id):
+            raise HTTPException(status_code=404, detail="Interrupt not found")
+        try:
+            agent_service.admission.check()
+        except AdmissionRejected as e:
+            logger.warning(f"[stream_approve_interrupt] Rejected: {str(e)}")
+            raise too_many_requests(e)
+
+        return StreamingResponse(
+            agent_service.stream_resolve_interrupt(
+                approval.interrupt_id,
+                approval.approved,
+                approval.thread_id,
+                approval.decisions
+            ),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",
+            }
+        )
 
     # Keep the old resolve endpoint for backward compatibility
     @router.post("/interrupt/resolve")
@@ -106,6 +167,8 @@ def create_router(agent_service: AgentService) -> APIRouter:
             }
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
+        except AdmissionRejected as e:
+            raise too_many_requests(e)
         except Exception as e:
             logger.error(f"Interrupt resolution error: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -113,17 +176,17 @@ def create_router(agent_service: AgentService) -> APIRouter:
     @router.get("/interrupts")
     async def get_interrupts():
         """Get all pending interrupts"""
-        return {"interrupts": agent_service.get_all_interrupts()}
+        return {"interrupts": await agent_service.get_all_interrupts()}
 
     @router.get("/threads")
     async def get_threads():
         """Get all active threads"""
-        return {"threads": agent_service.get_all_threads()}
+        return {"threads": await agent_service.get_all_threads()}
 
     @router.get("/threads/{thread_id}")
     async def get_thread_status(thread_id: str):
         """Get specific thread status"""
-        thread_status = agent_service.get_thread_status(thread_id)
+        thread_status = await agent_service.get_thread_status(thread_id)
         if not thread_status:
             raise HTTPException(status_code=404, detail="Thread not found")
         return {"thread_id": thread_id, **thread_status}
@@ -131,7 +194,7 @@ def create_router(agent_service: AgentService) -> APIRouter:
     @router.delete("/threads/{thread_id}")
     async def delete_thread(thread_id: str):
         """Delete a thread"""
-        deleted = agent_service.delete_thread(thread_id)
+        deleted = await agent_service.delete_thread(thread_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Thread not found")
         return {"message": f"Thread {thread_id} deleted successfully"}
@@ -143,7 +206,7 @@ def create_router(agent_service: AgentService) -> APIRouter:
             logger.info(f"[generate_chat_title] Generating title for thread: {thread_id}")
             
             # Get thread messages to generate title
-            thread_status = agent_service.get_thread_status(thread_id)
+            thread_status = await agent_service.get_thread_status(thread_id)
             if not thread_status:
                 raise HTTPException(status_code=404, detail="Thread not found")
             
@@ -179,32 +242,23 @@ def create_router(agent_service: AgentService) -> APIRouter:
         try:
             logger.info("[get_chat_history] Fetching chat history")
             
-            # Get all threads
-            threads = agent_service.get_all_threads()
+            # Get all threads; titles come from the cache only and
+            # missing ones are generated in the background
+            threads = await agent_service.get_all_threads()
+            agent_service.fill_missing_titles(threads)
             
             chat_history = []
-            for thread_id in threads:
-                try:
-                    # Get thread status and messages
-                    thread_status = agent_service.get_thread_status(thread_id)
-                    if thread_status:
-                        # Try to get existing title or generate new one
-                        title = await agent_service.generate_chat_title(thread_id)
-                        if not title:
-                            title = f"Chat {thread_id[:8]}"
-                        
-                        chat_history.append({
-                            "thread_id": thread_id,
-                            "title": title,
-                            "last_updated": thread_status.get("last_updated"),
-                            "message_count": len(thread_status.get("messages", []))
-                        })
-                except Exception as e:
-                    logger.warning(f"[get_chat_history] Error processing thread {thread_id}: {str(e)}")
-                    continue
+            for thread_id, thread_status in threads.items():
+                title = agent_service.get_chat_title(thread_id) or f"Chat {thread_id[:8]}"
+                chat_history.append({
+                    "thread_id": thread_id,
+                    "title": title,
+                    "last_updated": thread_status.get("last_updated"),
+                    "message_count": len(thread_status.get("messages", []))
+                })
             
             # Sort by last updated (most recent first)
-            chat_history.sort(key=lambda x: x.get("last_updated", ""), reverse=True)
+            chat_history.sort(key=lambda x: x.get("last_updated") or "", reverse=True)
             
             logger.info(f"[get_chat_history] Retrieved {len(chat_history)} chat histories")
             
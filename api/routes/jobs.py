@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from loguru import logger
+from api.models import ChatRequest, JobResponse
+from api.services import AgentService
+from api.services.admission import AdmissionRejected
+from api.services.events import format_sse
+
+def create_jobs_router(agent_service: AgentService) -> APIRouter:
+    router = APIRouter(prefix="/jobs")
+
+    @router.post("", response_model=JobResponse, status_code=202)
+    async def submit_job(request: ChatRequest):
+        """Submit a message to run in the background and return its job id"""
+        try:
+            job = agent_service.jobs.submit(request)
+        except AdmissionRejected as e:
+            logger.warning(f"[submit_job] Rejected: {str(e)}")
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        logger.info(f"[submit_job] Queued job {job.job_id} for thread {job.thread_id}")
+        return job.to_dict()
+
+    @router.get("")
+    async def get_job_stats():
+        """Get job queue statistics"""
+        return agent_service.jobs.stats()
+
+    @router.get("/{job_id}", response_model=JobResponse)
+    async def get_job(job_id: str):
+        """Get the status and result of a job"""
+        job = agent_service.jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job.to_dict()
+
+    @router.get("/{job_id}/events")
+    async def stream_job_events(job_id: str):
+        """Stream a job's progress events as Server-Sent Events"""
+        job = agent_service.jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        async def event_stream():
+            async for event in job.subscribe():
+                yield format_sse(event)
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",
+            }
+        )
+
+    @router.delete("/{job_id}")
+    async def cancel_job(job_id: str):
+        """Cancel a queued or running job"""
+        if not agent_service.jobs.cancel(job_id):
+            raise HTTPException(status_code=404, detail="Job not found or already finished")
+        return {"message": f"Job {job_id} cancelled successfully"}
+
+    return router
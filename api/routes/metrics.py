@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+
+from api.services import metrics
+
+def create_metrics_router() -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/metrics")
+    async def get_metrics():
+        """Prometheus metrics of graph nodes, tools, LLM calls and admission"""
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
+
+    return router
@@ -0,0 +1,140 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from api.services import metrics
+
+class AdmissionRejected(Exception):
+    """Raised when a run cannot be admitted because the wait queue is full"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class ThreadSerializer:
+    """
+    Runs turns of the same thread one at a time, in arrival order.
+
+    Each thread gets an asyncio.Lock (FIFO for waiters) that is dropped again
+    once nobody holds or waits for it, so idle threads cost nothing.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def turn(self, thread_id: str) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(thread_id, asyncio.Lock())
+        self._users[thread_id] = self._users.get(thread_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[thread_id] -= 1
+            if self._users[thread_id] == 0:
+                del self._users[thread_id]
+                del self._locks[thread_id]
+
+    def depth(self, thread_id: str) -> int:
+        """Number of turns running or waiting on a thread"""
+        return self._users.get(thread_id, 0)
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+class AdmissionController:
+    """
+    Global limit on concurrent graph runs with a bounded wait queue.
+
+    A run first waits for its thread's turn, then for a global slot. At most
+    `max_queue` runs may wait at once and none waits longer than
+    `queue_timeout`; beyond that runs are rejected with a Retry-After hint
+    derived from the recent average run time.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, window: int = 1000):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.threads = ThreadSerializer()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._wait_times: deque = deque(maxlen=window)
+        self._run_times: deque = deque(maxlen=window)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def check(self):
+        """Reject early when the wait queue is already full"""
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            metrics.ADMISSION_REJECTED.labels(reason="queue_full").inc()
+            raise AdmissionRejected("Too many queued requests", self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, thread_id: str) -> AsyncIterator[None]:
+        self.check()
+
+        self.queued += 1
+        metrics.REQUESTS_QUEUED.inc()
+        queued_at = time.monotonic()
+        async with AsyncExitStack() as stack:
+            try:
+                async with asyncio.timeout(self.queue_timeout):
+                    await stack.enter_async_context(self.threads.turn(thread_id))
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                self.timed_out += 1
+                metrics.ADMISSION_REJECTED.labels(reason="timeout").inc()
+                raise AdmissionRejected(
+                    f"Request waited more than {self.queue_timeout}s for a slot",
+                    self.retry_after(),
+                )
+            finally:
+                self.queued -= 1
+                metrics.REQUESTS_QUEUED.dec()
+            stack.callback(self._semaphore.release)
+
+            started_at = time.monotonic()
+            self._wait_times.append(started_at - queued_at)
+            metrics.ADMISSION_WAIT.observe(started_at - queued_at)
+            self.admitted += 1
+            self.in_flight += 1
+            metrics.REQUESTS_IN_FLIGHT.inc()
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                metrics.REQUESTS_IN_FLIGHT.dec()
+                self._run_times.append(time.monotonic() - started_at)
+
+    def retry_after(self) -> int:
+        """Seconds until a queued request would likely get a slot"""
+        if not self._run_times:
+            return 1
+        avg_run = sum(self._run_times) / len(self._run_times)
+        return max(1, math.ceil(avg_run * (self.queued + 1) / self.max_concurrent))
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._wait_times)
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "busy_threads": len(self.threads),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait_sec": {
+                "avg": sum(waits) / len(waits) if waits else 0.0,
+                "p95": waits[round(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "max": waits[-1] if waits else 0.0,
+            },
+        }
@@ -1,41 +1,192 @@
+import asyncio
 import os
 import sys
+import time
 import uuid
-from typing import Dict, Any, AsyncGenerator, Tuple, Optional
+from contextlib import aclosing
+from typing import Dict, Any, AsyncGenerator, List, Tuple, Optional
+
+import openai
 
 from api.config import Config
 from api.models import ChatRequest, ChatResponse
 
 # Import the workflow
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-from agent.workflow import build_graph
-from langchain_core.messages import HumanMessage
+from agent.workflow import Agents, build_graph
+from tools.cache import TOOL_CACHE
+from tools.output import SPILL_STORE
+from tools.http_client import aclose_http_clients, get_async_http_client
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.types import Command
 from loguru import logger
 
+from api.services import events, metrics
+from api.services.events import make_event, format_sse
+from api.services.state import create_state_store
+from api.services.admission import AdmissionController, AdmissionRejected
+from api.services.titles import TitleCache
+from api.services.jobs import JobManager
+
+# Nodes whose LLM output is internal and never streamed to the client
+SILENT_NODES = {"summarize", "translate"}
+
+# Root graph nodes that call tools themselves rather than through the executor
+TOOL_NODES = {"router"}
+
+# Thread statuses during which a thread must not be evicted
+BUSY_STATUSES = {"processing", "streaming", "resolving"}
+
+# State store namespaces
+THREADS = "threads"
+INTERRUPTS = "interrupts"
+
 class AgentService:
     def __init__(self):
         self.graph = None
-        self.active_threads: Dict[str, Dict] = {}
-        self.pending_interrupts: Dict[str, Dict] = {}
+        self._graph_task: Optional[asyncio.Task] = None
+        # Seconds spent on each part of the graph build, reported by /ready
+        self.startup_timings: Dict[str, float] = {}
+        # Thread and interrupt records; shared by all workers unless the backend is "memory"
+        self.state = create_state_store(
+            Config.STATE_BACKEND,
+            db_path=Config.STATE_DB_PATH,
+            redis_url=Config.REDIS_URL,
+            prefix=Config.REDIS_KEY_PREFIX,
+        )
+        self.state.register(
+            THREADS,
+            max_size=Config.MAX_ACTIVE_THREADS,
+            ttl=Config.THREAD_TTL_SEC,
+            on_evict=self._on_thread_evicted,
+            can_evict=lambda _, thread: thread.get("status") not in BUSY_STATUSES,
+        )
+        self.state.register(
+            INTERRUPTS,
+            max_size=Config.MAX_PENDING_INTERRUPTS,
+            ttl=Config.INTERRUPT_TTL_SEC,
+            on_evict=self._on_interrupt_evicted,
+        )
+        self.admission = AdmissionController(
+            max_concurrent=Config.MAX_CONCURRENT_RUNS,
+            max_queue=Config.MAX_QUEUED_RUNS,
+            queue_timeout=Config.QUEUE_TIMEOUT_SEC,
+        )
+        self.jobs = JobManager(
+            source=self.stream_chat_events,
+            workers=Config.JOB_WORKERS,
+            max_queue=Config.MAX_QUEUED_JOBS,
+            ttl=Config.JOB_TTL_SEC,
+            max_jobs=Config.MAX_JOBS,
+            max_events=Config.JOB_MAX_EVENTS,
+        )
+        self.titles = TitleCache(Config.TITLE_CACHE_PATH)
+        self._title_tasks: Dict[str, asyncio.Task] = {}
+        self._title_semaphore = asyncio.Semaphore(Config.TITLE_CONCURRENCY)
+        self._title_client: Optional[openai.AsyncOpenAI] = None
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self._background_tasks: set = set()
+        self._callbacks = [metrics.MetricsCallbackHandler()]
     
     async def initialize(self):
-        """Initialize the agent graph"""
-        if self.graph is None:
+        """
+        Initialize the agent graph and background services.
+        
+        The graph is built in a background task while the rest starts; with
+        BACKGROUND_STARTUP this returns before it is done, and requests that
+        arrive meanwhile wait for it.
+        """
+        if self.graph is None and self._graph_task is None:
             logger.info("Initializing agent graph...")
-            self.graph = await build_graph()
-            logger.info("Agent graph initialized successfully")
+            self._graph_task = asyncio.create_task(self._build_graph())
+        
+        await self.titles.load()
+        self.jobs.start()
+        
+        if self._sweeper_task is None:
+            self._sweeper_task = asyncio.create_task(self._sweep_loop())
+        
+        if not Config.BACKGROUND_STARTUP:
+            await self.wait_until_ready()
+    
+    async def _build_graph(self):
+        start = time.perf_counter()
+        try:
+            graph = await build_graph(self.startup_timings)
+        except Exception as e:
+            logger.exception(f"Agent graph initialization failed: {e}")
+            raise
+        self.startup_timings["total"] = time.perf_counter() - start
+        self.graph = graph
+        logger.info(f"Agent graph initialized successfully in {self.startup_timings['total']:.2f}s")
+    
+    async def wait_until_ready(self):
+        """Wait for the agent graph, raising if it failed or is not done in time"""
+        if self.graph is not None:
+            return
+        if self._graph_task is None:
+            raise RuntimeError("Agent service is not initialized")
+        try:
+            await asyncio.wait_for(asyncio.shield(self._graph_task), Config.STARTUP_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            raise RuntimeError("Agent graph is still starting, try again later")
+        except Exception as e:
+            raise RuntimeError(f"Agent graph failed to initialize: {e}")
+    
+    def readiness(self) -> Dict[str, Any]:
+        """Startup status of the agent graph: starting, ready or failed"""
+        result: Dict[str, Any] = {
+            "status": "starting",
+            "startup": {name: round(seconds, 3) for name, seconds in self.startup_timings.items()},
+        }
+        if self.graph is not None:
+            result["status"] = "ready"
+        elif self._graph_task is not None and self._graph_task.done():
+            result["status"] = "failed"
+            if not self._graph_task.cancelled():
+                result["error"] = str(self._graph_task.exception())
+        return result
+    
+    async def shutdown(self):
+        """Stop background maintenance tasks"""
+        if self._graph_task is not None and not self._graph_task.done():
+            self._graph_task.cancel()
+        
+        await self.jobs.stop()
+        
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+        
+        checkpointer = getattr(self.graph, "checkpointer", None)
+        if checkpointer is not None and hasattr(checkpointer, "aclose"):
+            await checkpointer.aclose()
+        
+        if hasattr(Agents.summarizer, "aclose"):
+            await Agents.summarizer.aclose()
+        
+        await self.state.close()
+        await aclose_http_clients()
     
     async def chat(self, request: ChatRequest) -> ChatResponse:
         """Process a chat request and return response"""
         thread_id = request.thread_id or str(uuid.uuid4())
         
+        async with self.admission.admit(thread_id):
+            return await self._run_chat(request, thread_id)
+    
+    async def _run_chat(self, request: ChatRequest, thread_id: str) -> ChatResponse:
         # Track thread
-        self.active_threads[thread_id] = {
+        thread = await self.state.get(THREADS, thread_id) or {}
+        await self.state.set(THREADS, thread_id, {
             "status": "processing",
-            "message_count": self.active_threads.get(thread_id, {}).get("message_count", 0) + 1
-        }
+            "message_count": thread.get("message_count", 0) + 1
+        })
         
         config: RunnableConfig = {
             "recursion_limit": Config.RECURSION_LIMIT,
@@ -43,40 +194,44 @@ class AgentService:
         }
         
         response_content = ""
+        finished = False
         
         try:
+            await self.wait_until_ready()
             async for chunk in self.graph.astream(
                 {"messages": [HumanMessage(content=request.message)]},
-                config=config,
+                config=self._with_callbacks(config),
             ):
                 if "__interrupt__" in chunk:
                     interrupts = chunk.get("__interrupt__") or []
-                    interrupt = interrupts[0] if interrupts else None
-                    if interrupt:
-                        interrupt_id = str(uuid.uuid4())
-                        self.pending_interrupts[interrupt_id] = {
-                            "thread_id": thread_id,
-                            "interrupt": interrupt,
-                            "config": config
-                        }
-                        self.active_threads[thread_id]["status"] = "interrupted"
+                    if interrupts:
+                        interrupt_id, actions = await self._register_interrupt(thread_id, interrupts, config)
+                        finished = True
+                        self.schedule_title(thread_id)
                         
                         # Return interrupt information to frontend
                         return ChatResponse(
                             response="",
                             thread_id=thread_id,
                             interrupt_id=interrupt_id,
-                            interrupt_description=interrupt.value.get("description", "Action requires approval"),
-                            interrupt_action=interrupt.value.get("action_request", {}),
+                            interrupt_description=actions[0]["description"],
+                            interrupt_action=actions[0]["action_request"],
+                            interrupt_actions=actions,
                             requires_approval=True
                         )
                 else:
                     for node_name, node_data in chunk.items():
-                        if "messages" in node_data:
-                            if hasattr(node_data['messages'], 'content'):
-                                response_content += node_data['messages'].content
+                        if node_data and "messages" in node_data:
+                            messages = node_data['messages']
+                            # Nodes that return several messages end with the answer
+                            if isinstance(messages, list):
+                                messages = messages[-1] if messages else None
+                            if hasattr(messages, 'content'):
+                                response_content += messages.content
             
-            self.active_threads[thread_id]["status"] = "completed"
+            await self.state.update(THREADS, thread_id, status="completed")
+            finished = True
+            self.schedule_title(thread_id)
             return ChatResponse(
                 response=response_content, 
                 thread_id=thread_id,
@@ -84,187 +239,587 @@ class AgentService:
             )
             
         except Exception as e:
-            self.active_threads[thread_id]["status"] = "error"
+            await self.state.update(THREADS, thread_id, status="error")
+            finished = True
             logger.error(f"Error in chat processing: {str(e)}")
             raise
+        finally:
+            await self._release_abandoned(thread_id, finished)
     
     async def stream_chat(self, request: ChatRequest) -> AsyncGenerator[str, None]:
-        """Stream chat responses"""
-        thread_id = request.thread_id or str(uuid.uuid4())
+        """Stream chat responses as Server-Sent Events"""
+        async with aclosing(self.stream_chat_events(request)) as run:
+            async for event in run:
+                yield format_sse(event)
+    
+    async def stream_chat_events(
+        self, request: ChatRequest, thread_id: Optional[str] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream chat responses as typed event dicts"""
+        thread_id = thread_id or request.thread_id or str(uuid.uuid4())
         
+        try:
+            # Close the run as soon as the client goes, not when it is collected
+            run = self._run_stream_chat(request, thread_id)
+            async with self.admission.admit(thread_id), aclosing(run):
+                async for event in run:
+                    yield event
+        except AdmissionRejected as e:
+            yield make_event(
+                events.ERROR, thread_id=thread_id, error=str(e), retry_after=e.retry_after
+            )
+    
+    async def _run_stream_chat(
+        self, request: ChatRequest, thread_id: str
+    ) -> AsyncGenerator[Dict[str, Any], None]:
         # Track thread
-        self.active_threads[thread_id] = {
+        thread = await self.state.get(THREADS, thread_id) or {}
+        await self.state.set(THREADS, thread_id, {
             "status": "streaming",
-            "message_count": self.active_threads.get(thread_id, {}).get("message_count", 0) + 1
-        }
+            "message_count": thread.get("message_count", 0) + 1
+        })
         
         config: RunnableConfig = {
             "recursion_limit": Config.RECURSION_LIMIT,
             "thread_id": thread_id,
         }
         
+        finished = False
+        
         try:
-            async for chunk in self.graph.astream(
+            async for event in self._stream_graph_events(
                 {"messages": [HumanMessage(content=request.message)]},
-                config=config,
+                config,
+                thread_id,
             ):
-                if "__interrupt__" in chunk:
-                    interrupts = chunk.get("__interrupt__") or []
-                    interrupt = interrupts[0] if interrupts else None
-                    if interrupt:
-                        interrupt_id = str(uuid.uuid4())
-                        self.pending_interrupts[interrupt_id] = {
-                            "thread_id": thread_id,
-                            "interrupt": interrupt,
-                            "config": config
-                        }
-                        self.active_threads[thread_id]["status"] = "interrupted"
-                        
-                        # Send interrupt information as SSE
-                        interrupt_data = {
-                            "type": "interrupt",
-                            "interrupt_id": interrupt_id,
-                            "thread_id": thread_id,
-                            "description": interrupt.value.get("description", "Action requires approval"),
-                            "action_request": interrupt.value.get("action_request", {}),
-                            "requires_approval": True
-                        }
-                        yield f"data: {interrupt_data}\n\n"
-                        break
-                else:
-                    for node_name, node_data in chunk.items():
-                        if "messages" in node_data:
-                            if hasattr(node_data['messages'], 'content'):
-                                content = str(node_data['messages'].content).replace('"', '\\"')
-                                yield f'data: {{"type": "content", "content": "{content}"}}\n\n'
+                if event["type"] == events.INTERRUPT:
+                    # The interrupt is registered and the thread marked interrupted
+                    finished = True
+                yield event
+                if finished:
+                    self.schedule_title(thread_id)
+                    return
             
-            if thread_id in self.active_threads and self.active_threads[thread_id]["status"] != "interrupted":
-                self.active_threads[thread_id]["status"] = "completed"
-                yield f'data: {{"type": "done", "thread_id": "{thread_id}"}}\n\n'
+            await self.state.update(THREADS, thread_id, status="completed")
+            finished = True
+            self.schedule_title(thread_id)
+            yield make_event(events.DONE, thread_id=thread_id)
             
         except Exception as e:
-            self.active_threads[thread_id]["status"] = "error"
+            await self.state.update(THREADS, thread_id, status="error")
+            finished = True
             logger.error(f"Error in streaming: {str(e)}")
-            yield f'data: {{"type": "error", "error": "{str(e)}"}}\n\n'
+            yield make_event(events.ERROR, thread_id=thread_id, error=str(e))
+        finally:
+            await self._release_abandoned(thread_id, finished)
+    
+    async def _stream_graph_events(
+        self, graph_input: Any, config: RunnableConfig, thread_id: str
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Run the graph and translate its output into typed stream events.
+
+        LLM tokens come from the "messages" stream mode so they reach the client
+        as soon as the model produces them. Tool calls and interrupts come from
+        the "updates" mode of the executor subgraph and the root graph.
+        """
+        streamed_ids = set()
+        await self.wait_until_ready()
+        
+        async for namespace, mode, chunk in self.graph.astream(
+            graph_input,
+            config=self._with_callbacks(config),
+            stream_mode=["messages", "updates"],
+            subgraphs=True,
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") in SILENT_NODES:
+                    continue
+                # Agents invoked inside a silent node stream under its namespace
+                if namespace and namespace[0].split(":")[0] in SILENT_NODES:
+                    continue
+                if not isinstance(message, AIMessage):
+                    continue
+                # Non-streaming models emit the full message once; skip repeats
+                if not isinstance(message, AIMessageChunk):
+                    if message.id in streamed_ids:
+                        continue
+                streamed_ids.add(message.id)
+                
+                content = message.text()
+                if content:
+                    yield make_event(events.TOKEN, thread_id=thread_id, content=content)
+                continue
+            
+            if "__interrupt__" in chunk:
+                # The interrupt bubbles up from the subgraph; report it once at the root
+                if namespace:
+                    continue
+                interrupts = chunk.get("__interrupt__") or []
+                if interrupts:
+                    interrupt_id, actions = await self._register_interrupt(thread_id, interrupts, config)
+                    yield make_event(
+                        events.INTERRUPT,
+                        interrupt_id=interrupt_id,
+                        thread_id=thread_id,
+                        description=actions[0]["description"],
+                        action_request=actions[0]["action_request"],
+                        actions=actions,
+                        requires_approval=True,
+                    )
+                continue
+            
+            if not namespace and not TOOL_NODES.intersection(chunk):
+                continue
+            
+            for node_data in chunk.values():
+                if not isinstance(node_data, dict):
+                    continue
+                node_messages = node_data.get("messages") or []
+                if not isinstance(node_messages, list):
+                    node_messages = [node_messages]
+                
+                for message in node_messages:
+                    if isinstance(message, AIMessage):
+                        for tool_call in message.tool_calls:
+                            yield make_event(
+                                events.TOOL_START,
+                                thread_id=thread_id,
+                                tool=tool_call["name"],
+                                tool_call_id=tool_call["id"],
+                                args=tool_call["args"],
+                            )
+                    elif isinstance(message, ToolMessage):
+                        yield make_event(
+                            events.TOOL_END,
+                            thread_id=thread_id,
+                            tool=message.name,
+                            tool_call_id=message.tool_call_id,
+                            status=message.status,
+                            content=message.text(),
+                        )
+    
+    def _with_callbacks(self, config: RunnableConfig) -> RunnableConfig:
+        """Attach the metrics callbacks to a run; stored configs stay serializable"""
+        return {**config, "callbacks": self._callbacks}
+    
+    async def _register_interrupt(
+        self, thread_id: str, interrupts: List[Any], config: RunnableConfig
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Store the pending interrupts of a step as one batch and mark the thread
+        as interrupted.
+
+        Parallel tool calls that need approval interrupt together; each becomes
+        an action the user can approve or deny on its own.
+        """
+        interrupt_id = str(uuid.uuid4())
+        actions = [
+            {
+                "action_id": interrupt.id,
+                "description": interrupt.value.get("description", "Action requires approval"),
+                "action_request": interrupt.value.get("action_request", {}),
+            }
+            for interrupt in interrupts
+        ]
+        # Only the payload is stored; resuming needs nothing but the thread's
+        # checkpoints, so any worker can resolve the interrupt
+        await self.state.set(INTERRUPTS, interrupt_id, {
+            "thread_id": thread_id,
+            "value": interrupts[0].value,
+            "actions": actions,
+            "config": config,
+            "created_at": time.time()
+        })
+        await self.state.update(THREADS, thread_id, status="interrupted")
+        return interrupt_id, actions
     
-    async def resolve_interrupt(self, interrupt_id: str, approved: bool, thread_id: str) -> str:
+    async def _release_abandoned(self, thread_id: str, finished: bool):
+        """
+        Mark a thread whose run ended without a final status as abandoned.
+        
+        A client that disconnects ends the run with GeneratorExit or
+        CancelledError, which skip the error handlers; a thread left busy
+        would never be evicted.
+        """
+        if finished:
+            return
+        try:
+            await self.state.update(THREADS, thread_id, status="abandoned")
+        except Exception as e:
+            logger.error(f"Failed to release abandoned thread {thread_id}: {e}")
+    
+    async def _interrupt_pending(self, thread_id: str, interrupt_data: Dict[str, Any], resumed: bool) -> bool:
+        """
+        Whether a failed or abandoned resolution can be offered again.
+        
+        Once a resumed event has arrived the approved calls may have run, even
+        though the checkpoint still shows the interrupt until the node
+        completes; offering the batch again would run them twice.
+        """
+        if resumed:
+            return False
+        try:
+            state = await self.graph.aget_state({"configurable": {"thread_id": thread_id}})
+        except Exception as e:
+            logger.error(f"Failed to read the interrupts of thread {thread_id}: {e}")
+            return True
+        pending = {interrupt.id for interrupt in state.interrupts}
+        actions = interrupt_data.get("actions")
+        if not actions:
+            return bool(pending)
+        return any(action["action_id"] in pending for action in actions)
+    
+    async def resolve_interrupt(
+        self,
+        interrupt_id: str,
+        approved: bool,
+        thread_id: str,
+        decisions: Optional[Dict[str, bool]] = None,
+    ) -> str:
         """Resolve a pending interrupt with user approval"""
-        if interrupt_id not in self.pending_interrupts:
+        interrupt_data = await self.state.get(INTERRUPTS, interrupt_id)
+        if interrupt_data is None:
+            raise ValueError("Interrupt not found")
+        self._check_interrupt_thread(interrupt_data, thread_id)
+        
+        response_content = ""
+        
+        async with self.admission.admit(thread_id):
+            async for event in self._run_resolve_interrupt(interrupt_id, approved, thread_id, decisions):
+                if event["type"] == events.TOKEN:
+                    response_content += event["content"]
+        
+        return response_content
+    
+    async def stream_resolve_interrupt(
+        self,
+        interrupt_id: str,
+        approved: bool,
+        thread_id: str,
+        decisions: Optional[Dict[str, bool]] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Resolve a pending interrupt and stream the resumed run as Server-Sent Events"""
+        try:
+            run = self._run_resolve_interrupt(interrupt_id, approved, thread_id, decisions)
+            async with self.admission.admit(thread_id), aclosing(run):
+                async for event in run:
+                    yield format_sse(event)
+        except AdmissionRejected as e:
+            yield format_sse(make_event(
+                events.ERROR, thread_id=thread_id, error=str(e), retry_after=e.retry_after
+            ))
+        except Exception as e:
+            yield format_sse(make_event(events.ERROR, thread_id=thread_id, error=str(e)))
+    
+    async def _run_resolve_interrupt(
+        self,
+        interrupt_id: str,
+        approved: bool,
+        thread_id: str,
+        decisions: Optional[Dict[str, bool]] = None,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        # Claim the interrupt so that only one request, on any worker, resumes it.
+        # It may also have been resolved while this request was queued.
+        interrupt_data = await self.state.delete(INTERRUPTS, interrupt_id)
+        if interrupt_data is None:
             raise ValueError("Interrupt not found")
         
-        interrupt_data = self.pending_interrupts[interrupt_id]
         config = interrupt_data["config"]
+        resolved = False
+        resumed = False
+        finished = False
         
-        response_content = ""
+        try:
+            self._check_interrupt_thread(interrupt_data, thread_id)
+            command, decision = self._resume_command(interrupt_data, approved, decisions)
+        except ValueError:
+            await self.state.set(INTERRUPTS, interrupt_id, interrupt_data)
+            raise
+        
+        if "created_at" in interrupt_data:
+            metrics.INTERRUPT_WAIT.labels(decision=decision).observe(
+                time.time() - interrupt_data["created_at"]
+            )
+        
+        # The thread entry may have been evicted while waiting for approval
+        await self.state.update(THREADS, thread_id, status="resolving")
         
         try:
-            self.active_threads[thread_id]["status"] = "resolving"
-            
-            # Resume with user's decision
-            resolution = "y" if approved else "n"
+            # Resume with user's decisions; approved calls of the batch run concurrently
+            interrupted = False
             
-            async for message_chunk, metadata in self.graph.astream(
-                Command(resume={"type": resolution}),
-                stream_mode="messages",
-                config=config,
-            ):
-                if message_chunk.content:
-                    response_content += message_chunk.content
-            
-            # Clean up
-            del self.pending_interrupts[interrupt_id]
-            self.active_threads[thread_id]["status"] = "completed"
+            async for event in self._stream_graph_events(command, config, thread_id):
+                resumed = True
+                if event["type"] == events.INTERRUPT:
+                    interrupted = True
+                yield event
             
-            return response_content
+            resolved = True
+            if not interrupted:
+                await self.state.update(THREADS, thread_id, status="completed")
+            finished = True
+            if not interrupted:
+                yield make_event(events.DONE, thread_id=thread_id)
             
         except Exception as e:
-            self.active_threads[thread_id]["status"] = "error"
+            await self.state.update(THREADS, thread_id, status="error")
+            finished = True
             logger.error(f"Error resolving interrupt: {str(e)}")
             raise
+        finally:
+            # Leave a failed or abandoned resolution pending so it can be retried,
+            # unless the graph has already moved past the interrupt
+            if not resolved and await self._interrupt_pending(thread_id, interrupt_data, resumed):
+                await self.state.set(INTERRUPTS, interrupt_id, interrupt_data)
+            await self._release_abandoned(thread_id, finished)
     
-    def get_interrupt(self, interrupt_id: str) -> Optional[Dict]:
+    @staticmethod
+    def _check_interrupt_thread(interrupt_data: Dict[str, Any], thread_id: str):
+        """The resume runs on the interrupt's own thread; status and admission must follow it"""
+        if interrupt_data["thread_id"] != thread_id:
+            raise ValueError("Interrupt does not belong to this thread")
+    
+    @staticmethod
+    def _resume_command(
+        interrupt_data: Dict[str, Any], approved: bool, decisions: Optional[Dict[str, bool]]
+    ) -> Tuple[Command, str]:
+        """Build the resume command of an interrupt batch and label its overall decision"""
+        actions = interrupt_data.get("actions")
+        decisions = decisions or {}
+        if not actions:
+            # Recorded before interrupts were batched: a single pending call
+            return Command(resume={"type": "y" if approved else "n"}), "approved" if approved else "denied"
+        
+        action_ids = {action["action_id"] for action in actions}
+        unknown = set(decisions) - action_ids
+        if unknown:
+            raise ValueError(f"Unknown action ids: {', '.join(sorted(unknown))}")
+        
+        allowed = {action_id: decisions.get(action_id, approved) for action_id in action_ids}
+        command = Command(resume={
+            action_id: {"type": "y" if allow else "n"} for action_id, allow in allowed.items()
+        })
+        if all(allowed.values()):
+            return command, "approved"
+        if not any(allowed.values()):
+            return command, "denied"
+        return command, "partial"
+    
+    async def get_interrupt(self, interrupt_id: str) -> Optional[Dict]:
         """Get interrupt details"""
-        interrupt_data = self.pending_interrupts.get(interrupt_id)
+        interrupt_data = await self.state.get(INTERRUPTS, interrupt_id)
         if not interrupt_data:
             return None
         
         return {
             "interrupt_id": interrupt_id,
             "thread_id": interrupt_data["thread_id"],
-            "description": interrupt_data["interrupt"].value.get("description"),
-            "action_request": interrupt_data["interrupt"].value.get("action_request", {})
+            "description": interrupt_data["value"].get("description"),
+            "action_request": interrupt_data["value"].get("action_request", {}),
+            "actions": interrupt_data.get("actions", [])
         }
     
-    def get_all_interrupts(self) -> list:
+    async def get_all_interrupts(self) -> list:
         """Get all pending interrupts"""
         return [
             {
                 "interrupt_id": interrupt_id,
                 "thread_id": data["thread_id"],
-                "description": data["interrupt"].value.get("description"),
-                "action_request": data["interrupt"].value.get("action_request", {})
+                "description": data["value"].get("description"),
+                "action_request": data["value"].get("action_request", {}),
+                "actions": data.get("actions", [])
             }
-            for interrupt_id, data in self.pending_interrupts.items()
+            for interrupt_id, data in await self.state.items(INTERRUPTS)
         ]
     
-    def get_thread_status(self, thread_id: str) -> Optional[Dict]:
+    async def get_thread_status(self, thread_id: str) -> Optional[Dict]:
         """Get thread status"""
-        return self.active_threads.get(thread_id)
+        return await self.state.get(THREADS, thread_id)
     
-    def get_all_threads(self) -> Dict[str, Dict]:
+    async def get_all_threads(self) -> Dict[str, Dict]:
         """Get all threads"""
-        return self.active_threads
+        return dict(await self.state.items(THREADS))
+    
+    def get_admission_stats(self) -> Dict[str, Any]:
+        """Get concurrency, queue depth and wait time of graph runs"""
+        return self.admission.stats()
+    
+    async def get_registry_stats(self) -> Dict[str, Any]:
+        """Get size and eviction counters of the thread and interrupt registries"""
+        return {
+            "backend": Config.STATE_BACKEND,
+            "threads": await self.state.stats(THREADS),
+            "interrupts": await self.state.stats(INTERRUPTS),
+        }
+    
+    def get_tool_cache_stats(self) -> Dict[str, Any]:
+        """Get size and hit rate of the tool result cache"""
+        return TOOL_CACHE.stats()
+    
+    def get_tool_output_stats(self) -> Dict[str, Any]:
+        """Get size of the store of tool outputs too long for the model"""
+        return SPILL_STORE.stats()
     
-    def delete_thread(self, thread_id: str) -> bool:
+    def get_answer_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get size and hit rate of the semantic answer cache, None when disabled"""
+        if Agents.answer_cache is None:
+            return None
+        return Agents.answer_cache.stats()
+    
+    async def delete_thread(self, thread_id: str) -> bool:
         """Delete a thread and clean up"""
         deleted = False
         
-        if thread_id in self.active_threads:
-            del self.active_threads[thread_id]
+        if await self.state.delete(THREADS, thread_id) is not None:
             deleted = True
         
-        # Clean up interrupts for this thread
-        to_remove = [
-            interrupt_id for interrupt_id, data in self.pending_interrupts.items()
-            if data["thread_id"] == thread_id
-        ]
-        for interrupt_id in to_remove:
-            del self.pending_interrupts[interrupt_id]
+        if await self._drop_thread_interrupts(thread_id):
             deleted = True
         
+        if deleted:
+            self._release_checkpoints(thread_id)
+            self._spawn(self.titles.delete(thread_id))
+        
         return deleted
     
+    async def _drop_thread_interrupts(self, thread_id: str) -> int:
+        """Remove all pending interrupts of a thread"""
+        dropped = 0
+        for interrupt_id, data in await self.state.items(INTERRUPTS):
+            if data["thread_id"] == thread_id:
+                if await self.state.delete(INTERRUPTS, interrupt_id) is not None:
+                    dropped += 1
+        return dropped
+    
+    def _on_thread_evicted(self, thread_id: str, thread: Dict, reason: str):
+        logger.info(f"Evicting thread {thread_id} ({reason})")
+        self._spawn(self._drop_thread_interrupts(thread_id))
+        self._release_checkpoints(thread_id)
+        self._spawn(self.titles.delete(thread_id))
+    
+    def _on_interrupt_evicted(self, interrupt_id: str, data: Dict, reason: str):
+        logger.info(f"Evicting interrupt {interrupt_id} of thread {data.get('thread_id')} ({reason})")
+        if data.get("thread_id"):
+            self._spawn(self._expire_thread(data["thread_id"]))
+    
+    async def _expire_thread(self, thread_id: str):
+        """Mark a thread whose pending interrupt was evicted as expired"""
+        thread = await self.state.get(THREADS, thread_id)
+        if thread is not None and thread.get("status") == "interrupted":
+            await self.state.update(THREADS, thread_id, status="expired")
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it ends"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coro.close()
+            return
+        task = loop.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    def _release_checkpoints(self, thread_id: str):
+        """Schedule deletion of a thread's checkpoints"""
+        checkpointer = getattr(self.graph, "checkpointer", None)
+        if not checkpointer:
+            return
+        self._spawn(self._delete_checkpoints(checkpointer, thread_id))
+    
+    async def _delete_checkpoints(self, checkpointer: Any, thread_id: str):
+        try:
+            await checkpointer.adelete_thread(thread_id)
+        except Exception as e:
+            logger.warning(f"Failed to release checkpoints for thread {thread_id}: {str(e)}")
+    
+    async def _sweep_loop(self):
+        """Periodically evict expired threads and interrupts"""
+        while True:
+            await asyncio.sleep(Config.REGISTRY_SWEEP_INTERVAL_SEC)
+            try:
+                expired_interrupts = await self.state.sweep(INTERRUPTS)
+                expired_threads = await self.state.sweep(THREADS)
+                self.jobs.jobs.sweep()
+                if expired_interrupts or expired_threads:
+                    logger.info(
+                        f"Registry sweep evicted {expired_threads} threads, "
+                        f"{expired_interrupts} interrupts"
+                    )
+            except Exception as e:
+                logger.error(f"Registry sweep failed: {str(e)}")
+    
+    def get_chat_title(self, thread_id: str) -> Optional[str]:
+        """Get the cached title of a thread, if one was generated"""
+        return self.titles.get(thread_id)
+    
+    def fill_missing_titles(self, thread_ids) -> int:
+        """Generate titles for uncached threads in the background"""
+        missing = self.titles.missing(thread_ids)
+        for thread_id in missing:
+            self.schedule_title(thread_id)
+        return len(missing)
+    
+    def schedule_title(self, thread_id: str) -> Optional[asyncio.Task]:
+        """Start generating a thread's title unless it is cached or in progress"""
+        if self.titles.get(thread_id):
+            return None
+        task = self._title_tasks.get(thread_id)
+        if task is None:
+            task = asyncio.create_task(self._build_title(thread_id))
+            self._title_tasks[thread_id] = task
+            task.add_done_callback(lambda _: self._title_tasks.pop(thread_id, None))
+        return task
+    
     async def generate_chat_title(self, thread_id: str) -> str:
+        """Get a thread's title, generating and caching it if needed"""
+        title = self.titles.get(thread_id)
+        if title:
+            return title
+        return await asyncio.shield(self.schedule_title(thread_id))
+    
+    async def _build_title(self, thread_id: str) -> str:
+        async with self._title_semaphore:
+            title = await self._request_title(thread_id)
+        if not title:
+            return f"Chat {thread_id[:8]}"
+        await self.titles.put(thread_id, title)
+        return title
+    
+    async def _request_title(self, thread_id: str) -> Optional[str]:
         """
         Generate a title for a chat thread based on its messages using OpenAI API
         """
         try:
-            # Get the thread and its messages
-            thread_status = self.get_thread_status(thread_id)
-            if not thread_status or not thread_status.get("messages"):
-                return f"Chat {thread_id[:8]}"
-                
-            messages = thread_status["messages"]
+            # Get the thread's messages from its latest checkpoint
+            await self.wait_until_ready()
+            state = await self.graph.aget_state({"configurable": {"thread_id": thread_id}})
+            messages = state.values.get("messages", []) if state else []
             
             # Get the first few user messages to generate a meaningful title
             user_messages = []
             for msg in messages[:10]:  # Look at first 10 messages
-                if msg.get("type") == "human" or msg.get("role") == "user":
-                    content = msg.get("content") or msg.get("text", "")
+                if isinstance(msg, HumanMessage):
+                    content = msg.text()
                     if content and len(content.strip()) > 0:
                         user_messages.append(content.strip())
                         
             if not user_messages:
-                return f"Chat {thread_id[:8]}"
+                return None
                 
             # Combine first few messages for title generation
             combined_text = " ".join(user_messages[:3])[:500]  # Limit to 500 chars
             
-            # Use OpenAI to generate the title
-            client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            # Use OpenAI to generate the title, reusing one client and the shared connection pool
+            if self._title_client is None:
+                self._title_client = openai.AsyncOpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=get_async_http_client(),
+                )
             
-            response = await client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            response = await self._title_client.chat.completions.create(
+                model=Config.TITLE_MODEL,
                 messages=[
                     {
                         "role": "user", 
@@ -284,8 +839,8 @@ class AgentService:
             if len(title) > 50:
                 title = title[:47] + "..."
                 
-            return title or f"Chat {thread_id[:8]}"
+            return title or None
             
         except Exception as e:
             logger.error(f"Error generating chat title for thread {thread_id}: {str(e)}")
-            return f"Chat {thread_id[:8]}"
\ No newline at end of file
+            return None
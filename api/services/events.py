@@ -0,0 +1,23 @@
+import json
+from typing import Any, Dict
+
+# Event types emitted on the streaming endpoints
+TOKEN = "token"
+TOOL_START = "tool_start"
+TOOL_END = "tool_end"
+INTERRUPT = "interrupt"
+DONE = "done"
+ERROR = "error"
+
+EVENT_TYPES = (TOKEN, TOOL_START, TOOL_END, INTERRUPT, DONE, ERROR)
+
+def make_event(event_type: str, **data: Any) -> Dict[str, Any]:
+    """Build a typed stream event"""
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type: {event_type}")
+    return {"type": event_type, **data}
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Frame an event as a Server-Sent Event with a JSON payload"""
+    payload = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
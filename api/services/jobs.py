@@ -0,0 +1,209 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from api.models import ChatRequest
+from api.services import events
+from api.services.admission import AdmissionRejected
+from api.services.registry import ExpiringRegistry
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+INTERRUPTED = "interrupted"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINAL_STATUSES = {INTERRUPTED, COMPLETED, FAILED, CANCELLED}
+
+EventSource = Callable[[ChatRequest, str], AsyncGenerator[Dict[str, Any], None]]
+
+class Job:
+    """A chat turn running in the background, with its result and progress events"""
+
+    def __init__(self, request: ChatRequest, thread_id: str, max_events: int):
+        self.job_id = str(uuid.uuid4())
+        self.request = request
+        self.thread_id = thread_id
+        self.status = QUEUED
+        self.result = ""
+        self.error: Optional[str] = None
+        self.interrupt: Optional[Dict[str, Any]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: deque = deque(maxlen=max_events)
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def publish(self, event: Dict[str, Any]):
+        self.events.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    async def subscribe(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """Replay past events, then follow live ones until the job finishes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in list(self.events):
+            queue.put_nowait(event)
+        if self.done:
+            queue.put_nowait(None)
+        self._subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._subscribers.remove(queue)
+
+    def close(self):
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "interrupt": self.interrupt,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+class JobManager:
+    """
+    Bounded background executor for chat turns.
+
+    A fixed pool of workers consumes a bounded queue, so at most `workers`
+    jobs run at once and at most `max_queue` wait. Finished jobs are kept for
+    `ttl` seconds so clients can collect their results.
+    """
+
+    def __init__(
+        self,
+        source: EventSource,
+        workers: int,
+        max_queue: int,
+        ttl: float,
+        max_jobs: int,
+        max_events: int,
+    ):
+        self.source = source
+        self.workers = workers
+        self.max_events = max_events
+        self.jobs = ExpiringRegistry(
+            "jobs",
+            max_size=max_jobs,
+            ttl=ttl,
+            can_evict=lambda _, job: job.done,
+        )
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.workers)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, request: ChatRequest) -> Job:
+        thread_id = request.thread_id or str(uuid.uuid4())
+        job = Job(request, thread_id, self.max_events)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise AdmissionRejected(
+                "Too many queued jobs",
+                retry_after=max(1, self._queue.qsize() // self.workers),
+            )
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.status = CANCELLED
+        job.finished_at = time.time()
+        if job.task is not None:
+            job.task.cancel()
+        job.close()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "jobs": statuses,
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == CANCELLED:
+                    continue
+                # Run in a child task so cancelling a job leaves the worker alive
+                job.task = asyncio.create_task(self._run(job))
+                await asyncio.wait([job.task])
+            except asyncio.CancelledError:
+                if job.task is not None:
+                    job.task.cancel()
+                raise
+            except Exception as e:
+                logger.exception(f"Job worker {index} failed on job {job.job_id}: {str(e)}")
+            finally:
+                job.task = None
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            async for event in self.source(job.request, job.thread_id):
+                job.publish(event)
+                if event["type"] == events.TOKEN:
+                    job.result += event["content"]
+                elif event["type"] == events.INTERRUPT:
+                    job.interrupt = event
+                    job.status = INTERRUPTED
+                elif event["type"] == events.ERROR:
+                    job.error = event["error"]
+                    job.status = FAILED
+            if job.status == RUNNING:
+                job.status = COMPLETED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            job.publish(events.make_event(events.ERROR, thread_id=job.thread_id, error=str(e)))
+        finally:
+            job.finished_at = time.time()
+            job.close()
@@ -0,0 +1,184 @@
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langgraph.errors import GraphBubbleUp
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+
+# Seconds; tool calls and LLM turns range from milliseconds to minutes
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+# Seconds a human takes to answer an approval prompt
+INTERRUPT_WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 4 * 3600)
+
+NODE_DURATION = Histogram(
+    "agent_node_duration_seconds",
+    "Duration of a graph node run",
+    ["node", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+TOOL_DURATION = Histogram(
+    "agent_tool_duration_seconds",
+    "Duration of a tool call",
+    ["tool", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "agent_llm_time_to_first_token_seconds",
+    "Time from sending an LLM request to its first streamed token",
+    ["model", "node"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_DURATION = Histogram(
+    "agent_llm_duration_seconds",
+    "Total duration of an LLM request",
+    ["model", "node", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "agent_llm_tokens",
+    "Tokens consumed by LLM requests",
+    ["model", "node", "kind"],
+)
+INTERRUPT_WAIT = Histogram(
+    "agent_interrupt_wait_seconds",
+    "Time between raising an approval interrupt and its resolution",
+    ["decision"],
+    buckets=INTERRUPT_WAIT_BUCKETS,
+)
+ADMISSION_WAIT = Histogram(
+    "agent_admission_wait_seconds",
+    "Time a run waited for its thread's turn and a global slot",
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_REJECTED = Counter(
+    "agent_admission_rejected",
+    "Runs rejected by admission control",
+    ["reason"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "agent_requests_in_flight",
+    "Graph runs currently executing",
+    multiprocess_mode="livesum",
+)
+REQUESTS_QUEUED = Gauge(
+    "agent_requests_queued",
+    "Graph runs waiting for admission",
+    multiprocess_mode="livesum",
+)
+
+def render() -> Tuple[bytes, str]:
+    """Serialize all metrics in the Prometheus text format"""
+    # With several workers each process writes its own files; merge them on scrape
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+def _status(error: BaseException) -> str:
+    # Interrupts unwind the stack like errors but are part of normal control flow
+    return "interrupted" if isinstance(error, GraphBubbleUp) else "error"
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Records node, tool and LLM timings of graph runs.
+
+    Pass it in the `callbacks` of a run config; LangChain propagates it to
+    every node, subgraph, tool and chat model of the run. All hooks are cheap
+    and run inline on the event loop.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self._nodes: Dict[UUID, Tuple[str, float]] = {}
+        self._tools: Dict[UUID, Tuple[str, float]] = {}
+        # run_id -> [model, node, started_at, first_token_at]
+        self._llms: Dict[UUID, list] = {}
+
+    # ---- Graph nodes ----
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node's own run; runnables nested inside it share its metadata
+        if node and kwargs.get("name") == node:
+            self._nodes[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+        self._end_node(run_id, "ok")
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end_node(run_id, _status(error))
+
+    def _end_node(self, run_id: UUID, status: str):
+        entry = self._nodes.pop(run_id, None)
+        if entry is not None:
+            node, started_at = entry
+            NODE_DURATION.labels(node=node, status=status).observe(time.perf_counter() - started_at)
+
+    # ---- Tools ----
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs):
+        tool = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._tools[run_id] = (tool, time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id, "ok")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id, _status(error))
+
+    def _end_tool(self, run_id: UUID, status: str):
+        entry = self._tools.pop(run_id, None)
+        if entry is not None:
+            tool, started_at = entry
+            TOOL_DURATION.labels(tool=tool, status=status).observe(time.perf_counter() - started_at)
+
+    # ---- LLMs ----
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs):
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or kwargs.get("name") or "unknown"
+        node = metadata.get("langgraph_node", "")
+        self._llms[run_id] = [model, node, time.perf_counter(), None]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs):
+        entry = self._llms.get(run_id)
+        if entry is not None and entry[3] is None:
+            entry[3] = time.perf_counter()
+            LLM_TIME_TO_FIRST_TOKEN.labels(model=entry[0], node=entry[1]).observe(entry[3] - entry[2])
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        entry = self._llms.pop(run_id, None)
+        if entry is None:
+            return
+        model, node, started_at, first_token_at = entry
+        elapsed = time.perf_counter() - started_at
+        LLM_DURATION.labels(model=model, node=node, status="ok").observe(elapsed)
+        # Without streaming the first token arrives with the whole response
+        if first_token_at is None:
+            LLM_TIME_TO_FIRST_TOKEN.labels(model=model, node=node).observe(elapsed)
+
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    LLM_TOKENS.labels(model=model, node=node, kind="input").inc(usage.get("input_tokens", 0))
+                    LLM_TOKENS.labels(model=model, node=node, kind="output").inc(usage.get("output_tokens", 0))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        entry = self._llms.pop(run_id, None)
+        if entry is not None:
+            model, node, started_at, _ = entry
+            LLM_DURATION.labels(model=model, node=node, status="error").observe(time.perf_counter() - started_at)
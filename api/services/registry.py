@@ -0,0 +1,146 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Eviction reasons reported to callbacks and counters
+EVICT_CAPACITY = "capacity"
+EVICT_EXPIRED = "expired"
+
+_MISSING = object()
+
+class ExpiringRegistry:
+    """
+    Dict-like store with a size cap, LRU eviction and a per-entry TTL.
+
+    Reads and writes refresh an entry's position and expiry. When the registry
+    is full the least recently used entry is evicted; entries that outlive the
+    TTL are dropped lazily on access and eagerly by `sweep()`. Entries for
+    which `can_evict` returns False (e.g. threads that are mid-run) are never
+    evicted, so the cap is soft while they are busy.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[str, Any, str], None]] = None,
+        can_evict: Optional[Callable[[str, Any], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.can_evict = can_evict
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.evictions: Dict[str, int] = {EVICT_CAPACITY: 0, EVICT_EXPIRED: 0}
+
+    # ---- Dict interface ----
+    def __setitem__(self, key: str, value: Any):
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        self._enforce_capacity()
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key: str):
+        del self._entries[key]
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._is_expired(key, entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        if self._is_expired(key, entry):
+            self._evict(key, EVICT_EXPIRED)
+            return default
+        value, _ = entry
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        return value
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Read an entry without refreshing its recency or expiry"""
+        entry = self._entries.get(key)
+        if entry is None or self._is_expired(key, entry):
+            return default
+        return entry[0]
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Snapshot of live entries; does not refresh recency"""
+        return [(k, v) for k, (v, ts) in self._entries.items() if not self._is_expired(k, (v, ts))]
+
+    def keys(self) -> List[str]:
+        return [k for k, _ in self.items()]
+
+    def values(self) -> List[Any]:
+        return [v for _, v in self.items()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    # ---- Eviction ----
+    def sweep(self) -> int:
+        """Evict every expired entry. Returns the number of evicted entries."""
+        if self.ttl is None:
+            return 0
+        expired = [k for k, entry in self._entries.items() if self._is_expired(k, entry)]
+        for key in expired:
+            self._evict(key, EVICT_EXPIRED)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_sec": self.ttl,
+            "evictions": dict(self.evictions),
+        }
+
+    def _is_expired(self, key: str, entry: Tuple[Any, float]) -> bool:
+        if self.ttl is None or self._clock() - entry[1] <= self.ttl:
+            return False
+        return self._evictable(key, entry[0])
+
+    def _evictable(self, key: str, value: Any) -> bool:
+        return self.can_evict is None or self.can_evict(key, value)
+
+    def _enforce_capacity(self):
+        if len(self._entries) <= self.max_size:
+            return
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_size:
+                break
+            value, _ = self._entries[key]
+            if not self._evictable(key, value):
+                continue
+            self._evict(key, EVICT_CAPACITY)
+
+    def _evict(self, key: str, reason: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.evictions[reason] += 1
+        if self.on_evict is not None:
+            self.on_evict(key, entry[0], reason)
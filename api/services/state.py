@@ -0,0 +1,369 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from api.services.registry import EVICT_CAPACITY, EVICT_EXPIRED, ExpiringRegistry
+
+# on_evict(key, value, reason) / can_evict(key, value)
+EvictCallback = Callable[[str, Dict[str, Any], str], None]
+EvictFilter = Callable[[str, Dict[str, Any]], bool]
+
+class Namespace:
+    """Size limit, TTL and eviction hooks of one group of records"""
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[EvictCallback] = None,
+        can_evict: Optional[EvictFilter] = None,
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.can_evict = can_evict
+        self.evictions = {EVICT_CAPACITY: 0, EVICT_EXPIRED: 0}
+
+    def evictable(self, key: str, value: Dict[str, Any]) -> bool:
+        return self.can_evict is None or self.can_evict(key, value)
+
+    def evicted(self, key: str, value: Dict[str, Any], reason: str):
+        self.evictions[reason] += 1
+        if self.on_evict is None:
+            return
+        try:
+            self.on_evict(key, value, reason)
+        except Exception as e:
+            logger.error(f"on_evict callback failed for {self.name} entry {key}: {str(e)}")
+
+    def expires_at(self, now: float) -> float:
+        return now + self.ttl if self.ttl else float("inf")
+
+class StateStore(ABC):
+    """
+    Async store for JSON-serializable thread and interrupt records.
+
+    Records are grouped in namespaces, each with its own size limit and TTL.
+    Writing a record refreshes its TTL. `sweep` removes expired records and,
+    once the namespace is over capacity, the least recently written ones;
+    each removed record is reported to `on_evict` by exactly one worker.
+    """
+
+    # Whether records are visible to other processes
+    shared = False
+
+    def __init__(self):
+        self.namespaces: Dict[str, Namespace] = {}
+
+    def register(self, name: str, max_size: int, ttl: Optional[float] = None,
+                 on_evict: Optional[EvictCallback] = None,
+                 can_evict: Optional[EvictFilter] = None):
+        self.namespaces[name] = Namespace(name, max_size, ttl, on_evict, can_evict)
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: Dict[str, Any]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Remove a record and return it, or None if another worker got there first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def items(self, namespace: str) -> List[Tuple[str, Dict[str, Any]]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def sweep(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    async def update(self, namespace: str, key: str, **fields) -> Dict[str, Any]:
+        """Merge fields into a record, creating it if needed"""
+        value = await self.get(namespace, key) or {}
+        value.update(fields)
+        await self.set(namespace, key, value)
+        return value
+
+    async def stats(self, namespace: str) -> Dict[str, Any]:
+        ns = self.namespaces[namespace]
+        return {
+            "live": await self.count(namespace),
+            "max_size": ns.max_size,
+            "ttl_sec": ns.ttl,
+            "evictions": dict(ns.evictions),
+        }
+
+    async def close(self):
+        pass
+
+class MemoryStateStore(StateStore):
+    """In-process store; only valid with a single worker"""
+
+    def __init__(self):
+        super().__init__()
+        self._registries: Dict[str, ExpiringRegistry] = {}
+
+    def register(self, name, max_size, ttl=None, on_evict=None, can_evict=None):
+        super().register(name, max_size, ttl, on_evict, can_evict)
+        self._registries[name] = ExpiringRegistry(
+            name, max_size=max_size, ttl=ttl, on_evict=on_evict, can_evict=can_evict,
+        )
+
+    async def get(self, namespace, key):
+        value = self._registries[namespace].get(key)
+        return dict(value) if value is not None else None
+
+    async def set(self, namespace, key, value):
+        self._registries[namespace][key] = dict(value)
+
+    async def delete(self, namespace, key):
+        return self._registries[namespace].pop(key, None)
+
+    async def items(self, namespace):
+        return [(key, dict(value)) for key, value in self._registries[namespace].items()]
+
+    async def sweep(self, namespace):
+        return self._registries[namespace].sweep()
+
+    async def count(self, namespace):
+        return len(self._registries[namespace])
+
+    async def stats(self, namespace):
+        return self._registries[namespace].stats()
+
+class SqliteStateStore(StateStore):
+    """
+    File-backed store shared by all workers on one host.
+
+    Uses WAL mode so readers never block the writer. Deletes use RETURNING,
+    so when several workers sweep at once each record is evicted only once.
+    """
+
+    shared = True
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS state_expiry ON state (namespace, expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _get_sync(self, namespace, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_sync(self, namespace, key, value):
+        expires_at = self.namespaces[namespace].expires_at(time.time())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, default=str), expires_at),
+            )
+
+    def _delete_sync(self, namespace, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "DELETE FROM state WHERE namespace = ? AND key = ? RETURNING value",
+                (namespace, key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _items_sync(self, namespace):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, value FROM state WHERE namespace = ? AND expires_at > ? ORDER BY expires_at",
+                (namespace, time.time()),
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def _count_sync(self, namespace):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM state WHERE namespace = ? AND expires_at > ?",
+                (namespace, time.time()),
+            ).fetchone()[0]
+
+    def _sweep_sync(self, namespace) -> List[Tuple[str, Dict[str, Any], str]]:
+        ns = self.namespaces[namespace]
+        now = time.time()
+        evicted = []
+        with self._connect() as conn:
+            expired = conn.execute(
+                "SELECT key, value FROM state WHERE namespace = ? AND expires_at <= ?",
+                (namespace, now),
+            ).fetchall()
+            live = conn.execute(
+                "SELECT COUNT(*) FROM state WHERE namespace = ? AND expires_at > ?",
+                (namespace, now),
+            ).fetchone()[0]
+            excess = max(0, live - ns.max_size)
+            oldest = conn.execute(
+                "SELECT key, value FROM state WHERE namespace = ? AND expires_at > ? "
+                "ORDER BY expires_at LIMIT ?",
+                (namespace, now, excess),
+            ).fetchall() if excess else []
+
+            for rows, reason in ((expired, EVICT_EXPIRED), (oldest, EVICT_CAPACITY)):
+                for key, value in rows:
+                    value = json.loads(value)
+                    if not ns.evictable(key, value):
+                        continue
+                    removed = conn.execute(
+                        "DELETE FROM state WHERE namespace = ? AND key = ? RETURNING key",
+                        (namespace, key),
+                    ).fetchone()
+                    if removed:
+                        evicted.append((key, value, reason))
+        return evicted
+
+    async def get(self, namespace, key):
+        return await asyncio.to_thread(self._get_sync, namespace, key)
+
+    async def set(self, namespace, key, value):
+        await asyncio.to_thread(self._set_sync, namespace, key, value)
+
+    async def delete(self, namespace, key):
+        return await asyncio.to_thread(self._delete_sync, namespace, key)
+
+    async def items(self, namespace):
+        return await asyncio.to_thread(self._items_sync, namespace)
+
+    async def count(self, namespace):
+        return await asyncio.to_thread(self._count_sync, namespace)
+
+    async def sweep(self, namespace):
+        evicted = await asyncio.to_thread(self._sweep_sync, namespace)
+        ns = self.namespaces[namespace]
+        for key, value, reason in evicted:
+            ns.evicted(key, value, reason)
+        return len(evicted)
+
+class RedisStateStore(StateStore):
+    """
+    Store shared by workers on any number of hosts.
+
+    Each namespace is a hash of JSON records plus a sorted set of expiry
+    times. Only basic hash and sorted-set commands are used, so any
+    Redis-compatible server (Valkey, KeyDB, Dragonfly, fakeredis) works.
+    Expiry is enforced on read and by `sweep` rather than with key TTLs, so
+    expired records still reach `on_evict`.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str):
+        super().__init__()
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self.client = redis.from_url(url, decode_responses=True)
+
+    def _records(self, namespace: str) -> str:
+        return f"{self.prefix}:state:{namespace}"
+
+    def _expiry(self, namespace: str) -> str:
+        return f"{self.prefix}:state:{namespace}:expiry"
+
+    async def get(self, namespace, key):
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hget(self._records(namespace), key)
+            pipe.zscore(self._expiry(namespace), key)
+            value, expires_at = await pipe.execute()
+        if value is None or (expires_at is not None and expires_at <= time.time()):
+            return None
+        return json.loads(value)
+
+    async def set(self, namespace, key, value):
+        expires_at = self.namespaces[namespace].expires_at(time.time())
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._records(namespace), key, json.dumps(value, default=str))
+            pipe.zadd(self._expiry(namespace), {key: expires_at})
+            await pipe.execute()
+
+    async def delete(self, namespace, key):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hget(self._records(namespace), key)
+            pipe.hdel(self._records(namespace), key)
+            pipe.zrem(self._expiry(namespace), key)
+            value, removed, _ = await pipe.execute()
+        return json.loads(value) if removed and value is not None else None
+
+    async def items(self, namespace):
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrangebyscore(self._expiry(namespace), f"({time.time()}", "+inf")
+            pipe.hgetall(self._records(namespace))
+            live, records = await pipe.execute()
+        return [(key, json.loads(records[key])) for key in live if key in records]
+
+    async def count(self, namespace):
+        return await self.client.zcount(self._expiry(namespace), f"({time.time()}", "+inf")
+
+    async def sweep(self, namespace):
+        ns = self.namespaces[namespace]
+        now = time.time()
+        expired = await self.client.zrangebyscore(self._expiry(namespace), "-inf", now)
+        candidates = [(key, EVICT_EXPIRED) for key in expired]
+
+        live = await self.count(namespace)
+        if live > ns.max_size:
+            oldest = await self.client.zrangebyscore(
+                self._expiry(namespace), f"({now}", "+inf", start=0, num=live - ns.max_size,
+            )
+            candidates += [(key, EVICT_CAPACITY) for key in oldest]
+
+        evicted = 0
+        for key, reason in candidates:
+            value = await self.client.hget(self._records(namespace), key)
+            value = json.loads(value) if value is not None else {}
+            if not ns.evictable(key, value):
+                continue
+            # ZREM succeeds for exactly one worker, which then owns the eviction
+            if not await self.client.zrem(self._expiry(namespace), key):
+                continue
+            await self.client.hdel(self._records(namespace), key)
+            ns.evicted(key, value, reason)
+            evicted += 1
+        return evicted
+
+    async def close(self):
+        await self.client.aclose()
+
+def create_state_store(backend: str, db_path: str, redis_url: str, prefix: str) -> StateStore:
+    """Create the configured state store"""
+    backend = backend.lower()
+    if backend == "memory":
+        return MemoryStateStore()
+    if backend == "sqlite":
+        return SqliteStateStore(db_path)
+    if backend == "redis":
+        return RedisStateStore(redis_url, prefix)
+    raise ValueError(f"Unknown state backend: {backend}")
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+from loguru import logger
+
+class TitleCache:
+    """
+    Persistent thread_id -> title store.
+
+    Titles are kept in memory for lock-free reads and written through to a
+    small SQLite table so they survive restarts. Disk access runs in a worker
+    thread to keep the event loop free.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._titles: Dict[str, str] = {}
+        self._loaded = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS titles ("
+            "thread_id TEXT PRIMARY KEY, title TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        return conn
+
+    def _load_sync(self) -> Dict[str, str]:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT thread_id, title FROM titles"))
+
+    def _put_sync(self, thread_id: str, title: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO titles (thread_id, title, created_at) VALUES (?, ?, ?)",
+                (thread_id, title, time.time()),
+            )
+
+    def _delete_sync(self, thread_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM titles WHERE thread_id = ?", (thread_id,))
+
+    async def load(self):
+        if self._loaded:
+            return
+        try:
+            self._titles.update(await asyncio.to_thread(self._load_sync))
+            logger.info(f"Loaded {len(self._titles)} chat titles from {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to load chat titles: {str(e)}")
+        self._loaded = True
+
+    def get(self, thread_id: str) -> Optional[str]:
+        return self._titles.get(thread_id)
+
+    def missing(self, thread_ids: Iterable[str]) -> list:
+        return [thread_id for thread_id in thread_ids if thread_id not in self._titles]
+
+    async def put(self, thread_id: str, title: str):
+        self._titles[thread_id] = title
+        try:
+            await asyncio.to_thread(self._put_sync, thread_id, title)
+        except Exception as e:
+            logger.error(f"Failed to persist title for thread {thread_id}: {str(e)}")
+
+    async def delete(self, thread_id: str):
+        if self._titles.pop(thread_id, None) is None:
+            return
+        try:
+            await asyncio.to_thread(self._delete_sync, thread_id)
+        except Exception as e:
+            logger.error(f"Failed to delete title for thread {thread_id}: {str(e)}")
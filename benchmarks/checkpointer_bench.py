@@ -0,0 +1,123 @@
+"""
+Compare per-turn checkpoint write/read latency of the checkpointer backends.
+
+Each turn runs a one-node graph that appends a user and an assistant message,
+so every turn writes checkpoints exactly like a real chat turn does, without
+calling an LLM. Reads are measured with `aget_state` on the same thread.
+
+Usage:
+    python benchmarks/checkpointer_bench.py --threads 20 --turns 50
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Annotated, Dict, List
+from typing_extensions import TypedDict
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage
+from langgraph.graph import StateGraph, START, END, add_messages
+import agent.checkpointer as checkpointers
+from benchmarks.report import console, make_table, percentile
+
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+
+def build_bench_graph(checkpointer, reply_size: int):
+    reply = "x" * reply_size
+
+    def respond(state: State):
+        return {"messages": AIMessage(content=reply)}
+
+    return (
+        StateGraph(State)
+        .add_node("executor", respond)
+        .add_edge(START, "executor")
+        .add_edge("executor", END)
+        .compile(checkpointer=checkpointer)
+    )
+
+
+async def run_backend(backend: str, args) -> Dict[str, List[float]]:
+    checkpointer = await checkpointers.create_checkpointer(
+        backend=backend,
+        keep_last=args.keep_last,
+        compaction_interval=args.compaction_interval,
+    )
+    graph = build_bench_graph(checkpointer, args.reply_size)
+    writes: List[float] = []
+    reads: List[float] = []
+
+    async def run_thread(thread_index: int):
+        config = {"configurable": {"thread_id": f"bench-{backend}-{thread_index}"}}
+        for turn in range(args.turns):
+            start = time.perf_counter()
+            await graph.ainvoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+            writes.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await graph.aget_state(config)
+            reads.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(run_thread(i) for i in range(args.threads)))
+        start = time.perf_counter()
+        removed = await checkpointer.acompact()
+        compaction = time.perf_counter() - start
+    finally:
+        await checkpointer.aclose()
+
+    return {"write": writes, "read": reads, "compaction": [compaction], "removed": [removed]}
+
+
+def report(results: Dict[str, Dict[str, List[float]]]):
+    table = make_table("Checkpointer latency per turn (ms)", ("backend", "op", "p50", "p95", "p99", "mean"))
+
+    for backend, samples in results.items():
+        for op in ("write", "read"):
+            values = [s * 1000 for s in samples[op]]
+            table.add_row(
+                backend,
+                op,
+                f"{percentile(values, 50):.2f}",
+                f"{percentile(values, 95):.2f}",
+                f"{percentile(values, 99):.2f}",
+                f"{statistics.mean(values):.2f}",
+            )
+        table.add_row(
+            backend,
+            f"compact ({int(samples['removed'][0])} removed)",
+            "", "", "",
+            f"{samples['compaction'][0] * 1000:.2f}",
+        )
+
+    console.print(table)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--reply-size", type=int, default=2000, help="Assistant reply size in characters")
+    parser.add_argument("--keep-last", type=int, default=checkpointers.CHECKPOINT_KEEP_LAST)
+    parser.add_argument("--compaction-interval", type=float, default=3600)
+    parser.add_argument("--backends", nargs="+", default=list(checkpointers.CHECKPOINTER_BACKENDS))
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpointers.CHECKPOINT_DB_PATH = os.path.join(tmp, "bench.sqlite")
+        for backend in args.backends:
+            console.print(f"Running {backend} backend...")
+            results[backend] = await run_backend(backend, args)
+
+    report(results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
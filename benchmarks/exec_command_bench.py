@@ -0,0 +1,75 @@
+"""
+Measure how execute_command affects the MCP server's event loop.
+
+--commands commands that each run for --duration seconds are started at
+once, while a probe stands in for other tool calls: it awaits a short sleep
+in a loop and records how late each wake-up is.
+
+- blocking: the previous implementation, subprocess.run inside the async
+  tool, which holds the event loop for the whole command.
+- async: tools.mcp_server.execute_command, an asyncio subprocess with
+  EXEC_MAX_CONCURRENCY commands at a time.
+
+Usage:
+    python benchmarks/exec_command_bench.py --commands 4 --duration 1
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import shlex
+import subprocess
+import time
+from typing import Callable, List
+
+import tools.mcp_server as mcp_server
+from benchmarks.report import console, make_table, ms
+
+PROBE_INTERVAL = 0.01
+
+
+async def blocking_execute_command(command: str, timeoutSec: int = 30):
+    """The previous execute_command"""
+    result = subprocess.run(shlex.split(command), capture_output=True, text=True, timeout=timeoutSec)
+    return result.stdout
+
+
+async def probe(stop: asyncio.Event, delays: List[float]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def run_variant(execute: Callable, args) -> tuple:
+    stop = asyncio.Event()
+    delays: List[float] = []
+    prober = asyncio.create_task(probe(stop, delays))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(execute(f"sleep {args.duration}") for _ in range(args.commands)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await prober
+    return elapsed, delays
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=1.0, help="Run time of each command (s)")
+    args = parser.parse_args()
+
+    table = make_table(
+        f"{args.commands} commands of {args.duration:.1f}s, EXEC_MAX_CONCURRENCY={mcp_server.EXEC_MAX_CONCURRENCY}",
+        ("variant", "total (s)", "probe wake-ups", "worst event loop stall (ms)"),
+    )
+    for name, execute in (("blocking", blocking_execute_command), ("async", mcp_server.execute_command)):
+        elapsed, delays = await run_variant(execute, args)
+        table.add_row(name, f"{elapsed:.2f}", str(len(delays)), ms(max(delays), 0))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
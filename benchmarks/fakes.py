@@ -0,0 +1,240 @@
+"""
+Deterministic stand-ins for the chat model and MCP tools, used by the
+benchmarks to exercise the real graph and API without network access.
+
+The fake model decides what to do from the conversation alone:
+- a user message containing `[tool:<name>]` markers makes it call those
+  tools in one step,
+- a tool result makes it answer with a short summary,
+- under the translator prompt it "translates" by stripping diacritics,
+  which keeps the markers,
+- anything else gets a direct answer.
+Latencies are configurable so runs can mimic a real provider.
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import itertools
+import json
+import re
+import time
+import unicodedata
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool, tool
+
+from tools.cache import cache_tools
+from tools.interruptor import add_human_in_the_loop
+
+TOOL_MARKER = re.compile(r"\[tool:(\w+)\]")
+_CALL_IDS = itertools.count()
+
+TOOL_ARGS = {
+    "get_system_metrics": {"metrics_type": "all"},
+    "get_process_metrics": {"pid": 1},
+    # Not covered by the approval policy, so it always needs a human
+    "execute_command": {"command": "systemctl restart nginx"},
+    "query_kedb": {"query": "disk full"},
+}
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted chat model with a fixed time to first token and per-token delay."""
+
+    ttft: float = 0.2
+    token_delay: float = 0.01
+    answer_tokens: int = 40
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _get_ls_params(self, stop=None, **kwargs):
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_model_name"] = "fake-chat-model"
+        return params
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1] if messages else None
+        usage = {
+            "input_tokens": sum(len(m.text().split()) for m in messages),
+            "output_tokens": self.answer_tokens,
+            "total_tokens": 0,
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+
+        translating = bool(messages) and isinstance(messages[0], SystemMessage) and "translator" in messages[0].text()
+        if translating and isinstance(last, HumanMessage):
+            text = "".join(
+                c for c in unicodedata.normalize("NFD", last.text()) if not unicodedata.combining(c)
+            ).replace("đ", "d").replace("Đ", "D")
+            return AIMessage(content=text, usage_metadata=usage)
+        if isinstance(last, HumanMessage):
+            names = [name for name in TOOL_MARKER.findall(last.text()) if name in TOOL_ARGS]
+            if names:
+                return AIMessage(
+                    content="",
+                    tool_calls=[
+                        {"name": name, "args": TOOL_ARGS[name], "id": f"call_{next(_CALL_IDS)}"}
+                        for name in names
+                    ],
+                    usage_metadata={**usage, "output_tokens": 10, "total_tokens": usage["input_tokens"] + 10},
+                )
+        if isinstance(last, ToolMessage):
+            # Answer once every tool call of the step has its result
+            results = []
+            for message in reversed(messages):
+                if not isinstance(message, ToolMessage):
+                    break
+                results.append(message)
+            text = " ".join(
+                f"The {m.name} tool returned: {m.text()[:80]}" for m in reversed(results)
+            )
+        else:
+            text = " ".join(f"word{i}" for i in range(self.answer_tokens))
+        return AIMessage(content=text, usage_metadata=usage)
+
+    def _tokens(self, message: AIMessage) -> List[str]:
+        return [word + " " for word in message.text().split()] or [""]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._reply(messages)
+        time.sleep(self.ttft + self.token_delay * len(self._tokens(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._reply(messages)
+        await asyncio.sleep(self.ttft + self.token_delay * len(self._tokens(message)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        raise NotImplementedError("Use the async API")
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._reply(messages)
+        await asyncio.sleep(self.ttft)
+        tokens = self._tokens(message)
+        for index, token in enumerate(tokens):
+            last = index == len(tokens) - 1
+            chunk = ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=token,
+                    id=message.id,
+                    tool_call_chunks=[
+                        {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                        for i, c in enumerate(message.tool_calls)
+                    ] if last else [],
+                    usage_metadata=message.usage_metadata if last else None,
+                )
+            )
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            if not last:
+                await asyncio.sleep(self.token_delay)
+
+
+def fake_tools(latency: float = 0.05) -> List[BaseTool]:
+    """MCP-like tools that sleep for `latency` seconds, wrapped like init_tools does."""
+
+    @tool
+    async def get_system_metrics(metrics_type: str = "all") -> str:
+        """Collect system metrics."""
+        await asyncio.sleep(latency)
+        metrics = {
+            "system_info": {"system": "Linux", "node_name": "bench", "release": "6.8.0", "machine": "x86_64"},
+            "cpu_info": {"cpu_count_logical": 8, "cpu_count_physical": 4, "cpu_percent": 12.5},
+            "ram_info": {"total": 16 * 2**30, "available": 9 * 2**30, "used": 7 * 2**30, "percent": 43.8},
+            "disk_info": [{
+                "device": "/dev/sda1", "mountpoint": "/", "fstype": "ext4",
+                "total": 100 * 2**30, "used": 63 * 2**30, "free": 37 * 2**30, "percent": 63.0,
+            }],
+        }
+        if metrics_type == "all":
+            return json.dumps(metrics)
+        return json.dumps(metrics.get(f"{metrics_type}_info", {"error": f"Unknown metrics_type: {metrics_type}"}))
+
+    @tool
+    async def get_process_metrics(pid: Optional[int] = None) -> str:
+        """Collect process metrics."""
+        await asyncio.sleep(latency)
+        return json.dumps({"processes": [
+            {"pid": pid or 1, "name": "python", "user": "app", "status": "running", "cpu_percent": 3.0, "memory_percent": 1.2}
+        ]})
+
+    @tool
+    async def execute_command(command: str, cwd: Optional[str] = None, timeoutSec: int = 30) -> str:
+        """Execute a shell command."""
+        await asyncio.sleep(latency)
+        return json.dumps({"exit_code": 0, "stdout": f"ran {command}", "stderr": ""})
+
+    @tool
+    async def query_kedb(query: str) -> str:
+        """Search in KEDB (Known Errors Database) and return information."""
+        await asyncio.sleep(latency)
+        return f"Known error for '{query}': clean up /var/log and rotate logs."
+
+    return cache_tools([
+        get_system_metrics,
+        get_process_metrics,
+        add_human_in_the_loop(execute_command),
+        query_kedb,
+    ])
+
+
+async def build_fake_graph(
+    ttft: float = 0.2,
+    token_delay: float = 0.01,
+    tool_latency: float = 0.05,
+    checkpointer_backend: str = "memory",
+    summary_mode: str = "inline",
+    answer_cache: bool = False,
+    fast_path: bool = True,
+    graph_mode: str = "single",
+):
+    """The production graph with the fake model and tools plugged in."""
+    from agent.checkpointer import create_checkpointer
+    from agent.executor import init_executor
+    from agent.summarizer import init_summarizer
+    from agent.router import init_router
+    from agent.answer_cache import init_answer_cache
+    from agent.translator import init_translator
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from agent.workflow import Agents, compile_graph
+
+    model = FakeChatModel(ttft=ttft, token_delay=token_delay)
+    tools = fake_tools(tool_latency)
+    Agents.executor = await init_executor(model=model, tools=tools)
+    Agents.router = init_router(tools) if fast_path else None
+    Agents.summarizer = init_summarizer(model=model, mode=summary_mode)
+    # Identical questions embed identically; anything else is unrelated
+    Agents.answer_cache = init_answer_cache(DeterministicFakeEmbedding(size=256)) if answer_cache else None
+    Agents.translator = init_translator(model) if graph_mode == "multilingual" else None
+    checkpointer = await create_checkpointer(backend=checkpointer_backend)
+    return compile_graph(checkpointer)
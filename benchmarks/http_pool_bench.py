@@ -0,0 +1,243 @@
+"""
+Compare the connection pools of the LLM, embedding and title clients
+against a local mock of the OpenAI API.
+
+The mock runs in a subprocess and serves /v1/chat/completions and
+/v1/embeddings after a fixed delay. It counts the TCP connections clients
+open, and the first request on each new connection also waits --handshake
+seconds, standing in for the TCP and TLS handshakes with the real API.
+
+- separate: one ChatOpenAI, one OpenAIEmbeddings and one AsyncOpenAI, each
+  with its own default connection pool (the previous wiring). The SDK
+  drops idle connections after 5 seconds.
+- shared: the same three clients on tools.http_client's shared pool, which
+  keeps them for HTTP_KEEPALIVE_EXPIRY_SEC.
+
+Calls arrive in --bursts bursts separated by --idle seconds, like chat
+traffic with pauses between messages.
+
+The mock speaks plain HTTP/1.1, so HTTP/2 multiplexing is not part of these
+numbers.
+
+Usage:
+    python benchmarks/http_pool_bench.py --requests 300 --concurrency 16 --bursts 3 --idle 6
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import itertools
+import json
+import socket
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List
+
+import httpx
+import openai
+import uvicorn
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from benchmarks.report import console, make_table, ms, percentile
+from tools.http_client import aclose_http_clients, get_async_http_client, http_client_kwargs
+
+
+def create_mock_openai(latency: float, handshake: float) -> Callable:
+    """
+    A minimal OpenAI-compatible server that counts client connections.
+
+    A bare ASGI app rather than FastAPI, so the mock's own CPU time does not
+    hide the clients' connection costs.
+    """
+    connections: set = set()
+
+    def completion(body: Dict) -> Dict:
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "Disk usage is fine"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 4, "total_tokens": 14},
+        }
+
+    def embedding(body: Dict) -> Dict:
+        inputs = body.get("input")
+        count = len(inputs) if isinstance(inputs, list) else 1
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": [0.1] * 8} for i in range(count)],
+            "model": body.get("model", "mock"),
+            "usage": {"prompt_tokens": count, "total_tokens": count},
+        }
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        path = scope["path"]
+        if path == "/stats":
+            result = {"connections": len(connections)}
+        elif path == "/reset":
+            connections.clear()
+            result = {}
+        else:
+            # Each TCP connection has its own client port
+            client = tuple(scope["client"])
+            if client not in connections:
+                connections.add(client)
+                await asyncio.sleep(handshake)
+            await asyncio.sleep(latency)
+            request = json.loads(body or b"{}")
+            result = completion(request) if path.endswith("/chat/completions") else embedding(request)
+
+        payload = json.dumps(result).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    return app
+
+
+async def start_server(args) -> tuple:
+    """Run the mock in a subprocess so it does not compete with the clients for the GIL"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([
+        sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+        "--latency", str(args.latency), "--handshake", str(args.handshake),
+    ])
+    url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient() as client:
+        for _ in range(100):
+            try:
+                await client.get(f"{url}/stats")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    return process, url
+
+
+def build_operations(variant: str, base_url: str) -> List[Callable]:
+    options = {"api_key": "sk-mock", "base_url": base_url}
+    chat_options = {**options, "model": "gpt-4o-mini", "max_retries": 0}
+    embedding_options = {
+        **options,
+        "model": "text-embedding-3-small",
+        "max_retries": 0,
+        # Skip tiktoken, which would download its encodings
+        "check_embedding_ctx_length": False,
+    }
+    title_request = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "Title?"}]}
+
+    shared = http_client_kwargs() if variant == "shared" else {}
+    llm = ChatOpenAI(**chat_options, **shared)
+    embedder = OpenAIEmbeddings(**embedding_options, **shared)
+    title_client = openai.AsyncOpenAI(
+        **options,
+        max_retries=0,
+        **({"http_client": get_async_http_client()} if variant == "shared" else {}),
+    )
+
+    async def chat():
+        await llm.ainvoke("Check the disk")
+
+    async def embed():
+        await embedder.aembed_query("disk full")
+
+    async def title():
+        await title_client.chat.completions.create(**title_request)
+
+    return [chat, embed, title]
+
+
+async def run_variant(operations: List[Callable], requests: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def call(operation):
+        async with semaphore:
+            start = time.perf_counter()
+            await operation()
+            timings.append(time.perf_counter() - start)
+
+    cycle = itertools.cycle(operations)
+    start = time.perf_counter()
+    await asyncio.gather(*(call(next(cycle)) for _ in range(requests)))
+    return timings, time.perf_counter() - start
+
+
+async def main(args):
+    process, url = await start_server(args)
+
+    table = make_table(
+        f"{args.requests} calls in {args.bursts} bursts {args.idle:.0f}s apart, {args.concurrency} concurrent, "
+        f"mock latency {args.latency * 1000:.0f}ms, handshake {args.handshake * 1000:.0f}ms",
+        ("variant", "connections", "mean (ms)", "p50 (ms)", "p95 (ms)", "throughput (req/s)"),
+    )
+    try:
+        async with httpx.AsyncClient(base_url=url) as control:
+            for variant in ("separate", "shared"):
+                operations = build_operations(variant, f"{url}/v1")
+                await control.post("/reset")
+                timings, elapsed = [], 0.0
+                for burst in range(args.bursts):
+                    if burst:
+                        await asyncio.sleep(args.idle)
+                    burst_timings, burst_elapsed = await run_variant(
+                        operations, args.requests // args.bursts, args.concurrency
+                    )
+                    timings += burst_timings
+                    elapsed += burst_elapsed
+                connections = (await control.get("/stats")).json()["connections"]
+                table.add_row(
+                    variant,
+                    str(connections),
+                    ms(statistics.mean(timings)),
+                    ms(percentile(timings, 50)),
+                    ms(percentile(timings, 95)),
+                    f"{len(timings) / elapsed:.0f}",
+                )
+    finally:
+        await aclose_http_clients()
+        process.terminate()
+        process.wait()
+    console.print(table)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bursts", type=int, default=3)
+    parser.add_argument("--idle", type=float, default=6.0, help="Pause between bursts (s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock server delay per request (s)")
+    parser.add_argument("--handshake", type=float, default=0.1, help="Extra delay on a new connection, TCP + TLS (s)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        # Keep idle connections open like a real API front end, unlike uvicorn's 5s default
+        uvicorn.run(
+            create_mock_openai(args.latency, args.handshake),
+            host="127.0.0.1", port=args.port, log_level="warning", timeout_keep_alive=120,
+        )
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,161 @@
+"""
+Compare LLM-routed language handling with local language detection.
+
+Both variants answer the same English and Vietnamese questions with the
+fake chat model, so the difference is the routing cost alone.
+
+- supervisor: agent.supervisor as designed. Its LLM picks the next agent
+  through the handoff tools, so every message pays a supervisor call before
+  the executor, and Vietnamese pays a second one after the translator. The
+  fake supervisor makes the correct choice every time.
+- local: the multilingual production graph (GRAPH_MODE=multilingual).
+  detect_language picks the route, and only Vietnamese messages reach the
+  translator.
+
+The fast path is disabled in both, so every message reaches the executor.
+
+Usage:
+    python benchmarks/language_routing_bench.py --rounds 20 --ttft 0.3
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START, StateGraph
+
+from agent.language import detect_language
+from agent.supervisor import init_supervisor
+from agent.workflow import Agents, State, execute_step
+from benchmarks.fakes import FakeChatModel, build_fake_graph
+from benchmarks.report import console, make_table, ms
+
+QUESTIONS = {
+    "en": [
+        "Show me my disk usage",
+        "Why is nginx failing to start after the upgrade?",
+        "How much RAM is the server using right now?",
+        "What does exit code 137 mean for a container?",
+        "Please check the café-api résumé service logs",
+    ],
+    "vi": [
+        "Kiểm tra dung lượng ổ đĩa giúp tôi",
+        "Tại sao dịch vụ nginx bị lỗi sau khi nâng cấp?",
+        "Máy chủ đang dùng bao nhiêu RAM?",
+        "Mã lỗi 137 của container nghĩa là gì?",
+        "kiem tra giup toi dung luong o dia",
+    ],
+}
+
+
+class FakeSupervisorModel(FakeChatModel):
+    """Hands Vietnamese to the translator once, then everything to the executor."""
+
+    calls: int = 0
+
+    def _reply(self, messages):
+        self.calls += 1
+        question = next(m for m in reversed(messages) if isinstance(m, HumanMessage))
+        translated = any(
+            isinstance(m, ToolMessage) and m.name == "transfer_to_translator" for m in messages
+        )
+        agent = "translator" if detect_language(question.text()) == "vi" and not translated else "executor"
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": f"transfer_to_{agent}", "args": {}, "id": f"call_{uuid.uuid4().hex[:8]}"}],
+        )
+
+
+async def supervisor_translate_step(state: State, config):
+    question = next(m for m in reversed(state["messages"]) if isinstance(m, HumanMessage))
+    response = await Agents.translator.ainvoke({"messages": [HumanMessage(content=question.text())]}, config)
+    return {"messages": response["messages"][-1]}
+
+
+def build_supervisor_graph(model: FakeSupervisorModel):
+    return (
+        StateGraph(State)
+        .add_node("supervisor", init_supervisor(model), destinations=("translator", "executor"))
+        .add_node("translator", supervisor_translate_step)
+        .add_node("executor", execute_step)
+        .add_edge(START, "supervisor")
+        .add_edge("translator", "supervisor")
+        .add_edge("executor", END)
+        .compile()
+    )
+
+
+async def run(graph, rounds: int) -> Dict[str, List[float]]:
+    timings = {language: [] for language in QUESTIONS}
+    for _ in range(rounds):
+        for language, questions in QUESTIONS.items():
+            for question in questions:
+                config = {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": 20}
+                start = time.perf_counter()
+                await graph.ainvoke({"messages": [HumanMessage(content=question)]}, config)
+                timings[language].append(time.perf_counter() - start)
+    return timings
+
+
+def detection_cost(repeat: int) -> float:
+    questions = [q for qs in QUESTIONS.values() for q in qs]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question in questions:
+            detect_language(question)
+    return (time.perf_counter() - start) / (repeat * len(questions))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=10, help="Passes over the question set")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Fake LLM time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Fake LLM delay per token (s)")
+    args = parser.parse_args()
+
+    wrong = [
+        (language, q) for language, qs in QUESTIONS.items() for q in qs if detect_language(q) != language
+    ]
+    for language, question in wrong:
+        console.print(f"[red]Misdetected ({language}): {question}")
+
+    local = await build_fake_graph(
+        ttft=args.ttft, token_delay=args.token_delay, fast_path=False, graph_mode="multilingual"
+    )
+    supervisor_model = FakeSupervisorModel(ttft=args.ttft, token_delay=args.token_delay)
+    supervisor = build_supervisor_graph(supervisor_model)
+
+    results = {
+        "supervisor": await run(supervisor, args.rounds),
+        "local": await run(local, args.rounds),
+    }
+    messages = args.rounds * sum(len(qs) for qs in QUESTIONS.values())
+
+    table = make_table(
+        f"Latency per message (ms), fake LLM ttft {args.ttft * 1000:.0f}ms", ("variant", "language", "p50", "mean", "max")
+    )
+    for variant, timings in results.items():
+        for language, values in timings.items():
+            table.add_row(
+                variant,
+                language,
+                ms(statistics.median(values)),
+                ms(statistics.mean(values)),
+                ms(max(values)),
+            )
+    console.print(table)
+    console.print(
+        f"Supervisor LLM calls: {supervisor_model.calls} for {messages} messages; "
+        f"local detection: {detection_cost(1000) * 1e6:.1f}µs per message, "
+        f"{len(wrong)} misdetected"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
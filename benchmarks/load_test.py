@@ -0,0 +1,327 @@
+"""
+Load-test the FastAPI service offline with a fake chat model and fake MCP tools.
+
+The real AgentService, routes, admission control and checkpointer run in
+process behind a uvicorn server on the loopback interface; only the LLM and
+the tools are replaced by the deterministic fakes in benchmarks/fakes.py.
+Each scenario is driven at a fixed concurrency and reports latency
+percentiles, throughput and memory growth. Results are saved as JSON so
+runs can be compared.
+
+Scenarios:
+    chat      POST /chat with a plain question
+    tool      POST /chat that calls a read-only tool through the executor
+    fastpath  POST /chat with a request the intent router answers directly
+    stream    POST /chat/stream, consumed to the end (also reports TTFT)
+    approval  POST /chat that hits execute_command, then /interrupt/approve
+    batch     POST /chat with three execute_command calls in one step, all
+              approved with a single /interrupt/approve
+
+Usage:
+    python benchmarks/load_test.py --requests 200 --concurrency 16
+    python benchmarks/load_test.py --compare benchmarks/results/baseline.json --max-regression 15
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import gc
+import json
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+import psutil
+import uvicorn
+from fastapi import FastAPI
+from benchmarks.fakes import build_fake_graph
+from benchmarks.report import console, make_table, percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SCENARIOS = ("chat", "tool", "fastpath", "stream", "approval", "batch")
+
+
+def rss_mb() -> float:
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+async def create_app(args):
+    """Real service and routes with the fake graph plugged in"""
+    from api.config import Config
+
+    Config.TITLE_CACHE_PATH = os.path.join(args.workdir, "titles.sqlite")
+    Config.STATE_DB_PATH = os.path.join(args.workdir, "state.sqlite")
+    Config.STATE_BACKEND = args.state_backend
+    Config.MAX_CONCURRENT_RUNS = args.max_concurrent_runs
+    Config.MAX_QUEUED_RUNS = max(Config.MAX_QUEUED_RUNS, args.concurrency * 2)
+
+    import agent.checkpointer as checkpointers
+    checkpointers.CHECKPOINT_DB_PATH = os.path.join(args.workdir, "checkpoints.sqlite")
+
+    from api.routes import create_router, create_jobs_router, create_metrics_router
+    from api.services import AgentService
+
+    service = AgentService()
+    service.graph = await build_fake_graph(
+        ttft=args.ttft,
+        token_delay=args.token_delay,
+        tool_latency=args.tool_latency,
+        checkpointer_backend=args.checkpointer,
+        summary_mode=args.summary_mode,
+        answer_cache=args.answer_cache,
+    )
+
+    # Titles would call the OpenAI API; keep the run offline
+    async def no_title(thread_id: str) -> Optional[str]:
+        return None
+
+    service._request_title = no_title
+    await service.initialize()
+
+    app = FastAPI()
+    app.include_router(create_router(service))
+    app.include_router(create_jobs_router(service))
+    app.include_router(create_metrics_router())
+    return app, service
+
+
+class Scenario:
+    def __init__(self, client: httpx.AsyncClient, threads: int):
+        self.client = client
+        self.threads = threads
+        self.latencies: List[float] = []
+        self.ttfts: List[float] = []
+        self.errors = 0
+
+    def thread_id(self, index: int) -> str:
+        return f"load-{index % self.threads}"
+
+    async def chat(self, index: int, message: str) -> Dict[str, Any]:
+        response = await self.client.post(
+            "/chat", json={"message": message, "thread_id": self.thread_id(index)}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def run_one(self, name: str, index: int):
+        start = time.perf_counter()
+        if name == "chat":
+            await self.chat(index, "How do I troubleshoot a slow server?")
+        elif name == "tool":
+            await self.chat(index, "Show me my system metrics [tool:get_system_metrics]")
+        elif name == "fastpath":
+            await self.chat(index, "Show me my system metrics")
+        elif name == "stream":
+            await self.stream(index, start)
+        elif name in ("approval", "batch"):
+            calls = 1 if name == "approval" else 3
+            result = await self.chat(index, "Restart nginx " + "[tool:execute_command] " * calls)
+            if not result.get("requires_approval"):
+                raise RuntimeError("Expected an approval interrupt")
+            if len(result.get("interrupt_actions") or []) != calls:
+                raise RuntimeError(f"Expected {calls} actions in the interrupt")
+            response = await self.client.post("/interrupt/approve", json={
+                "interrupt_id": result["interrupt_id"],
+                "approved": True,
+                "thread_id": result["thread_id"],
+            })
+            response.raise_for_status()
+        self.latencies.append(time.perf_counter() - start)
+
+    async def stream(self, index: int, start: float):
+        first_token = None
+        async with self.client.stream(
+            "POST",
+            "/chat/stream",
+            json={"message": "Explain load average", "thread_id": self.thread_id(index)},
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("event: token") and first_token is None:
+                    first_token = time.perf_counter() - start
+                elif line.startswith("event: error"):
+                    raise RuntimeError("Stream reported an error")
+        if first_token is not None:
+            self.ttfts.append(first_token)
+
+
+async def run_scenario(name: str, client: httpx.AsyncClient, args) -> Dict[str, Any]:
+    scenario = Scenario(client, threads=args.threads)
+    pending = iter(range(args.requests))
+
+    async def worker():
+        for index in pending:
+            try:
+                await scenario.run_one(name, index)
+            except Exception as e:
+                scenario.errors += 1
+                if scenario.errors <= 3:
+                    console.print(f"[red]{name} request {index} failed: {e}[/red]")
+
+    # Warm up imports, caches and the first checkpoint of every thread
+    for index in range(min(args.warmup, args.requests)):
+        await scenario.run_one(name, index)
+    scenario.latencies.clear()
+    scenario.ttfts.clear()
+
+    gc.collect()
+    rss_start = rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    rss_end = rss_mb()
+
+    latencies = [s * 1000 for s in scenario.latencies]
+    ttfts = [s * 1000 for s in scenario.ttfts]
+    return {
+        "requests": len(latencies),
+        "errors": scenario.errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies, default=0.0),
+        "ttft_p50_ms": percentile(ttfts, 50) if ttfts else None,
+        "ttft_p95_ms": percentile(ttfts, 95) if ttfts else None,
+        "rss_start_mb": rss_start,
+        "rss_end_mb": rss_end,
+        "rss_growth_mb": rss_end - rss_start,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """Return the metrics that got worse than the baseline by more than max_regression percent"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in (("p50_ms", False), ("p95_ms", False), ("p99_ms", False), ("rps", True)):
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            if (change < -max_regression) if higher_is_better else (change > max_regression):
+                regressions.append(f"{name}.{metric}: {old:.1f} -> {new:.1f} ({change:+.1f}%)")
+    return regressions
+
+
+def report(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None):
+    table = make_table(
+        "Load test", ("scenario", "reqs", "err", "rps", "p50 ms", "p95 ms", "p99 ms", "ttft p50", "rss +MB")
+    )
+
+    def cell(name: str, metric: str, fmt: str = "{:.1f}") -> str:
+        value = results[name].get(metric)
+        if value is None:
+            return "-"
+        text = fmt.format(value)
+        previous = (baseline or {}).get(name, {}).get(metric)
+        if previous:
+            text += f" ({(value - previous) / previous * 100:+.0f}%)"
+        return text
+
+    for name, result in results.items():
+        table.add_row(
+            name,
+            str(result["requests"]),
+            str(result["errors"]),
+            cell(name, "rps"),
+            cell(name, "p50_ms"),
+            cell(name, "p95_ms"),
+            cell(name, "p99_ms"),
+            cell(name, "ttft_p50_ms"),
+            f"{result['rss_growth_mb']:+.1f}",
+        )
+    console.print(table)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=32, help="Distinct chat threads to spread requests over")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Fake LLM time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Fake LLM delay per token (s)")
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="Fake tool latency (s)")
+    parser.add_argument("--max-concurrent-runs", type=int, default=8)
+    parser.add_argument("--checkpointer", default="memory", help="Checkpointer backend")
+    parser.add_argument("--state-backend", default="memory", help="Thread/interrupt state backend")
+    parser.add_argument("--summary-mode", default="inline", choices=("inline", "background"))
+    parser.add_argument("--answer-cache", action="store_true", help="Enable the semantic answer cache")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        args.workdir = workdir
+        app, service = await create_app(args)
+        # A real server rather than httpx.ASGITransport, which buffers whole
+        # responses and would hide streaming latency
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        try:
+            while not server.started:
+                await asyncio.sleep(0.01)
+            port = server.servers[0].sockets[0].getsockname()[1]
+            limits = httpx.Limits(max_connections=args.concurrency * 2)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None, limits=limits) as client:
+                for name in args.scenarios:
+                    console.print(f"Running {name} ({args.requests} requests, concurrency {args.concurrency})...")
+                    results[name] = await run_scenario(name, client, args)
+        finally:
+            server.should_exit = True
+            await serving
+            await service.shutdown()
+
+    report(results, baseline)
+
+    started_at = datetime.now(timezone.utc)
+    output = args.output or os.path.join(RESULTS_DIR, f"{started_at:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "timestamp": started_at.isoformat(),
+            "revision": git_revision(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("workdir", "compare", "output")},
+            "results": results,
+        }, f, indent=2)
+    console.print(f"Results written to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            console.print("[red]Regressions beyond {:.0f}%:[/red]".format(args.max_regression))
+            for line in regressions:
+                console.print(f"  {line}")
+            sys.exit(1)
+        console.print("[green]No regressions against baseline[/green]")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Measure get_process_metrics: latency, and whether a busy process shows up.
+
+A child process spins on the CPU, so an accurate tool reports it near 100%.
+
+- scan: the previous implementation, a full psutil.process_iter on every
+  call with psutil's first-call cpu_percent, dropping processes at 0% CPU
+  and 0% memory. psutil's process cache is cleared before each call, as in
+  the stdio server that is spawned per tool call.
+- sampler: tools.mcp_server.get_process_metrics, answering top-N from the
+  background ProcessSampler's latest scan and reading a single pid directly.
+
+The second table fills the sampler's snapshot with --processes synthetic
+entries, standing in for a host with tens of thousands of processes, and
+compares heap selection of the top 10 with sorting the whole table.
+
+Usage:
+    python benchmarks/process_metrics_bench.py --runs 20 --processes 30000
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import psutil
+
+import tools.mcp_server as mcp_server
+from benchmarks.report import console, make_table, ms, percentile, timed
+from tools.mcp_server import ProcessStats
+
+
+def spin():
+    while True:
+        pass
+
+
+def scan_process_metrics(pid=None, sort_by="cpu_percent") -> Dict:
+    """The previous get_process_metrics, ranking by sort_by"""
+    psutil.process_iter.cache_clear()
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'cpu_percent', 'memory_percent']):
+        try:
+            pinfo = proc.info
+            if pinfo['cpu_percent'] == 0 and pinfo['memory_percent'] == 0:
+                continue
+            if pid is not None and pinfo['pid'] != pid:
+                continue
+            processes.append(pinfo)
+            if pid is not None:
+                break
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    if pid is None:
+        processes.sort(key=lambda x: x[sort_by], reverse=True)
+        processes = processes[:10]
+    return {"processes": processes}
+
+
+async def sampler_process_metrics(pid=None, sort_by="cpu_percent") -> Dict:
+    return await mcp_server.get_process_metrics(pid=pid, sort_by=sort_by)
+
+
+def busy_cpu(result: Dict, busy_pid: int) -> str:
+    for proc in result.get("processes", []):
+        if proc["pid"] == busy_pid:
+            return f"{proc['cpu_percent']:.0f}%"
+    return "missing"
+
+
+def synthetic_snapshot(count: int) -> Dict[int, ProcessStats]:
+    rng = random.Random(0)
+    return {
+        pid: ProcessStats(
+            pid=pid, name=f"worker-{pid}", user="app", status="sleeping",
+            cpu_percent=rng.random() * 5, memory_percent=rng.random(), rss=rng.randrange(1 << 30),
+            rss_delta=rng.randrange(-1 << 20, 1 << 20), read_bytes_per_sec=rng.random() * 1e6,
+            write_bytes_per_sec=rng.random() * 1e6, num_fds=rng.randrange(1000), num_fds_delta=rng.randrange(-5, 5),
+        )
+        for pid in range(1, count + 1)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=30000, help="Synthetic process table size")
+    args = parser.parse_args()
+
+    busy = multiprocessing.Process(target=spin, daemon=True)
+    busy.start()
+    try:
+        mcp_server.process_sampler.start()
+        # Let the sampler take a scan with the busy process running
+        time.sleep(mcp_server.process_sampler.interval * 1.5)
+
+        table = make_table(
+            f"{len(psutil.pids())} real processes, top 10 by CPU and one pid (ms per call)",
+            ("variant", "call", "mean", "p95", "busy process CPU"),
+        )
+        for name, collect in (("scan", scan_process_metrics), ("sampler", sampler_process_metrics)):
+            for call, kwargs in (("top 10", {}), ("pid", {"pid": busy.pid})):
+                timings, result = await timed(lambda: collect(**kwargs), args.runs)
+                table.add_row(
+                    name,
+                    call,
+                    ms(statistics.mean(timings), 2),
+                    ms(percentile(timings, 95), 2),
+                    busy_cpu(result, busy.pid),
+                )
+        console.print(table)
+    finally:
+        busy.terminate()
+
+    mcp_server.process_sampler.stop()
+    mcp_server.process_sampler.snapshot = synthetic_snapshot(args.processes)
+    selection: Dict[str, Callable[[], List]] = {
+        "heap (nlargest)": lambda: mcp_server.process_sampler.top("cpu_percent", 10),
+        "full sort": lambda: sorted(
+            mcp_server.process_sampler.snapshot.values(), key=lambda stats: stats.cpu_percent, reverse=True
+        )[:10],
+    }
+    table = make_table(f"Top 10 by CPU of {args.processes} synthetic processes (ms per call)", ("selection", "mean", "p95"))
+    for name, select in selection.items():
+        timings, _ = await timed(select, args.runs)
+        table.add_row(name, ms(statistics.mean(timings), 2), ms(percentile(timings, 95), 2))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""
+Helpers shared by the benchmarks: timing loops, percentiles and the rich
+tables they print.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Iterable, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile, 0.0 without samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed(call: Callable[[], Any], runs: int) -> Tuple[List[float], Any]:
+    """Seconds taken by each of `runs` calls, and the last result; coroutines are awaited"""
+    timings, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = call()
+        if asyncio.iscoroutine(result):
+            result = await result
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def ms(seconds: float, digits: int = 1) -> str:
+    return f"{seconds * 1000:.{digits}f}"
+
+
+def make_table(title: str, columns: Iterable[str]) -> Table:
+    table = Table(title=title)
+    for column in columns:
+        table.add_column(column)
+    return table
@@ -0,0 +1,160 @@
+"""
+Measure how long the agent graph takes to become ready at startup.
+
+The slow backends are replaced by stand-ins that sleep like the real ones:
+spawning the MCP server and listing its tools, importing and building the
+DuckDuckGo tool, creating the OpenAI embeddings client, connecting to
+Milvus and opening the checkpointer. The rest of the graph build is real.
+
+- sequential: the previous startup, every step one after the other and
+  Milvus connected before the graph exists.
+- parallel: agent.workflow.build_graph, with the independent steps running
+  concurrently and the KEDB retriever connecting on its first call. The
+  table also shows what that first call pays.
+
+The server itself accepts requests right away with BACKGROUND_STARTUP; the
+times below are until /ready turns 200.
+
+Usage:
+    python benchmarks/startup_bench.py --mcp 0.8 --milvus 1.0 --runs 5
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+import agent.workflow as workflow
+import tools.retriever as retriever_module
+from agent.executor import init_executor
+from agent.summarizer import init_summarizer
+from benchmarks.fakes import FakeChatModel
+from benchmarks.report import console, make_table, ms, timed
+from tools.cache import cache_tools
+from tools.interruptor import add_human_in_the_loop
+
+# The package exports the init_tools function under the module's name
+init_tools_module = sys.modules["tools.init_tools"]
+
+
+def install_slow_backends(args):
+    """Point the startup code at backends that take as long as the real ones."""
+
+    class SlowMCPClient:
+        def __init__(self, connections):
+            self.connections = connections
+
+        async def get_tools(self):
+            await asyncio.sleep(args.mcp)
+
+            @tool
+            async def get_system_metrics(metrics_type: str = "all") -> str:
+                """Collect system metrics."""
+                return "{}"
+
+            @tool
+            async def get_process_metrics(pid: int = 0) -> str:
+                """Collect process metrics."""
+                return "{}"
+
+            @tool
+            async def execute_command(command: str) -> str:
+                """Execute a shell command."""
+                return "{}"
+
+            return [get_system_metrics, get_process_metrics, execute_command]
+
+    def slow_search():
+        time.sleep(args.search)
+
+        @tool
+        def duckduckgo_search(query: str) -> str:
+            """Search the web."""
+            return ""
+
+        return duckduckgo_search
+
+    class KEDBRetriever(BaseRetriever):
+        def _get_relevant_documents(self, query, *, run_manager=None):
+            return [Document(page_content=f"Known error for {query}")]
+
+    class SlowVectorStore:
+        def as_retriever(self):
+            return KEDBRetriever()
+
+    class SlowVectorDB:
+        def __init__(self, **http_clients):
+            time.sleep(args.embeddings)
+            self.vectorstore = None
+
+        def connect(self, collection_name=None):
+            time.sleep(args.milvus)
+            self.vectorstore = SlowVectorStore()
+
+    async def slow_checkpointer(backend=None, **kwargs):
+        await asyncio.sleep(args.checkpointer)
+        return InMemorySaver()
+
+    init_tools_module.MultiServerMCPClient = SlowMCPClient
+    init_tools_module.DuckDuckGoSearchRun = slow_search
+    retriever_module.VectorDB = SlowVectorDB
+    workflow.create_checkpointer = slow_checkpointer
+    workflow.init_chat_model = lambda model, **kwargs: FakeChatModel()
+
+
+async def sequential_startup():
+    """The startup sequence before it was parallelized, with eager Milvus"""
+    client = init_tools_module.MultiServerMCPClient({})
+    tools = await client.get_tools()
+    search = init_tools_module.DuckDuckGoSearchRun()
+    retriever_tool = retriever_module.get_retriever_tool()
+    execute_command = next(t for t in tools if t.name == "execute_command")
+    tools = [t for t in tools if t.name != "execute_command"] + [
+        add_human_in_the_loop(execute_command), add_human_in_the_loop(search), retriever_tool,
+    ]
+    llm = workflow.init_chat_model(model="fake")
+    executor = await init_executor(model=llm, tools=cache_tools(tools))
+    summarizer = init_summarizer(model=llm)
+    checkpointer = await workflow.create_checkpointer()
+    return executor, summarizer, checkpointer
+
+
+async def first_kedb_call() -> float:
+    kedb = next(t for t in await init_tools_module.init_tools() if t.name == "query_kedb")
+    start = time.perf_counter()
+    await kedb.ainvoke({"query": "disk full"})
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mcp", type=float, default=0.8, help="MCP server spawn and tool listing (s)")
+    parser.add_argument("--search", type=float, default=0.3, help="DuckDuckGo tool import and setup (s)")
+    parser.add_argument("--embeddings", type=float, default=0.2, help="OpenAI embeddings client setup (s)")
+    parser.add_argument("--milvus", type=float, default=1.0, help="Milvus connection (s)")
+    parser.add_argument("--checkpointer", type=float, default=0.1, help="Checkpointer setup (s)")
+    args = parser.parse_args()
+
+    install_slow_backends(args)
+    results = {
+        "sequential": (await timed(sequential_startup, args.runs))[0],
+        "parallel": (await timed(workflow.build_graph, args.runs))[0],
+    }
+
+    table = make_table("Time until the graph is ready (ms)", ("variant", "mean", "min", "max"))
+    for name, timings in results.items():
+        table.add_row(name, ms(statistics.mean(timings), 0), ms(min(timings), 0), ms(max(timings), 0))
+    console.print(table)
+    console.print(f"First query_kedb call, connecting to Milvus: {await first_kedb_call() * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
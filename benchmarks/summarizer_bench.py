@@ -0,0 +1,141 @@
+"""
+Compare the per-turn cost of langmem's SummarizationNode with the
+incremental summarizer as a thread grows.
+
+All variants run against the fake chat model. With the default zero LLM
+latency the timings are the bookkeeping overhead of a turn (token counting,
+cut-off search, prompt assembly); the LLM cost shows up as the number of
+summarization calls and the tokens sent to them. With --llm-latency the
+timings include the summarization calls a turn waits for, and each turn is
+followed by an executor answer of the same latency.
+
+- langmem (as wired): the previous workflow, whose State had no `context`
+  key, so the running summary was dropped after every turn.
+- langmem: the same node with its running summary persisted.
+- incremental: agent.summarizer.IncrementalSummarizer.
+- background: agent.summarizer.BackgroundSummarizer.
+
+Usage:
+    python benchmarks/summarizer_bench.py --turns 1000
+    python benchmarks/summarizer_bench.py --turns 200 --llm-latency 0.5
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph import add_messages
+from langmem.short_term import SummarizationNode
+
+from agent.summarizer import (
+    MAX_SUMMARY_TOKENS,
+    MAX_TOKENS,
+    MAX_TOKENS_BEFORE_SUMMARY,
+    BackgroundSummarizer,
+    IncrementalSummarizer,
+)
+from benchmarks.fakes import FakeChatModel
+from benchmarks.report import console, make_table, ms
+
+
+class CountingChatModel(FakeChatModel):
+    """Fake model that records how many prompt tokens each call receives."""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        self.prompt_tokens += count_tokens_approximately(messages)
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+async def run_langmem(turns: int, message_words: int, model: FakeChatModel, persist: bool, executor_latency: float) -> List[float]:
+    node = SummarizationNode(
+        model=model,
+        max_tokens=MAX_TOKENS,
+        max_tokens_before_summary=MAX_TOKENS_BEFORE_SUMMARY,
+        max_summary_tokens=MAX_SUMMARY_TOKENS,
+    )
+    state = {"messages": [], "context": {}}
+    timings = []
+    for turn in range(turns):
+        state["messages"] = add_messages(state["messages"], [HumanMessage(content="word " * message_words)])
+        start = time.perf_counter()
+        update = await node.ainvoke(state)
+        timings.append(time.perf_counter() - start)
+        if persist:
+            state["context"] = update.get("context", state["context"])
+        await asyncio.sleep(executor_latency)
+        state["messages"] = add_messages(state["messages"], [AIMessage(content="word " * message_words)])
+    return timings
+
+
+async def run_incremental(turns: int, message_words: int, node: IncrementalSummarizer, executor_latency: float) -> List[float]:
+    state: Dict = {"messages": []}
+    config = {"configurable": {"thread_id": "bench"}}
+    timings = []
+    for turn in range(turns):
+        state["messages"] = add_messages(state["messages"], [HumanMessage(content="word " * message_words)])
+        start = time.perf_counter()
+        if isinstance(node, BackgroundSummarizer):
+            update = await node(state, config)
+        else:
+            update = await node(state)
+        timings.append(time.perf_counter() - start)
+        state.update(update)
+        await asyncio.sleep(executor_latency)
+        state["messages"] = add_messages(state["messages"], [AIMessage(content="word " * message_words)])
+    return timings
+
+
+def report(results: Dict[str, List[float]], models: Dict[str, CountingChatModel], buckets: int):
+    turns = len(next(iter(results.values())))
+    size = max(1, turns // buckets)
+    table = make_table("Summarize node time per turn (ms, mean / max per window)", ["turns", *results])
+    for start in range(0, turns, size):
+        row = [f"{start + 1}-{min(start + size, turns)}"]
+        for timings in results.values():
+            window = timings[start:start + size]
+            row.append(f"{ms(statistics.mean(window), 3)} / {ms(max(window))}")
+        table.add_row(*row)
+    console.print(table)
+
+    calls = make_table("Summarization LLM usage", ("variant", "calls", "prompt tokens", "tokens per turn"))
+    for name, model in models.items():
+        calls.add_row(name, str(model.calls), str(model.prompt_tokens), f"{model.prompt_tokens / turns:.0f}")
+    console.print(calls)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--message-words", type=int, default=60, help="Words per user and assistant message")
+    parser.add_argument("--windows", type=int, default=5, help="Rows in the report")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake LLM latency per call (s)")
+    args = parser.parse_args()
+
+    variants = ("langmem (as wired)", "langmem", "incremental", "background")
+    models = {name: CountingChatModel(ttft=args.llm_latency, token_delay=0) for name in variants}
+    latency = args.llm_latency
+    results = {
+        "langmem (as wired)": await run_langmem(args.turns, args.message_words, models["langmem (as wired)"], False, latency),
+        "langmem": await run_langmem(args.turns, args.message_words, models["langmem"], True, latency),
+        "incremental": await run_incremental(
+            args.turns, args.message_words, IncrementalSummarizer(model=models["incremental"]), latency
+        ),
+        "background": await run_incremental(
+            args.turns, args.message_words, BackgroundSummarizer(model=models["background"]), latency
+        ),
+    }
+    report(results, models, args.windows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
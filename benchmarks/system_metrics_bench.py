@@ -0,0 +1,112 @@
+"""
+Measure get_system_metrics on a host with many mounts, some of them hung.
+
+psutil's partition list and disk_usage are replaced by stand-ins: --mounts
+local mounts that answer after --probe seconds and --hung NFS/FUSE mounts
+that answer after --hang seconds. CPU, memory and platform calls are real.
+
+- eager: the previous implementation, every section collected on every
+  call, static host facts rebuilt and the mounts probed one by one.
+- lazy: tools.mcp_server.get_system_metrics, which collects only the
+  requested section, caches the host facts and probes the mounts
+  concurrently, reporting the hung ones as timed out after
+  DISK_PROBE_TIMEOUT_SEC.
+
+Usage:
+    python benchmarks/system_metrics_bench.py --mounts 200 --hung 2 --hang 3 --runs 3
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import platform
+import statistics
+import time
+from collections import namedtuple
+from typing import Callable, Dict
+
+import psutil
+
+import tools.mcp_server as mcp_server
+from benchmarks.report import console, make_table, ms, timed
+
+Partition = namedtuple("Partition", "device mountpoint fstype opts")
+Usage = namedtuple("Usage", "total used free percent")
+
+
+def install_mounts(args):
+    partitions = [Partition(f"/dev/sd{i}", f"/mnt/local{i}", "ext4", "rw") for i in range(args.mounts)]
+    partitions += [Partition(f"nas:/share{i}", f"/mnt/nfs{i}", "nfs4", "rw") for i in range(args.hung)]
+
+    def disk_usage(mountpoint: str) -> Usage:
+        time.sleep(args.hang if mountpoint.startswith("/mnt/nfs") else args.probe)
+        return Usage(100, 40, 60, 40.0)
+
+    psutil.disk_partitions = lambda all=False: partitions
+    psutil.disk_usage = disk_usage
+
+
+def eager_system_metrics(metrics_type: str = "all"):
+    """The previous get_system_metrics, minus the 1s CPU sample that the sampler replaced"""
+    latest = mcp_server.sampler.latest()
+    system_info = {
+        "system": platform.system(),
+        "node_name": platform.node(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "machine": platform.machine(),
+        "processor": platform.processor()
+    }
+    cpu_info = {
+        "cpu_count_logical": psutil.cpu_count(logical=True),
+        "cpu_count_physical": psutil.cpu_count(logical=False),
+        "cpu_percent": latest.cpu_percent
+    }
+    virtual_mem = psutil.virtual_memory()
+    ram_info = {
+        "total": virtual_mem.total,
+        "available": virtual_mem.available,
+        "used": virtual_mem.used,
+        "percent": virtual_mem.percent
+    }
+    disk_info = []
+    for partition in psutil.disk_partitions():
+        usage = psutil.disk_usage(partition.mountpoint)
+        disk_info.append({"mountpoint": partition.mountpoint, "percent": usage.percent})
+    sections = {"system": system_info, "cpu": cpu_info, "ram": ram_info, "disk": disk_info}
+    return sections.get(metrics_type, sections)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mounts", type=int, default=200, help="Healthy mounts")
+    parser.add_argument("--hung", type=int, default=2, help="Hung NFS/FUSE mounts")
+    parser.add_argument("--probe", type=float, default=0.002, help="disk_usage time of a healthy mount (s)")
+    parser.add_argument("--hang", type=float, default=3.0, help="disk_usage time of a hung mount (s)")
+    args = parser.parse_args()
+
+    install_mounts(args)
+    mcp_server.sampler.latest()
+
+    # The first call finds every mount unprobed
+    disks = await mcp_server.get_system_metrics("disk")
+    timed_out = [disk["mountpoint"] for disk in disks if "error" in disk]
+
+    variants: Dict[str, Callable] = {"eager": eager_system_metrics, "lazy": mcp_server.get_system_metrics}
+    table = make_table(
+        f"get_system_metrics with {args.mounts} mounts and {args.hung} hung, "
+        f"probe timeout {mcp_server.DISK_PROBE_TIMEOUT_SEC:.0f}s (ms per call)",
+        ("metrics_type", "variant", "mean", "min", "max"),
+    )
+    for metrics_type in ("cpu", "ram", "system", "disk", "all"):
+        for name, collect in variants.items():
+            timings, _ = await timed(lambda: collect(metrics_type), args.runs)
+            table.add_row(metrics_type, name, ms(statistics.mean(timings)), ms(min(timings)), ms(max(timings)))
+    console.print(table)
+    console.print(f"Reported as timed out: {', '.join(timed_out) or 'none'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Measure what tool outputs of growing size cost the model context.
+
+A stand-in for `journalctl` returns --sizes lines of log text. Each output
+goes through tools.output's limit wrapper, and read_tool_output then pages
+and greps the saved full text.
+
+- raw: the whole output reaches the model and every checkpoint.
+- bounded: head and tail plus a handle, whatever the size.
+
+Tokens are estimated at 4 characters each.
+
+Usage:
+    python benchmarks/tool_output_bench.py --sizes 100 1000 10000 100000 --runs 5
+"""
+import os, sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import asyncio
+import re
+import statistics
+import tempfile
+
+from langchain_core.tools import tool
+
+from benchmarks.report import console, make_table, ms, timed
+from tools.output import SpillStore, add_output_limit, get_output_reader_tool
+
+
+def journal(lines: int) -> str:
+    return "\n".join(
+        f"Oct 16 12:{i // 60 % 60:02d}:{i % 60:02d} web-01 nginx[{1000 + i % 7}]: "
+        + ("upstream timed out (110: Connection timed out) while reading response header"
+           if i % 97 == 0 else f"GET /api/v1/items/{i} 200 {i % 5000} bytes")
+        for i in range(lines)
+    )
+
+
+async def mean_time(call, runs: int) -> tuple:
+    timings, result = await timed(call, runs)
+    return statistics.mean(timings), result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="Output lines")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SpillStore(directory, ttl=3600, max_files=1000)
+        reader = get_output_reader_tool(store)
+        table = make_table(
+            "journalctl output through the tool output limit",
+            ("lines", "raw tokens", "bounded tokens", "limit overhead (ms)", "page 100 lines (ms)", "grep errors (ms)"),
+        )
+
+        for lines in args.sizes:
+            output = journal(lines)
+
+            @tool("execute_command")
+            async def execute_command(command: str) -> str:
+                """Execute a system command."""
+                return output
+
+            limited = add_output_limit(execute_command, store)
+            overhead, bounded = await mean_time(lambda: limited.ainvoke({"command": "journalctl -u nginx"}), args.runs)
+            # The wrapper's cost on top of the tool itself
+            overhead -= (await mean_time(lambda: execute_command.ainvoke({"command": "journalctl -u nginx"}), args.runs))[0]
+
+            handle = re.search(r"out_[0-9a-f]{16}", bounded)
+            page = grep = None
+            if handle:
+                page, _ = await mean_time(lambda: reader.ainvoke({"handle": handle.group(), "offset": lines // 2}), args.runs)
+                grep, _ = await mean_time(
+                    lambda: reader.ainvoke({"handle": handle.group(), "pattern": "timed out", "limit": 20}), args.runs
+                )
+            table.add_row(
+                str(lines),
+                f"{len(output) // 4}",
+                f"{len(bounded) // 4}",
+                ms(max(overhead, 0), 2),
+                ms(page, 2) if page is not None else "-",
+                ms(grep, 2) if grep is not None else "-",
+            )
+        console.print(table)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
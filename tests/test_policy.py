@@ -0,0 +1,168 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tools import policy
+from tools.policy import DEFAULT_POLICY, SENSITIVE_PATHS, ApprovalPolicy
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+@pytest.fixture(scope="module")
+def default_policy() -> ApprovalPolicy:
+    return ApprovalPolicy(DEFAULT_POLICY)
+
+def evaluate(approval_policy: ApprovalPolicy, command: str, cwd=None):
+    return approval_policy.evaluate("execute_command", {"command": command, "cwd": cwd})
+
+@pytest.mark.parametrize("command, cwd", [
+    ("uptime", None),
+    ("uptime -p", None),
+    ("/usr/bin/uptime", None),
+    ("df -h", None),
+    ("df -hT /var", None),
+    ("free -m", None),
+    ("du -sh /var/log", None),
+    ("du --max-depth=1 /var", None),
+    ("ps aux", None),
+    ("ps -e -o pid,%cpu,cmd --sort=-pcpu", None),
+    ("ps -p 1 -o cmd=", None),
+    ("vmstat 1 5", None),
+    ("ls -la /home", None),
+    ("cat /var/log/syslog", None),
+    ("cat /proc/1/cmdline", None),
+    ("tail -n 50 /var/log/syslog", None),
+    ("tail -n50 /var/log/syslog", None),
+    ("head --lines=5 /proc/meminfo", None),
+    ("journalctl -u nginx -n 50 --no-pager", None),
+    ("systemctl status nginx", None),
+    ("systemctl list-units --all", None),
+    ("cat syslog", "/var/log"),
+    ("ls -- /home", None),
+])
+def test_read_only_diagnostics_are_approved(default_policy, command, cwd):
+    decision = evaluate(default_policy, command, cwd)
+    assert decision.approved, decision.reason
+
+@pytest.mark.parametrize("command, cwd", [
+    ("cat /etc/shadow", None),
+    ("stat /etc/shadow", None),
+    ("ls /etc/sudoers.d", None),
+    ("ls -la /root", None),
+    ("ls -la /home/user/.ssh/", None),
+    ("ls /home/user/.aws/credentials", None),
+    ("ls /srv/app/.env", None),
+    ("cat /proc/self/environ", None),
+    ("cat /proc/1/environ", None),
+    ("wc -c /proc/kcore", None),
+    ("ls /dev/sda", None),
+    # /proc links back into the filesystem and to open files
+    ("cat /proc/1/root/etc/shadow", None),
+    ("cat /proc/self/root/etc/shadow", None),
+    ("ls /proc/1/root", None),
+    ("ls -la /proc/1/cwd/", None),
+    ("ls -la /proc/1/fd", None),
+    ("cat /proc/1/fd/3", None),
+    ("ls /proc/1/map_files", None),
+    # Flag values are paths too
+    ("du -sh --files0-from=/etc/shadow", None),
+    # Wherever the binary lives
+    ("/tmp/cat /etc/shadow", None),
+])
+def test_sensitive_paths_are_denied(default_policy, command, cwd):
+    decision = evaluate(default_policy, command, cwd)
+    assert not decision.approved
+    assert decision.reason == "deny rule"
+
+@pytest.mark.parametrize("pattern", ["/proc/*/root*", "/proc/*/cwd*", "/proc/*/fd*", "/etc/shadow*", "*/.ssh*"])
+def test_sensitive_paths_cover(pattern):
+    assert pattern in SENSITIVE_PATHS
+
+@pytest.mark.parametrize("command, cwd", [
+    # Traversal is judged by where it leads
+    ("tail -n 5 /var/log/../../etc/shadow", None),
+    ("cat /var/log/../../root/.bash_history", None),
+    ("ls ../../root", "/var/log"),
+    ("cat ../../etc/shadow", "/var/log"),
+])
+def test_traversal_is_normalized(default_policy, command, cwd):
+    decision = evaluate(default_policy, command, cwd)
+    assert not decision.approved
+    assert decision.reason == "deny rule"
+
+@pytest.mark.parametrize("command, cwd", [
+    ("cat /var/log/../../etc/passwd", None),
+    ("cat ../../etc/passwd", "/var/log"),
+    ("cat passwd", "/etc"),
+    # Relative to a working directory that is not known
+    ("cat syslog", None),
+    ("cat syslog", "var/log"),
+])
+def test_paths_outside_the_rule_go_to_a_human(default_policy, command, cwd):
+    assert not evaluate(default_policy, command, cwd).approved
+
+def test_symlinks_are_judged_by_their_target(default_policy, tmp_path):
+    link = tmp_path / "shadow"
+    link.symlink_to("/etc/shadow")
+    decision = evaluate(default_policy, f"ls -l {link}")
+    assert not decision.approved
+    assert decision.reason == "deny rule"
+
+@pytest.mark.parametrize("command, approved", [
+    # Everything after -- is positional and checked as a path, never as a flag
+    ("ls -- /home", True),
+    ("tail -n 5 -- /var/log/syslog", True),
+    ("tail -n5 -- /etc/shadow", False),
+    ("cat -- /proc/1/environ", False),
+    ("ls -- -la", False),
+    ("ls -la -- --recursive", False),
+])
+def test_double_dash(default_policy, command, approved):
+    assert evaluate(default_policy, command).approved is approved
+
+@pytest.mark.parametrize("command, reason", [
+    ("./uptime", "no rule for binary"),
+    ("/tmp/df -h", "no rule for binary"),
+    ("rm -rf /tmp/x", "no rule for binary"),
+    ("systemctl stop nginx", "not allowed: subcommand stop"),
+    ("hostname evil", "not allowed: argument evil"),
+    ("date -s 2020-01-01", "not allowed: flag -s"),
+    ("df -h --output=source", "not allowed: flag --output=source"),
+    ("journalctl -D /var/log/journal", "not allowed: flag -D"),
+    ("tail -n five /var/log/syslog", "not allowed: option -n five"),
+    ("", "empty command"),
+])
+def test_unmatched_calls_go_to_a_human(default_policy, command, reason):
+    decision = evaluate(default_policy, command)
+    assert not decision.approved
+    assert decision.reason == reason
+
+def test_unparsable_command_goes_to_a_human(default_policy):
+    decision = evaluate(default_policy, "cat '/var/log/syslog")
+    assert not decision.approved
+    assert decision.reason.startswith("unparsable command")
+
+@pytest.mark.parametrize("tool_name", ["duckduckgo_search", "query_kedb", "unknown_tool"])
+def test_other_tools_are_not_auto_approved(default_policy, tool_name):
+    assert not default_policy.evaluate(tool_name, {"query": "nginx 502"}).approved
+
+def test_auto_approve_is_disabled_by_default():
+    # A fresh interpreter without the variable, ignoring any local .env
+    env = {key: value for key, value in os.environ.items() if key != "AUTO_APPROVE_ENABLED"}
+    script = (
+        "import dotenv; dotenv.load_dotenv = lambda *args, **kwargs: False\n"
+        "from tools import policy\n"
+        "print(policy.AUTO_APPROVE_ENABLED, policy.get_default_policy())\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["False", "None"]
+
+def test_default_policy_needs_auto_approve(monkeypatch):
+    monkeypatch.setattr(policy, "AUTO_APPROVE_ENABLED", False)
+    assert policy.get_default_policy() is None
+    monkeypatch.setattr(policy, "AUTO_APPROVE_ENABLED", True)
+    monkeypatch.setattr(policy, "_default_policy", None)
+    assert isinstance(policy.get_default_policy(), ApprovalPolicy)
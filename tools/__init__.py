@@ -1,5 +1,9 @@
 from .init_tools import init_tools
+from .cache import TOOL_CACHE, add_cache, cache_tools
 
 __all__ = [
-    "init_tools"
+    "init_tools",
+    "TOOL_CACHE",
+    "add_cache",
+    "cache_tools",
 ]
\ No newline at end of file
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, tool as create_tool
+from loguru import logger
+from prometheus_client import Counter
+from pydantic import BaseModel
+from dotenv import load_dotenv
+from .rag.connect import kedb_version
+
+load_dotenv()
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# How long a read of a tool's data version is trusted; a change shows up this late
+TOOL_CACHE_VERSION_CHECK_SEC = float(os.getenv("TOOL_CACHE_VERSION_CHECK_SEC", 5))
+
+class CachePolicy(NamedTuple):
+    ttl: float
+    max_size: int
+    # Returns the version of the data behind the tool; a change drops all its entries
+    version: Optional[Callable[[], Any]] = None
+
+# Only idempotent, read-only tools belong here
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    # Samples are a second of CPU time; a few seconds old is still current
+    "get_system_metrics": CachePolicy(ttl=5, max_size=16),
+    "get_process_metrics": CachePolicy(ttl=5, max_size=128),
+    # KEDB only changes when it is re-ingested
+    "query_kedb": CachePolicy(ttl=300, max_size=256, version=kedb_version),
+}
+# Tools with side effects; never cached whatever the policies say
+NEVER_CACHE = {"execute_command"}
+
+CACHE_REQUESTS = Counter(
+    "agent_tool_cache_requests",
+    "Tool calls looked up in the result cache",
+    ["tool", "result"],
+)
+
+class ToolResultCache:
+    """
+    TTL and LRU bounded cache of tool results, one partition per tool.
+
+    Concurrent calls with the same key share one tool run instead of each
+    missing the cache. A tool's data version is read at most every
+    `version_ttl` seconds.
+    """
+
+    def __init__(self, policies: Dict[str, CachePolicy], version_ttl: float = TOOL_CACHE_VERSION_CHECK_SEC):
+        self.policies = dict(policies)
+        self.version_ttl = version_ttl
+        # tool -> key -> (expires_at, result)
+        self._entries: Dict[str, "OrderedDict[str, Tuple[float, Any]]"] = {
+            name: OrderedDict() for name in self.policies
+        }
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._versions: Dict[str, Any] = {}
+        self._version_checked_at: Dict[str, float] = {}
+        self._hits: Dict[str, int] = {name: 0 for name in self.policies}
+        self._misses: Dict[str, int] = {name: 0 for name in self.policies}
+
+    def get(self, name: str, key: str) -> Tuple[bool, Any]:
+        self._check_version(name)
+        entries = self._entries[name]
+        entry = entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del entries[key]
+            return False, None
+        entries.move_to_end(key)
+        return True, result
+
+    def set(self, name: str, key: str, result: Any):
+        policy = self.policies[name]
+        entries = self._entries[name]
+        entries[key] = (time.monotonic() + policy.ttl, result)
+        entries.move_to_end(key)
+        while len(entries) > policy.max_size:
+            entries.popitem(last=False)
+
+    async def call(self, name: str, key: str, run) -> Any:
+        """Return the cached result for key, or await run() and cache it"""
+        found, result = self.get(name, key)
+        if found:
+            self._record(name, "hit")
+            return result
+
+        inflight = self._inflight.get((name, key))
+        if inflight is not None:
+            try:
+                result = await asyncio.shield(inflight)
+                self._record(name, "hit")
+                return result
+            except asyncio.CancelledError:
+                # The shared run was cancelled, not us: run the tool ourselves
+                if not inflight.cancelled():
+                    raise
+
+        self._record(name, "miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(name, key)] = future
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Errors are not cached; callers waiting on this run see the same error
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            self.set(name, key, result)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop((name, key), None)
+
+    def _check_version(self, name: str):
+        version_fn = self.policies[name].version
+        if version_fn is None:
+            return
+        # The version is a file read; not one on every call
+        now = time.monotonic()
+        if name in self._versions and now - self._version_checked_at[name] < self.version_ttl:
+            return
+        self._version_checked_at[name] = now
+        version = version_fn()
+        if name in self._versions and self._versions[name] != version:
+            logger.info(f"Data behind {name} changed, dropping its cached results")
+            self._entries[name].clear()
+        self._versions[name] = version
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop the cached results of one tool, or of all tools"""
+        for tool_name, entries in self._entries.items():
+            if name is None or tool_name == name:
+                entries.clear()
+
+    def _record(self, name: str, result: str):
+        if result == "hit":
+            self._hits[name] += 1
+        else:
+            self._misses[name] += 1
+        CACHE_REQUESTS.labels(tool=name, result=result).inc()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, policy in self.policies.items():
+            hits, misses = self._hits[name], self._misses[name]
+            stats[name] = {
+                "size": len(self._entries[name]),
+                "max_size": policy.max_size,
+                "ttl": policy.ttl,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+        return stats
+
+TOOL_CACHE = ToolResultCache(CACHE_POLICIES)
+
+def _cache_key(tool: BaseTool, tool_input: Dict[str, Any]) -> str:
+    """Arguments with defaults filled in, serialized in a stable order"""
+    args = dict(tool_input)
+    schema = tool.args_schema
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        for field_name, field in schema.model_fields.items():
+            if field_name not in args and not field.is_required():
+                args[field_name] = field.get_default(call_default_factory=True)
+    elif isinstance(schema, dict):
+        # MCP tools describe their arguments with a JSON schema
+        for field_name, field in (schema.get("properties") or {}).items():
+            if field_name not in args and "default" in field:
+                args[field_name] = field["default"]
+    return json.dumps(args, sort_keys=True, default=str)
+
+def add_cache(tool: BaseTool, cache: ToolResultCache = TOOL_CACHE) -> BaseTool:
+    """Wrap a read-only tool so repeated calls within its TTL reuse the result."""
+    if tool.name in NEVER_CACHE:
+        raise ValueError(f"Tool {tool.name} has side effects and cannot be cached")
+    if tool.name not in cache.policies:
+        raise ValueError(f"No cache policy for tool {tool.name}")
+
+    @create_tool(
+        tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema
+    )
+    async def call_tool_with_cache(config: RunnableConfig, **tool_input):
+        return await cache.call(
+            tool.name,
+            _cache_key(tool, tool_input),
+            lambda: tool.ainvoke(tool_input, config),
+        )
+
+    return call_tool_with_cache
+
+def cache_tools(tools: List[BaseTool], cache: ToolResultCache = TOOL_CACHE) -> List[BaseTool]:
+    """Wrap every tool that has a cache policy, leaving the others untouched."""
+    if not TOOL_CACHE_ENABLED:
+        return tools
+    cached = [
+        add_cache(t, cache) if t.name in cache.policies and t.name not in NEVER_CACHE else t
+        for t in tools
+    ]
+    logger.info(f"Caching results of tools: {[t.name for t in tools if t.name in cache.policies]}")
+    return cached
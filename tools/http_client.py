@@ -0,0 +1,79 @@
+import os, sys
+from typing import Any, Dict, Optional
+
+import httpx
+from loguru import logger
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ---- Env config ----
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+# Connections beyond this are closed after each request and reopened by the
+# next burst, so keep it at the concurrency the server actually runs
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 100))
+HTTP_KEEPALIVE_EXPIRY_SEC = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SEC", 60))
+HTTP_CONNECT_TIMEOUT_SEC = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", 5))
+# Matches the OpenAI SDK default; streamed completions can take minutes
+HTTP_TIMEOUT_SEC = float(os.getenv("HTTP_TIMEOUT_SEC", 600))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+
+def _http2() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP/2 disabled, the h2 package is missing (pip install 'httpx[http2]')")
+        return False
+    return True
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "http2": _http2(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SEC,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT_SEC, connect=HTTP_CONNECT_TIMEOUT_SEC),
+        # The OpenAI SDK's own clients follow redirects too
+        "follow_redirects": True,
+    }
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    The process-wide pooled async HTTP client.
+
+    Every LLM, embedding and title call shares its keep-alive connections
+    (multiplexed over HTTP/2 when the server supports it), so a burst of
+    requests reuses warm TLS sessions instead of opening new ones. It
+    belongs to the event loop of the server.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(**_client_options())
+    return _async_client
+
+def get_http_client() -> httpx.Client:
+    """The pooled client for synchronous calls, e.g. retrievers run in threads"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+def http_client_kwargs() -> Dict[str, Any]:
+    """Keyword arguments that plug the shared clients into langchain_openai models"""
+    return {"http_client": get_http_client(), "http_async_client": get_async_http_client()}
+
+async def aclose_http_clients():
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
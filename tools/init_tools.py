@@ -1,16 +1,28 @@
 import os, sys
+import asyncio
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_community.tools import DuckDuckGoSearchRun
 from .interruptor import add_human_in_the_loop
-from .retriever import get_retriever_tool
+from .cache import cache_tools
+from .output import add_output_limit, get_output_reader_tool, limit_tools
+from .retriever import get_lazy_retriever_tool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MCP_URL = os.getenv("MCP_HOST", "http://localhost:8000/mcp")
+# stdio spawns the MCP server for every tool call; streamable_http connects to
+# a long-running one at MCP_HOST, which keeps its metrics history between calls
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
 
 async def init_tools():
-    try: 
+    """
+    Load every tool of the executor.
+
+    Listing the MCP server's tools and building the search tool run
+    concurrently; the KEDB retriever connects to Milvus on its first call.
+    """
+    if MCP_TRANSPORT == "stdio":
         client = MultiServerMCPClient(
             {
                 "system-metrics-mcp": {
@@ -20,7 +32,7 @@ async def init_tools():
                 }
             }
         )
-    except:
+    elif MCP_TRANSPORT == "streamable_http":
         client = MultiServerMCPClient(
             {
                 "system-metrics-mcp": {
@@ -29,20 +41,29 @@ async def init_tools():
                 }
             }
         )
+    else:
+        raise ValueError(f"Unknown MCP_TRANSPORT: {MCP_TRANSPORT}")
 
-    tools = await client.get_tools()    
-    search = DuckDuckGoSearchRun()        
-    retriever_tool =  get_retriever_tool()
+    # Spawning the MCP server and importing the search client overlap
+    tools, search = await asyncio.gather(
+        client.get_tools(),
+        asyncio.to_thread(DuckDuckGoSearchRun),
+    )
+    # Long outputs reach the model as head and tail; read_tool_output pages the rest
+    tools = limit_tools(tools)
+    retriever_tool = add_output_limit(get_lazy_retriever_tool())
     execute_command_tool = next(t for t in tools if t.name == "execute_command")
     other_tools = [t for t in tools if t.name != "execute_command"]
 
     wrapped_execute_command = add_human_in_the_loop(execute_command_tool)
-    wrapped_search = add_human_in_the_loop(search)
+    wrapped_search = add_human_in_the_loop(add_output_limit(search))
 
     tools = other_tools + [wrapped_execute_command, wrapped_search, retriever_tool]
+    output_reader = get_output_reader_tool()
+    if output_reader is not None:
+        tools.append(output_reader)
 
-    return tools
+    return cache_tools(tools)
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(init_tools())
\ No newline at end of file
+    asyncio.run(init_tools())
@@ -1,19 +1,31 @@
-from typing import Callable
+from typing import Callable, Optional
 from langchain_core.tools import BaseTool, tool as create_tool
 from langchain_core.runnables import RunnableConfig
 from langgraph.types import interrupt
 from langgraph.prebuilt.interrupt import HumanInterruptConfig, HumanInterrupt
 import os
+from loguru import logger
+from .policy import ApprovalPolicy, audit, get_default_policy
 
 def add_human_in_the_loop(
     tool: Callable | BaseTool,
     *,
     interrupt_config: HumanInterruptConfig = None,
+    policy: Optional[ApprovalPolicy] = None,
 ) -> BaseTool:
-    """Wrap a tool to support human-in-the-loop review with JSON logging."""
+    """
+    Wrap a tool to support human-in-the-loop review with JSON logging.
+
+    Calls the approval policy allows run straight away; the rest interrupt
+    the graph until a human approves or denies them. Every decision is
+    written to the approval audit log.
+    """
     if not isinstance(tool, BaseTool):
         tool = create_tool(tool)
 
+    if policy is None:
+        policy = get_default_policy()
+
     if interrupt_config is None:
         interrupt_config = {
             "allow_ignore": True,
@@ -28,6 +40,16 @@ def add_human_in_the_loop(
         args_schema=tool.args_schema
     )
     async def call_tool_with_interrupt(config: RunnableConfig, **tool_input):
+        thread_id = (config.get("configurable") or {}).get("thread_id")
+        reason = None
+        if policy is not None:
+            decision = policy.evaluate(tool.name, tool_input)
+            reason = decision.reason
+            if decision.approved:
+                logger.info(f"Auto-approved {tool.name} call: {tool_input}")
+                audit(tool.name, tool_input, "auto_approved", thread_id, rule=decision.rule)
+                return await tool.ainvoke(tool_input, config)
+
         request: HumanInterrupt = {
             "action_request": {
                 "action": tool.name,
@@ -39,7 +61,12 @@ def add_human_in_the_loop(
         response = interrupt(request)
 
         if response["type"] == "y":
+            audit(tool.name, tool_input, "approved", thread_id, policy_reason=reason)
             tool_response = await tool.ainvoke(tool_input, config)
+        elif response["type"] == "n":
+            audit(tool.name, tool_input, "denied", thread_id, policy_reason=reason)
+            # A refusal, not an error the model should retry
+            tool_response = f"The user denied this {tool.name} call; it was not executed."
         else:
             raise ValueError(f"Unsupported interrupt response type: {response['type']}")
 
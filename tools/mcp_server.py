@@ -1,103 +1,499 @@
 import os, sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import asyncio
+import functools
+import heapq
+import math
 import platform
 import psutil
 import shlex
-import subprocess
-from mcp.server.fastmcp import FastMCP
+import signal
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+from loguru import logger
+from mcp.server.fastmcp import Context, FastMCP
 from mcp.types import TextContent
-from typing import Dict, List, Union, Optional, Any
+from typing import Dict, List, NamedTuple, Union, Optional, Any, Iterable
 
 os.environ['DANGEROUSLY_OMIT_AUTH'] = 'true'
+load_dotenv()
+
+# ---- Env config ----
+METRICS_SAMPLE_INTERVAL_SEC = float(os.getenv("METRICS_SAMPLE_INTERVAL_SEC", 1))
+# One hour of history at the default interval
+METRICS_HISTORY_SIZE = int(os.getenv("METRICS_HISTORY_SIZE", 3600))
+PROCESS_SAMPLE_INTERVAL_SEC = float(os.getenv("PROCESS_SAMPLE_INTERVAL_SEC", 2))
+# stdio: spawned by the agent, one process per tool call, so no history;
+# streamable_http: a long-running server whose samples accumulate
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+DISK_PROBE_TIMEOUT_SEC = float(os.getenv("DISK_PROBE_TIMEOUT_SEC", 2))
+DISK_PROBE_WORKERS = int(os.getenv("DISK_PROBE_WORKERS", 16))
+EXEC_MAX_CONCURRENCY = int(os.getenv("EXEC_MAX_CONCURRENCY", 4))
+# Per stream, split between its first and last bytes; the middle is read and discarded
+EXEC_MAX_OUTPUT_BYTES = int(os.getenv("EXEC_MAX_OUTPUT_BYTES", 64 * 1024))
+EXEC_READ_CHUNK_BYTES = 4096
+# How long the pipes may stay open once the command is gone, e.g. held by a child that left its session
+EXEC_DRAIN_SEC = 1.0
+EXEC_EXIT_POLL_SEC = 0.05
 
 mcp = FastMCP()
 
-@mcp.tool()
-def get_system_metrics(
-    metrics_type: str = "all"
-) -> Union[Dict, List[Dict]]:
+# ---- Metrics sampler ----
+class Sample(NamedTuple):
+    timestamp: float
+    cpu_percent: float
+    memory_percent: float
+    swap_percent: float
+    load_1: float
+    load_5: float
+    load_15: float
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+class BackgroundSampler(ABC):
+    """Runs `collect` every `interval` seconds in a daemon thread"""
+
+    name = "sampler"
+    # Seconds from the baseline taken by `_prime` to the first collection
+    first_delay: Optional[float] = None
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def wait_ready(self):
+        """Starts the sampler and, right after startup, waits for its first collection"""
+        self.start()
+        self._ready.wait((self.first_delay if self.first_delay is not None else self.interval) + self.interval)
+
+    def _prime(self):
+        pass
+
+    @abstractmethod
+    def collect(self):
+        raise NotImplementedError
+
+    def _run(self):
+        try:
+            self._prime()
+        except Exception:
+            logger.exception(f"{self.name}: baseline failed")
+        delay = self.first_delay if self.first_delay is not None else self.interval
+        failing = False
+        while not self._stop.wait(delay):
+            delay = self.interval
+            try:
+                self.collect()
+            except Exception:
+                self.failures += 1
+                # Once per run of failures, not on every tick
+                if not failing:
+                    logger.exception(f"{self.name}: collection failed")
+                failing = True
+                continue
+            if failing:
+                logger.info(f"{self.name}: collecting again after {self.failures} failures")
+            failing = False
+            self._ready.set()
+
+class MetricsSampler(BackgroundSampler):
     """
-    Collect system metrics.
-    
-    Args:
-        metrics_type: one of "system", "cpu", "ram", "disk", "all"
-    
-    Returns:
-        Dict or List[Dict] depending on metrics_type
+    Samples CPU, memory, swap and load in a background thread.
+
+    The latest `history_size` samples are kept in a ring buffer, so tools
+    answer from the newest one instantly instead of blocking for a CPU
+    measurement, and can summarize a recent window of them.
     """
-    try:
-        # System info
-        system_info = {
-            "system": platform.system(),
-            "node_name": platform.node(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "machine": platform.machine(),
-            "processor": platform.processor()
-        }
 
-        # CPU info
-        cpu_info = {
-            "cpu_count_logical": psutil.cpu_count(logical=True),
-            "cpu_count_physical": psutil.cpu_count(logical=False),
-            "cpu_percent": psutil.cpu_percent(interval=1)
-        }
+    name = "metrics-sampler"
+    # Long enough for a meaningful CPU percent, short enough for a spawned stdio server
+    first_delay = 0.25
+
+    def __init__(self, interval: float = METRICS_SAMPLE_INTERVAL_SEC, history_size: int = METRICS_HISTORY_SIZE):
+        super().__init__(interval)
+        self.samples: "deque[Sample]" = deque(maxlen=history_size)
+
+    def _prime(self):
+        # CPU percent is measured between calls; this call sets the baseline
+        psutil.cpu_percent(interval=None)
+
+    def collect(self):
+        sample = self._sample()
+        with self._lock:
+            self.samples.append(sample)
+
+    @staticmethod
+    def _sample() -> Sample:
+        load_1, load_5, load_15 = psutil.getloadavg()
+        return Sample(
+            timestamp=time.time(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            memory_percent=psutil.virtual_memory().percent,
+            swap_percent=psutil.swap_memory().percent,
+            load_1=load_1,
+            load_5=load_5,
+            load_15=load_15,
+        )
+
+    def latest(self) -> Sample:
+        """The newest sample; right after startup, waits for the first one"""
+        self.wait_ready()
+        with self._lock:
+            if self.samples:
+                return self.samples[-1]
+        return self._sample()
+
+    def window(self, seconds: float, fields: Iterable[str]) -> Dict[str, Any]:
+        """min/avg/max/p95 of each field over the samples of the last `seconds`"""
+        self.start()
+        since = time.time() - seconds
+        with self._lock:
+            samples = [sample for sample in self.samples if sample.timestamp >= since]
+        stats: Dict[str, Any] = {"seconds": seconds, "samples": len(samples)}
+        for field in fields:
+            if not samples:
+                stats[field] = None
+                continue
+            values = sorted(getattr(sample, field) for sample in samples)
+            stats[field] = {
+                "min": values[0],
+                "avg": round(sum(values) / len(values), 2),
+                "max": values[-1],
+                "p95": _percentile(values, 95),
+            }
+        return stats
+
+sampler = MetricsSampler()
+
+# ---- Process sampler ----
+class ProcessStats(NamedTuple):
+    pid: int
+    name: Optional[str]
+    user: Optional[str]
+    status: Optional[str]
+    cpu_percent: float
+    memory_percent: float
+    rss: int
+    rss_delta: int
+    read_bytes_per_sec: Optional[float]
+    write_bytes_per_sec: Optional[float]
+    num_fds: Optional[int]
+    num_fds_delta: Optional[int]
+
+# Fields get_process_metrics can rank by
+PROCESS_SORT_KEYS = (
+    "cpu_percent", "memory_percent", "rss", "rss_delta",
+    "read_bytes_per_sec", "write_bytes_per_sec", "num_fds", "num_fds_delta",
+)
+
+class _Counters(NamedTuple):
+    """Raw cumulative counters of one process, kept to compute the next deltas"""
+    timestamp: float
+    create_time: float
+    cpu_time: float
+    rss: int
+    read_bytes: Optional[int]
+    write_bytes: Optional[int]
+    num_fds: Optional[int]
+
+PROCESS_ATTRS = ["name", "username", "status", "create_time", "cpu_times", "memory_info", "io_counters"]
+if hasattr(psutil.Process, "num_fds"):
+    PROCESS_ATTRS.append("num_fds")
+
+def _rate(current: Optional[int], previous: Optional[int], elapsed: float) -> Optional[float]:
+    if current is None or previous is None or elapsed <= 0:
+        return None
+    return round((current - previous) / elapsed, 2)
+
+class ProcessSampler(BackgroundSampler):
+    """
+    Scans the process table in a background thread.
+
+    CPU, RSS, IO and open files are reported as deltas against the previous
+    scan, so CPU is a real rate rather than psutil's 0 on a first call.
+    The first scan is only a baseline; the first snapshot follows
+    `first_delay` later. Tools rank the latest snapshot with a heap and read
+    a single pid directly instead of scanning.
+    """
 
-        # RAM info
-        virtual_mem = psutil.virtual_memory()
-        ram_info = {
-            "total": virtual_mem.total,
-            "available": virtual_mem.available,
-            "used": virtual_mem.used,
-            "percent": virtual_mem.percent
+    name = "process-sampler"
+    # Short, so a spawned stdio server answers quickly, yet a measurable CPU interval
+    first_delay = 0.5
+
+    def __init__(self, interval: float = PROCESS_SAMPLE_INTERVAL_SEC):
+        super().__init__(interval)
+        self.snapshot: Dict[int, ProcessStats] = {}
+        self.sampled_at: Optional[float] = None
+        self._counters: Dict[int, _Counters] = {}
+
+    @staticmethod
+    def _read_counters(info: Dict[str, Any], timestamp: float) -> _Counters:
+        cpu_times = info["cpu_times"]
+        io = info["io_counters"]
+        return _Counters(
+            timestamp=timestamp,
+            create_time=info["create_time"] or 0.0,
+            cpu_time=cpu_times.user + cpu_times.system if cpu_times else 0.0,
+            rss=info["memory_info"].rss if info["memory_info"] else 0,
+            read_bytes=io.read_bytes if io else None,
+            write_bytes=io.write_bytes if io else None,
+            num_fds=info.get("num_fds"),
+        )
+
+    @staticmethod
+    def _stats(pid: int, info: Dict[str, Any], current: _Counters, previous: Optional[_Counters], total_memory: int) -> ProcessStats:
+        # A reused pid is a different process, and a new process has no previous
+        # scan; both are measured over their lifetime instead
+        if previous is None or previous.create_time != current.create_time:
+            previous = _Counters(current.create_time, current.create_time, 0.0, 0, 0, 0, None)
+        elapsed = current.timestamp - previous.timestamp
+        return ProcessStats(
+            pid=pid,
+            name=info["name"],
+            user=info["username"],
+            status=info["status"],
+            cpu_percent=round((current.cpu_time - previous.cpu_time) / elapsed * 100, 2) if elapsed > 0 else 0.0,
+            memory_percent=round(current.rss / total_memory * 100, 2),
+            rss=current.rss,
+            rss_delta=current.rss - previous.rss,
+            read_bytes_per_sec=_rate(current.read_bytes, previous.read_bytes, elapsed),
+            write_bytes_per_sec=_rate(current.write_bytes, previous.write_bytes, elapsed),
+            num_fds=current.num_fds,
+            num_fds_delta=None if current.num_fds is None or previous.num_fds is None
+                else current.num_fds - previous.num_fds,
+        )
+
+    def _prime(self):
+        # Counters only: deltas against nothing would be lifetime averages
+        self._counters = {
+            proc.pid: self._read_counters(proc.info, time.time())
+            for proc in psutil.process_iter(PROCESS_ATTRS, ad_value=None)
         }
 
-        # Disk info
-        disk_info: List[Dict[str, Union[str, int, float]]] = []
-        for partition in psutil.disk_partitions():
-            usage = psutil.disk_usage(partition.mountpoint)
-            disk_info.append({
-                "device": partition.device,
-                "mountpoint": partition.mountpoint,
-                "fstype": partition.fstype,
+    def collect(self):
+        total_memory = psutil.virtual_memory().total
+        snapshot: Dict[int, ProcessStats] = {}
+        counters: Dict[int, _Counters] = {}
+        for proc in psutil.process_iter(PROCESS_ATTRS, ad_value=None):
+            info = proc.info
+            current = self._read_counters(info, time.time())
+            counters[proc.pid] = current
+            snapshot[proc.pid] = self._stats(proc.pid, info, current, self._counters.get(proc.pid), total_memory)
+        # Swapped whole, so readers always see one consistent scan
+        self._counters = counters
+        self.snapshot = snapshot
+        self.sampled_at = time.time()
+
+    def top(self, sort_by: str, limit: int) -> List[ProcessStats]:
+        """The `limit` processes with the largest `sort_by`, without sorting the whole table"""
+        self.wait_ready()
+        return heapq.nlargest(limit, self.snapshot.values(), key=lambda stats: getattr(stats, sort_by) or 0)
+
+    @staticmethod
+    def _read_process(proc: psutil.Process) -> Dict[str, Any]:
+        with proc.oneshot():
+            return proc.as_dict(PROCESS_ATTRS, ad_value=None)
+
+    def read(self, pid: int) -> Optional[ProcessStats]:
+        """
+        Reads one process now, with deltas against its last scan.
+
+        Without a scan at least `first_delay` old, e.g. right after startup,
+        it reads the process twice `first_delay` apart instead.
+        """
+        try:
+            proc = psutil.Process(pid)
+            info = self._read_process(proc)
+            current = self._read_counters(info, time.time())
+            previous = self._counters.get(pid)
+            if (
+                previous is None
+                or previous.create_time != current.create_time
+                or current.timestamp - previous.timestamp < self.first_delay
+            ):
+                previous = current
+                time.sleep(self.first_delay)
+                info = self._read_process(proc)
+                current = self._read_counters(info, time.time())
+        except psutil.NoSuchProcess:
+            return None
+        return self._stats(pid, info, current, previous, psutil.virtual_memory().total)
+
+process_sampler = ProcessSampler()
+
+# ---- System metrics sections ----
+@functools.lru_cache(maxsize=1)
+def _system_info() -> Dict[str, str]:
+    # Static host facts; platform.processor() alone can spawn `uname -p`
+    return {
+        "system": platform.system(),
+        "node_name": platform.node(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "machine": platform.machine(),
+        "processor": platform.processor()
+    }
+
+@functools.lru_cache(maxsize=1)
+def _cpu_counts() -> Dict[str, Optional[int]]:
+    return {
+        "cpu_count_logical": psutil.cpu_count(logical=True),
+        "cpu_count_physical": psutil.cpu_count(logical=False),
+    }
+
+def _cpu_info(window_sec: Optional[int]) -> Dict[str, Any]:
+    # From the sampler instead of blocking for a measurement
+    latest = sampler.latest()
+    cpu_info = {
+        **_cpu_counts(),
+        "cpu_percent": latest.cpu_percent,
+        "load_average": [latest.load_1, latest.load_5, latest.load_15],
+        "sampled_at": latest.timestamp
+    }
+    if window_sec:
+        cpu_info["window"] = sampler.window(window_sec, ["cpu_percent", "load_1"])
+    return cpu_info
+
+def _ram_info(window_sec: Optional[int]) -> Dict[str, Any]:
+    virtual_mem = psutil.virtual_memory()
+    swap_mem = psutil.swap_memory()
+    ram_info = {
+        "total": virtual_mem.total,
+        "available": virtual_mem.available,
+        "used": virtual_mem.used,
+        "percent": virtual_mem.percent,
+        "swap_total": swap_mem.total,
+        "swap_used": swap_mem.used,
+        "swap_percent": swap_mem.percent
+    }
+    if window_sec:
+        ram_info["window"] = sampler.window(window_sec, ["memory_percent", "swap_percent"])
+    return ram_info
+
+_disk_pool = ThreadPoolExecutor(max_workers=DISK_PROBE_WORKERS, thread_name_prefix="disk-probe")
+# Probes of hung mounts never return; they are reused instead of piling up new ones
+_disk_probes: Dict[str, Future] = {}
+_disk_probes_lock = threading.Lock()
+
+def _probe_disk(mountpoint: str) -> Future:
+    with _disk_probes_lock:
+        probe = _disk_probes.get(mountpoint)
+        if probe is None or probe.done():
+            probe = _disk_pool.submit(psutil.disk_usage, mountpoint)
+            _disk_probes[mountpoint] = probe
+        return probe
+
+def _disk_info(window_sec: Optional[int] = None) -> List[Dict[str, Union[str, int, float]]]:
+    # One hung NFS or FUSE mount must not stall the others, so every mount is
+    # probed concurrently and reported as timed out after DISK_PROBE_TIMEOUT_SEC.
+    # Blocks its caller until then; get_system_metrics calls it in a thread.
+    partitions = psutil.disk_partitions()
+    probes = [_probe_disk(partition.mountpoint) for partition in partitions]
+    wait(probes, timeout=DISK_PROBE_TIMEOUT_SEC)
+
+    disk_info: List[Dict[str, Union[str, int, float]]] = []
+    for partition, probe in zip(partitions, probes):
+        info: Dict[str, Union[str, int, float]] = {
+            "device": partition.device,
+            "mountpoint": partition.mountpoint,
+            "fstype": partition.fstype,
+        }
+        if not probe.done():
+            info["error"] = f"timed out after {DISK_PROBE_TIMEOUT_SEC}s"
+        elif probe.exception() is not None:
+            info["error"] = str(probe.exception())
+        else:
+            usage = probe.result()
+            info.update({
                 "total": usage.total,
                 "used": usage.used,
                 "free": usage.free,
                 "percent": usage.percent
             })
+        disk_info.append(info)
+    return disk_info
+
+SECTIONS = {
+    "system": ("system_info", lambda window_sec: _system_info()),
+    "cpu": ("cpu_info", _cpu_info),
+    "ram": ("ram_info", _ram_info),
+    "disk": ("disk_info", _disk_info),
+}
 
-        # Return based on metrics_type
+@mcp.tool()
+async def get_system_metrics(
+    metrics_type: str = "all",
+    window_sec: Optional[int] = None,
+) -> Union[Dict, List[Dict]]:
+    """
+    Collect system metrics.
+    
+    Args:
+        metrics_type: one of "system", "cpu", "ram", "disk", "all"
+        window_sec: if given, also return min/avg/max/p95 of CPU and load
+            ("cpu") or memory and swap ("ram") over the last window_sec seconds
+    
+    Returns:
+        Dict or List[Dict] depending on metrics_type
+    """
+    try:
         metrics_type = metrics_type.lower()
-        if metrics_type == "system":
-            return system_info
-        elif metrics_type == "cpu":
-            return cpu_info
-        elif metrics_type == "ram":
-            return ram_info
-        elif metrics_type == "disk":
-            return disk_info
-        elif metrics_type == "all":
-            return {
-                "system_info": system_info,
-                "cpu_info": cpu_info,
-                "ram_info": ram_info,
-                "disk_info": disk_info
-            }
-        else:
+        if metrics_type != "all" and metrics_type not in SECTIONS:
             return {"error": f"Unknown metrics_type: {metrics_type}"}
+        # Sections wait for the sampler's first sample or for disk probes, so
+        # they run in threads: FastMCP runs sync tools on the event loop, where
+        # that would hold up every other request. Only the requested ones run,
+        # and for "all" at the same time, so a hung mount adds no more than
+        # its timeout.
+        if metrics_type == "all":
+            keys = [key for key, _ in SECTIONS.values()]
+            results = await asyncio.gather(
+                *(asyncio.to_thread(collect, window_sec) for _, collect in SECTIONS.values())
+            )
+            return dict(zip(keys, results))
+        _, collect = SECTIONS[metrics_type]
+        return await asyncio.to_thread(collect, window_sec)
 
     except Exception as e:
         return {"error": str(e)}
 
 @mcp.tool()
-def get_process_metrics(pid: Optional[int] = None) -> Dict[str, Any]:
+async def get_process_metrics(
+    pid: Optional[int] = None,
+    sort_by: str = "memory_percent",
+    limit: int = 10,
+) -> Dict[str, Any]:
     """
-    Collect metrics of running processes including PID, name, user, status, CPU and memory usage.
+    Collect metrics of running processes including PID, name, user, status, CPU and memory usage,
+    and the change of RSS, disk IO and open files since the previous sample.
 
     Args:
         pid (Optional[int]): If provided, return metrics only for the process with this PID.
-                             If None, return top 10 processes sorted by memory_percent.
+                             If None, return the top `limit` processes sorted by `sort_by`.
+        sort_by (str): one of "cpu_percent", "memory_percent", "rss", "rss_delta",
+                       "read_bytes_per_sec", "write_bytes_per_sec", "num_fds", "num_fds_delta".
+        limit (int): How many processes to return when pid is None.
 
     Returns:
         dict: {
@@ -106,48 +502,95 @@ def get_process_metrics(pid: Optional[int] = None) -> Dict[str, Any]:
         }
     """
     try:
-        processes = []
+        # Both may wait for a measurement interval, which must not hold up the event loop
+        if pid is not None:
+            stats = await asyncio.to_thread(process_sampler.read, pid)
+            return {"processes": [stats._asdict()] if stats else []}
+
+        if sort_by not in PROCESS_SORT_KEYS:
+            return {"error": f"Unknown sort_by: {sort_by}"}
+        processes = await asyncio.to_thread(process_sampler.top, sort_by, limit)
+        return {
+            "processes": [stats._asdict() for stats in processes],
+            "sampled_at": process_sampler.sampled_at,
+        }
 
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'cpu_percent', 'memory_percent']):
-            try:
-                pinfo = proc.info
-
-                # Filter out processes with no CPU and memory usage
-                if pinfo['cpu_percent'] == 0 and pinfo['memory_percent'] == 0:
-                    continue
-
-                # If pid is provided, only collect that process
-                if pid is not None and pinfo['pid'] != pid:
-                    continue
-
-                processes.append({
-                    "pid": pinfo['pid'],
-                    "name": pinfo['name'],
-                    "user": pinfo['username'],
-                    "status": pinfo['status'],
-                    "cpu_percent": pinfo['cpu_percent'],
-                    "memory_percent": pinfo['memory_percent']
-                })
-
-                # If we found the specific pid, break early
-                if pid is not None:
-                    break
-
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+    except Exception as e:
+        return {"error": str(e)}
 
-        # If pid is not specified, sort by memory usage and take top 10
-        if pid is None:
-            processes.sort(key=lambda x: x['memory_percent'], reverse=True)
-            processes = processes[:10]
+# ---- Command execution ----
+# Limits commands running at once; the rest wait for a slot
+_exec_slots = asyncio.Semaphore(EXEC_MAX_CONCURRENCY)
 
-        return {"processes": processes}
+class _CappedOutput:
+    """
+    Keeps the first and the last `limit // 2` bytes of a stream and counts
+    what is dropped between them; errors and summaries tend to come last.
+    """
 
-    except Exception as e:
-        return {"error": str(e)}
+    def __init__(self, limit: int):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.dropped = 0
+
+    def add(self, chunk: bytes) -> bytes:
+        """Adds a chunk and returns the part of it kept in the head"""
+        kept = chunk[:max(0, self.head_limit - len(self.head))]
+        self.head += kept
+        if len(kept) < len(chunk):
+            self.tail += chunk[len(kept):]
+            excess = len(self.tail) - self.tail_limit
+            if excess > 0:
+                del self.tail[:excess]
+                self.dropped += excess
+        return kept
+
+    def text(self) -> str:
+        head = self.head.decode(errors="replace")
+        tail = self.tail.decode(errors="replace")
+        if self.dropped:
+            text = f"{head}\n... [{self.dropped} bytes omitted] ...\n{tail}"
+        else:
+            text = head + tail
+        return text.strip() or "(empty)"
+
+async def _pump(stream: asyncio.StreamReader, name: str, output: _CappedOutput, ctx: Optional[Context], progress: Dict[str, int]):
+    """Reads a pipe to the end, streaming the head it keeps as progress notifications"""
+    while True:
+        # The pipe is drained even past the cap, so the command never blocks on a full pipe
+        chunk = await stream.read(EXEC_READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        kept = output.add(chunk)
+        progress["bytes"] += len(chunk)
+        if kept and ctx is not None:
+            await ctx.report_progress(progress["bytes"], message=f"[{name}] {kept.decode(errors='replace')}")
+
+def _kill_process_group(proc: asyncio.subprocess.Process):
+    # The command runs in its own session, so its children die with it
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+async def _wait_exit(proc: asyncio.subprocess.Process, readers: asyncio.Future):
+    """
+    Waits for the command itself to exit. proc.wait() also waits for the pipes
+    to close, which a background child can hold open, so it is only awaited
+    once the readers have seen them close.
+    """
+    while proc.returncode is None:
+        if not readers.done():
+            await asyncio.wait([readers], timeout=EXEC_EXIT_POLL_SEC)
+        elif not readers.cancelled() and readers.exception() is None:
+            await proc.wait()
+        else:
+            await asyncio.sleep(EXEC_EXIT_POLL_SEC)
 
 @mcp.tool()
-async def execute_command(command: str, cwd: Optional[str] = None, timeoutSec: int = 30):
+async def execute_command(command: str, cwd: Optional[str] = None, timeoutSec: int = 30, ctx: Context = None):
     """
     Execute a system command safely (without shell).
 
@@ -169,34 +612,59 @@ async def execute_command(command: str, cwd: Optional[str] = None, timeoutSec: i
         if cwd is not None and not os.path.isdir(cwd):
             return [TextContent(type="text", text=f"[exec] Error: cwd does not exist: {cwd}")]
 
-        # Run the command
-        result = subprocess.run(
-            args,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeoutSec,
-        )
+        async with _exec_slots:
+            # Run the command without blocking the event loop, so other tool calls proceed
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            stdout = _CappedOutput(EXEC_MAX_OUTPUT_BYTES)
+            stderr = _CappedOutput(EXEC_MAX_OUTPUT_BYTES)
+            progress = {"bytes": 0}
+            readers = asyncio.gather(
+                _pump(proc.stdout, "stdout", stdout, ctx, progress),
+                _pump(proc.stderr, "stderr", stderr, ctx, progress),
+            )
+            timed_out = False
+            try:
+                await asyncio.wait_for(_wait_exit(proc, readers), timeout=timeoutSec)
+            except asyncio.TimeoutError:
+                timed_out = True
+            finally:
+                # Finished, timed out or cancelled by the client: nothing it started outlives it
+                _kill_process_group(proc)
+                await asyncio.wait([readers], timeout=EXEC_DRAIN_SEC)
+                readers.cancel()
+                await asyncio.wait([readers])
+                if not readers.cancelled():
+                    readers.exception()
+                await _wait_exit(proc, readers)
 
         # Prepare output
         report = []
         report.append(f"$ {command}")
         if cwd:
             report.append(f"[cwd] {cwd}")
-        report.append(f"[returncode] {result.returncode}")
+        if timed_out:
+            report.append(f"[exec] Error: command timed out after {timeoutSec}s")
+        report.append(f"[returncode] {proc.returncode}")
 
         report.append("\n[stdout]")
-        report.append(result.stdout.strip() or "(empty)")
+        report.append(stdout.text())
 
         report.append("\n[stderr]")
-        report.append(result.stderr.strip() or "(empty)")
+        report.append(stderr.text())
 
         return [TextContent(type="text", text="\n".join(report))]
 
-    except subprocess.TimeoutExpired:
-        return [TextContent(type="text", text=f"[exec] Error: command timed out after {timeoutSec}s")]
     except Exception as e:
         return [TextContent(type="text", text=f"[exec] Error: {e}")]
 
 if __name__ == "__main__":
-    mcp.run()
+    # Sample from startup so the first call already has CPU readings
+    sampler.start()
+    process_sampler.start()
+    mcp.run(transport=MCP_TRANSPORT.replace("_", "-"))
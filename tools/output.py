@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, ToolException, tool as create_tool
+from loguru import logger
+from prometheus_client import Counter
+from pydantic import BaseModel, Field
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ---- Env config ----
+TOOL_OUTPUT_LIMIT_ENABLED = os.getenv("TOOL_OUTPUT_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+TOOL_OUTPUT_HEAD_CHARS = int(os.getenv("TOOL_OUTPUT_HEAD_CHARS", 1500))
+# Logs put the newest lines last, so the tail gets more room
+TOOL_OUTPUT_TAIL_CHARS = int(os.getenv("TOOL_OUTPUT_TAIL_CHARS", 2500))
+TOOL_OUTPUT_DIR = os.getenv(
+    "TOOL_OUTPUT_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "data", "tool_output")
+)
+TOOL_OUTPUT_TTL_SEC = float(os.getenv("TOOL_OUTPUT_TTL_SEC", 24 * 60 * 60))
+TOOL_OUTPUT_MAX_FILES = int(os.getenv("TOOL_OUTPUT_MAX_FILES", 1000))
+
+READER_TOOL_NAME = "read_tool_output"
+# Upper bound of one read_tool_output answer
+PAGE_MAX_CHARS = TOOL_OUTPUT_HEAD_CHARS + TOOL_OUTPUT_TAIL_CHARS
+
+class OutputPolicy(NamedTuple):
+    head_chars: int
+    tail_chars: int
+
+DEFAULT_POLICY = OutputPolicy(TOOL_OUTPUT_HEAD_CHARS, TOOL_OUTPUT_TAIL_CHARS)
+OUTPUT_POLICIES: Dict[str, OutputPolicy] = {
+    # Metrics are JSON with the summary first; the disk list trails off
+    "get_system_metrics": OutputPolicy(3000, 1000),
+    # KEDB articles are the answer itself, so more of them reaches the model
+    "query_kedb": OutputPolicy(6000, 2000),
+}
+
+HANDLE_PATTERN = re.compile(r"out_[0-9a-f]{16}")
+
+TOOL_OUTPUT_SPILLS = Counter(
+    "agent_tool_output_spills",
+    "Tool outputs cut to head and tail, the full text saved to the spill store",
+    ["tool"],
+)
+
+class SpillStore:
+    """
+    Full tool outputs on local disk, one file per handle.
+
+    Files older than `ttl` are swept, and the oldest beyond `max_files`, on
+    every write. Handles only resolve on the host that wrote them.
+    """
+
+    def __init__(self, directory: str, ttl: float, max_files: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_files = max_files
+        self._spills = 0
+
+    def _path(self, handle: str) -> str:
+        # Handles come from the model; anything else could escape the directory
+        if not HANDLE_PATTERN.fullmatch(handle):
+            raise ToolException(f"Invalid output handle: {handle}")
+        return os.path.join(self.directory, f"{handle}.txt")
+
+    def write(self, text: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        handle = f"out_{uuid.uuid4().hex[:16]}"
+        with open(self._path(handle), "w", encoding="utf-8") as f:
+            f.write(text)
+        self._spills += 1
+        self.sweep()
+        return handle
+
+    def read(self, handle: str) -> str:
+        try:
+            with open(self._path(handle), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ToolException(f"Output {handle} not found or expired; run the tool again")
+
+    def _files(self) -> List[os.DirEntry]:
+        try:
+            return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".txt")]
+        except FileNotFoundError:
+            return []
+
+    def sweep(self):
+        files = sorted(self._files(), key=lambda entry: entry.stat().st_mtime)
+        expire_before = time.time() - self.ttl
+        excess = len(files) - self.max_files
+        for index, entry in enumerate(files):
+            if index < excess or entry.stat().st_mtime < expire_before:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        files = self._files()
+        return {
+            "files": len(files),
+            "bytes": sum(entry.stat().st_size for entry in files),
+            "spills": self._spills,
+        }
+
+SPILL_STORE = SpillStore(TOOL_OUTPUT_DIR, TOOL_OUTPUT_TTL_SEC, TOOL_OUTPUT_MAX_FILES)
+
+def _as_text(result: Any) -> str:
+    """Tool output as one text; MCP tools return a list of texts for several contents"""
+    if isinstance(result, str):
+        text = result
+    elif isinstance(result, list) and all(isinstance(item, str) for item in result):
+        try:
+            # e.g. the disk list, one JSON text per partition
+            return json.dumps([json.loads(item) for item in result], separators=(",", ":"))
+        except ValueError:
+            text = "\n".join(result)
+    else:
+        return json.dumps(result, default=str, separators=(",", ":"))
+    # FastMCP indents JSON results; the same data without indentation is far shorter
+    if text[:1] in ("{", "["):
+        try:
+            return json.dumps(json.loads(text), separators=(",", ":"))
+        except ValueError:
+            pass
+    return text
+
+def _spill_text(text: str) -> str:
+    """The saved copy of an output; compact JSON is one line, which cannot be paged or grepped"""
+    if text[:1] in ("{", "["):
+        try:
+            return json.dumps(json.loads(text), indent=1)
+        except ValueError:
+            pass
+    return text
+
+def _head(text: str, size: int) -> str:
+    cut = text.rfind("\n", 0, size)
+    return text[:cut if cut > size // 2 else size]
+
+def _tail(text: str, size: int) -> str:
+    start = len(text) - size
+    cut = text.find("\n", start)
+    return text[cut + 1 if 0 <= cut < start + size // 2 else start:]
+
+def bound_output(name: str, result: Any, store: SpillStore = SPILL_STORE) -> str:
+    """Output that fits its tool's policy as is; longer output cut to head and tail, the rest spilled"""
+    policy = OUTPUT_POLICIES.get(name, DEFAULT_POLICY)
+    text = _as_text(result)
+    if len(text) <= policy.head_chars + policy.tail_chars:
+        return text
+    full = _spill_text(text)
+    handle = store.write(full)
+    TOOL_OUTPUT_SPILLS.labels(tool=name).inc()
+    logger.info(f"Saved {len(full)} chars of {name} output as {handle}")
+    head, tail = _head(text, policy.head_chars), _tail(text, policy.tail_chars)
+    omitted = len(text) - len(head) - len(tail)
+    return (
+        f"{head}\n"
+        f"... [{omitted} chars omitted; the full output ({len(full)} chars, {full.count(chr(10)) + 1} lines) "
+        f"is saved as {handle}. Call {READER_TOOL_NAME} with this handle to page through or grep it] ...\n"
+        f"{tail}"
+    )
+
+async def expand_output(result: Any, store: SpillStore = SPILL_STORE) -> Any:
+    """The full output behind a bounded one, for code that parses tool results"""
+    if not isinstance(result, str):
+        return result
+    match = re.search(rf"is saved as ({HANDLE_PATTERN.pattern})\. Call {READER_TOOL_NAME}", result)
+    if match is None:
+        return result
+    return await asyncio.to_thread(store.read, match.group(1))
+
+def add_output_limit(tool: BaseTool, store: SpillStore = SPILL_STORE) -> BaseTool:
+    """Wrap a tool so long output reaches the model as head and tail plus a handle to the rest."""
+    if not TOOL_OUTPUT_LIMIT_ENABLED or tool.name == READER_TOOL_NAME:
+        return tool
+
+    @create_tool(
+        tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema
+    )
+    async def call_tool_with_output_limit(config: RunnableConfig, **tool_input):
+        result = await tool.ainvoke(tool_input, config)
+        return await asyncio.to_thread(bound_output, tool.name, result, store)
+
+    return call_tool_with_output_limit
+
+def limit_tools(tools: List[BaseTool], store: SpillStore = SPILL_STORE) -> List[BaseTool]:
+    """Bound the output of every tool."""
+    return [add_output_limit(t, store) for t in tools]
+
+class ReadOutputInput(BaseModel):
+    handle: str = Field(description="Handle of the saved output, e.g. out_0123456789abcdef")
+    offset: int = Field(default=0, description="First line to return, counting from 0")
+    limit: int = Field(default=100, description="Maximum number of lines to return")
+    pattern: Optional[str] = Field(
+        default=None,
+        description="Regular expression; if given, return only matching lines from offset on",
+    )
+
+def _numbered(lines: List[tuple], what: str) -> str:
+    """Numbered lines up to PAGE_MAX_CHARS, saying where to continue; a longer line is cut"""
+    out, size = [], 0
+    for number, line in lines:
+        entry = f"{number}: {line}"
+        if len(entry) > PAGE_MAX_CHARS:
+            entry = f"{entry[:PAGE_MAX_CHARS]} ... [line cut, {len(entry) - PAGE_MAX_CHARS} more chars]"
+        if out and size + len(entry) > PAGE_MAX_CHARS:
+            return "\n".join(out) + f"\n... [{what} continue; call again with offset={number}]"
+        out.append(entry)
+        size += len(entry) + 1
+    return "\n".join(out) if out else f"(no {what})"
+
+def get_output_reader_tool(store: SpillStore = SPILL_STORE) -> Optional[BaseTool]:
+    """The companion tool that pages through or greps spilled output, None when limits are disabled"""
+    if not TOOL_OUTPUT_LIMIT_ENABLED:
+        return None
+
+    @create_tool(
+        READER_TOOL_NAME,
+        description=(
+            "Read the full output of an earlier tool call that was cut short. "
+            "Returns numbered lines from offset, or only the lines matching pattern."
+        ),
+        args_schema=ReadOutputInput,
+    )
+    async def read_tool_output(handle: str, offset: int = 0, limit: int = 100, pattern: Optional[str] = None) -> str:
+        lines = (await asyncio.to_thread(store.read, handle)).splitlines()
+        offset, limit = max(0, offset), max(1, limit)
+        if pattern is None:
+            page = [(number, lines[number]) for number in range(offset, min(len(lines), offset + limit))]
+            header = f"[{handle}: lines {offset}-{offset + len(page) - 1} of {len(lines)}]"
+            return f"{header}\n{_numbered(page, 'lines')}"
+
+        try:
+            regex = re.compile(pattern)
+        except re.error:
+            regex = re.compile(re.escape(pattern))
+        matches = [(number, line) for number, line in enumerate(lines) if number >= offset and regex.search(line)]
+        header = f"[{handle}: {len(matches)} lines match {pattern!r} from line {offset}, showing {min(limit, len(matches))}]"
+        return f"{header}\n{_numbered(matches[:limit], 'matches')}"
+
+    return read_tool_output
@@ -0,0 +1,289 @@
+import json
+import os
+import re
+import shlex
+import threading
+import time
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from loguru import logger
+from prometheus_client import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Off by default: every execute_command call goes to a human unless enabled
+AUTO_APPROVE_ENABLED = os.getenv("AUTO_APPROVE_ENABLED", "false").lower() in ("1", "true", "yes")
+# JSON file replacing DEFAULT_POLICY; unset uses the defaults below
+APPROVAL_POLICY_PATH = os.getenv("APPROVAL_POLICY_PATH")
+APPROVAL_AUDIT_LOG = os.getenv(
+    "APPROVAL_AUDIT_LOG",
+    os.path.join(os.path.dirname(__file__), "..", "logs", "approvals.jsonl"),
+)
+
+# Directories an allowed binary may be given from; anything else (./uptime,
+# /tmp/df) could be a different program under a familiar name
+SYSTEM_BIN_DIRS = ("/bin", "/usr/bin", "/sbin", "/usr/sbin", "/usr/local/bin")
+
+SENSITIVE_PATHS = [
+    "/etc/shadow*", "/etc/gshadow*", "/etc/sudoers*", "/root*",
+    "*/.ssh*", "*/.gnupg*", "*/.aws*", "*/.kube*", "*.env",
+    "/proc/*/environ", "/proc/*/mem", "/proc/kcore", "/dev/*",
+    # Links from /proc back into the whole filesystem and open files
+    "/proc/*/root*", "/proc/*/cwd*", "/proc/*/exe", "/proc/*/fd*", "/proc/*/map_files*",
+]
+
+# Rules match the argv execute_command runs (shlex.split of the command, no shell).
+# A rule allows:
+#   flags         flags without a value; short ones may be combined (-lah)
+#   options       flags with a value (-n 50, --lines=50) and a regex for the value
+#   subcommands   allowed values of the first positional argument
+#   args          allowed literal positional arguments
+#   args_pattern  regex the remaining positional arguments may match instead
+#   paths         glob patterns ("*" spans directories) positional paths may match
+# Positional arguments are refused unless one of the last three admits them.
+# Deny rules match a binary and, optionally, any of its flags or paths, and
+# always win over allow rules. Unmatched calls go to a human.
+DEFAULT_POLICY: Dict[str, Any] = {
+    "execute_command": {
+        "allow": [
+            {"binary": "uptime", "flags": ["-p", "-s", "--pretty", "--since"]},
+            {"binary": "free", "flags": ["-b", "-k", "-m", "-g", "-h", "-w", "-t", "--si", "--human", "--total"]},
+            {"binary": "df", "flags": ["-h", "-H", "-T", "-i", "-k", "-m", "-l", "-P", "-a", "--total"], "paths": ["/*"]},
+            {"binary": "du", "flags": ["-s", "-h", "-x", "-c", "-a", "-k", "-m"], "options": {"--max-depth": r"\d+", "-d": r"\d+"}, "paths": ["/*"]},
+            {"binary": "uname", "flags": ["-a", "-s", "-n", "-r", "-v", "-m", "-p", "-i", "-o"]},
+            {"binary": "hostname", "flags": ["-f", "-i", "-I", "-s"]},
+            {"binary": "whoami"},
+            {"binary": "id", "flags": ["-u", "-g", "-G", "-n"]},
+            {"binary": "date", "flags": ["-u", "-R", "-I", "--utc"]},
+            {"binary": "nproc", "flags": ["--all"]},
+            {"binary": "lscpu", "flags": ["-e", "-p", "-J"]},
+            {"binary": "lsblk", "flags": ["-a", "-f", "-l", "-m", "-p", "-J", "-b"]},
+            {"binary": "vmstat", "flags": ["-s", "-d", "-w", "-S"], "args_pattern": r"\d{1,2}"},
+            {"binary": "ps", "flags": ["-e", "-f", "-A", "-l", "-F", "-H", "-w"], "options": {"-o": r"[\w,%=-]+", "--sort": r"[\w,+-]+", "-p": r"[\d,]+", "-u": r"[\w,-]+"}, "args": ["aux", "axu", "auxf", "auxww"]},
+            {"binary": "ss", "flags": ["-t", "-u", "-l", "-n", "-p", "-a", "-s", "-x", "-4", "-6", "-e", "-m", "-i", "-o"]},
+            {"binary": "netstat", "flags": ["-t", "-u", "-l", "-n", "-p", "-a", "-s", "-r", "-i"]},
+            {"binary": "ls", "flags": ["-l", "-a", "-A", "-h", "-t", "-r", "-S", "-1", "-d", "-i", "-F", "-R"], "paths": ["/*"]},
+            {"binary": "stat", "flags": ["-L", "-f", "-t"], "paths": ["/*"]},
+            {"binary": "wc", "flags": ["-l", "-c", "-w", "-m"], "paths": ["/proc/*", "/var/log/*"]},
+            {"binary": "cat", "paths": ["/proc/*", "/var/log/*", "/etc/os-release", "/etc/hostname", "/etc/hosts", "/etc/resolv.conf", "/etc/fstab"]},
+            {"binary": "head", "flags": ["-q"], "options": {"-n": r"\d+", "--lines": r"\d+", "-c": r"\d+"}, "paths": ["/proc/*", "/var/log/*"]},
+            {"binary": "tail", "flags": ["-q"], "options": {"-n": r"\d+", "--lines": r"\d+", "-c": r"\d+"}, "paths": ["/proc/*", "/var/log/*"]},
+            {"binary": "systemctl", "flags": ["--no-pager", "--failed", "--all", "-a", "-l", "--full"], "options": {"--type": r"[\w,]+", "--state": r"[\w,-]+"}, "subcommands": ["status", "is-active", "is-enabled", "is-failed", "list-units", "list-unit-files", "list-timers"], "args_pattern": r"[\w@.:-]+"},
+            {"binary": "journalctl", "flags": ["--no-pager", "-x", "-e", "-k", "-b", "-r", "-q"], "options": {"-u": r"[\w@.:-]+", "--unit": r"[\w@.:-]+", "-n": r"\d+", "--lines": r"\d+", "-p": r"[\w.]+", "--priority": r"[\w.]+", "-o": r"[\w-]+"}},
+        ],
+        "deny": [
+            {"binary": "*", "paths": SENSITIVE_PATHS},
+        ],
+    },
+    # Other interrupting tools are auto-approved only when set to true here,
+    # e.g. "duckduckgo_search": true (queries leave the network)
+    "tools": {},
+}
+
+APPROVALS = Counter(
+    "agent_tool_approvals",
+    "Approval decisions on tool calls that require human review",
+    ["tool", "decision"],
+)
+
+class PolicyDecision(NamedTuple):
+    approved: bool
+    reason: str
+    rule: Optional[str] = None
+
+class CommandRule:
+    """One allow or deny rule for execute_command"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.binary = spec["binary"]
+        self.flags = set(spec.get("flags", []))
+        self.options = {flag: re.compile(pattern) for flag, pattern in spec.get("options", {}).items()}
+        self.subcommands = spec.get("subcommands")
+        self.args = set(spec.get("args", []))
+        self.args_pattern = re.compile(spec["args_pattern"]) if spec.get("args_pattern") else None
+        self.paths = spec.get("paths", [])
+
+    def __str__(self) -> str:
+        return json.dumps(self.spec, sort_keys=True)
+
+    def matches_binary(self, program: str) -> bool:
+        name = os.path.basename(program)
+        if program != name and os.path.dirname(program) not in SYSTEM_BIN_DIRS:
+            return False
+        return fnmatchcase(name, self.binary)
+
+    def allows(self, argv: List[str], cwd: Optional[str]) -> Optional[str]:
+        """None if the rule allows argv, else why not"""
+        if not self.matches_binary(argv[0]):
+            return "binary"
+
+        positionals = []
+        args = iter(argv[1:])
+        for arg in args:
+            if arg == "--":
+                positionals.extend(args)
+                break
+            if arg.startswith("-") and arg != "-":
+                error = self._check_flag(arg, args)
+                if error:
+                    return error
+            else:
+                positionals.append(arg)
+
+        if self.subcommands is not None:
+            if not positionals or positionals[0] not in self.subcommands:
+                return f"subcommand {positionals[0] if positionals else '(none)'}"
+            positionals = positionals[1:]
+
+        for arg in positionals:
+            if arg in self.args:
+                continue
+            if self.args_pattern is not None and self.args_pattern.fullmatch(arg):
+                continue
+            paths = _resolve(arg, cwd)
+            if not paths or not all(any(fnmatchcase(path, pattern) for pattern in self.paths) for path in paths):
+                return f"argument {arg}"
+        return None
+
+    def _check_flag(self, arg: str, rest: Iterable[str]) -> Optional[str]:
+        if arg in self.flags:
+            return None
+        # --lines=50
+        name, sep, value = arg.partition("=")
+        if sep and name in self.options:
+            return None if self.options[name].fullmatch(value) else f"option {arg}"
+        # -n 50
+        if arg in self.options:
+            value = next(iter(rest), None)
+            if value is None or not self.options[arg].fullmatch(value):
+                return f"option {arg} {value}"
+            return None
+        # -n50
+        if not arg.startswith("--") and arg[:2] in self.options:
+            return None if self.options[arg[:2]].fullmatch(arg[2:]) else f"option {arg}"
+        # -lah
+        if not arg.startswith("--") and all(f"-{c}" in self.flags for c in arg[1:]):
+            return None
+        return f"flag {arg}"
+
+    def denies(self, argv: List[str], cwd: Optional[str]) -> bool:
+        # Wherever the binary lives
+        if not fnmatchcase(os.path.basename(argv[0]), self.binary):
+            return False
+        if not self.flags and not self.paths:
+            return True
+        for arg in argv[1:]:
+            if arg.split("=", 1)[0] in self.flags:
+                return True
+            for path in _resolve(arg.split("=", 1)[-1], cwd):
+                if any(fnmatchcase(path, pattern) for pattern in self.paths):
+                    return True
+        return False
+
+def _resolve(arg: str, cwd: Optional[str]) -> List[str]:
+    """
+    Absolute forms of a path argument: as written, normalized, and with
+    symlinks resolved. Empty if it cannot be known.
+
+    Both must pass a rule, so a link such as /var/log/x -> /etc/shadow or
+    /proc/1/root/etc/shadow is judged by where it leads too.
+    """
+    if not os.path.isabs(arg):
+        # Relative to a working directory we do not know
+        if not cwd or not os.path.isabs(cwd):
+            return []
+        arg = os.path.join(cwd, arg)
+    path = os.path.normpath(arg)
+    try:
+        real = os.path.realpath(path)
+    except OSError:
+        # e.g. /proc/1/root of another user; the deny patterns still see the path
+        return [path]
+    return list(dict.fromkeys([path, real]))
+
+class ApprovalPolicy:
+    """
+    Decides which tool calls can skip human approval.
+
+    execute_command calls are approved when their argv matches an allow rule
+    and no deny rule; other tools only when listed as auto-approved.
+    """
+
+    def __init__(self, policy: Dict[str, Any]):
+        commands = policy.get("execute_command", {})
+        self.allow = [CommandRule(spec) for spec in commands.get("allow", [])]
+        self.deny = [CommandRule(spec) for spec in commands.get("deny", [])]
+        self.tools = {name for name, enabled in policy.get("tools", {}).items() if enabled}
+
+    @classmethod
+    def load(cls, path: Optional[str] = APPROVAL_POLICY_PATH) -> "ApprovalPolicy":
+        if not path:
+            return cls(DEFAULT_POLICY)
+        with open(path, "r", encoding="utf-8") as f:
+            policy = json.load(f)
+        logger.info(f"Loaded approval policy from {path}")
+        return cls(policy)
+
+    def evaluate(self, tool_name: str, tool_input: Dict[str, Any]) -> PolicyDecision:
+        if tool_name != "execute_command":
+            if tool_name in self.tools:
+                return PolicyDecision(True, "tool auto-approved", tool_name)
+            return PolicyDecision(False, "no rule for tool")
+
+        command = tool_input.get("command") or ""
+        cwd = tool_input.get("cwd")
+        try:
+            argv = shlex.split(command)
+        except ValueError as e:
+            return PolicyDecision(False, f"unparsable command: {e}")
+        if not argv:
+            return PolicyDecision(False, "empty command")
+
+        for rule in self.deny:
+            if rule.denies(argv, cwd):
+                return PolicyDecision(False, "deny rule", str(rule))
+
+        reasons = []
+        for rule in self.allow:
+            error = rule.allows(argv, cwd)
+            if error is None:
+                return PolicyDecision(True, "allow rule", str(rule))
+            if error != "binary":
+                reasons.append(error)
+        return PolicyDecision(False, f"not allowed: {reasons[0]}" if reasons else "no rule for binary")
+
+_default_policy: Optional[ApprovalPolicy] = None
+
+def get_default_policy() -> Optional[ApprovalPolicy]:
+    """The configured policy, None when auto-approval is disabled"""
+    global _default_policy
+    if not AUTO_APPROVE_ENABLED:
+        return None
+    if _default_policy is None:
+        _default_policy = ApprovalPolicy.load()
+    return _default_policy
+
+_audit_lock = threading.Lock()
+
+def audit(tool_name: str, tool_input: Dict[str, Any], decision: str, thread_id: Optional[str] = None, **details: Any):
+    """Append an approval decision to the audit log and count it"""
+    APPROVALS.labels(tool=tool_name, decision=decision).inc()
+    record = {
+        "timestamp": time.time(),
+        "thread_id": thread_id,
+        "tool": tool_name,
+        "args": tool_input,
+        "decision": decision,
+        **details,
+    }
+    try:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with _audit_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(APPROVAL_AUDIT_LOG)), exist_ok=True)
+            with open(APPROVAL_AUDIT_LOG, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except Exception as e:
+        logger.error(f"Failed to write approval audit record: {e}")
@@ -1,3 +1,3 @@
-from .connect import VectorDB
+from .connect import VectorDB, bump_kedb_version, kedb_version
 
-__all__ = ["VectorDB"]
\ No newline at end of file
+__all__ = ["VectorDB", "bump_kedb_version", "kedb_version"]
\ No newline at end of file
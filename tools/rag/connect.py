@@ -7,6 +7,7 @@ from loguru import logger
 from dotenv import load_dotenv
 import os
 import sys
+import time
 
 load_dotenv()
 
@@ -32,10 +33,34 @@ logger.add(
 MILVUS_HOST = os.getenv("MILVUS_HOST", "localhost")
 MILVUS_PORT = os.getenv("MILVUS_PORT", 19530)
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "kedb_collection")
+# Rewritten on every ingestion so caches of KEDB answers know to drop them
+KEDB_VERSION_PATH = os.getenv(
+    "KEDB_VERSION_PATH",
+    os.path.join(os.path.dirname(__file__), "../..", "data", "kedb.version"),
+)
+
+
+def kedb_version() -> Optional[str]:
+    """Version stamp of the last KEDB ingestion, None if it never ran"""
+    try:
+        with open(KEDB_VERSION_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def bump_kedb_version() -> str:
+    version = str(time.time_ns())
+    os.makedirs(os.path.dirname(KEDB_VERSION_PATH), exist_ok=True)
+    tmp_path = f"{KEDB_VERSION_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, KEDB_VERSION_PATH)
+    return version
 
 
 class VectorDB:
-    def __init__(self):
+    def __init__(self, http_client: Optional[Any] = None, http_async_client: Optional[Any] = None):
         self.host = MILVUS_HOST
         self.port = MILVUS_PORT
         self.default_collection_name = COLLECTION_NAME
@@ -45,10 +70,12 @@ class VectorDB:
             logger.error("OPENAI_API_KEY not found in environment variables")
             raise RuntimeError("OPENAI_API_KEY not found")
 
-        # Embeddings
+        # Embeddings; the API server passes its shared pooled HTTP clients
         self.embedding_model = OpenAIEmbeddings(
             model="text-embedding-3-small",
-            api_key=api_key
+            api_key=api_key,
+            http_client=http_client,
+            http_async_client=http_async_client,
         )
 
         self.vectorstore: Optional[Milvus] = None
@@ -100,6 +127,7 @@ class VectorDB:
             logger.success(
                 "Inserted {} records into '{}'", len(docs), self.default_collection_name
             )
+            logger.info("KEDB version is now {}", bump_kedb_version())
         except Exception as e:
             logger.exception("Failed to insert documents: {}", e)
 
@@ -1,13 +1,21 @@
 import os, sys
+import asyncio
 from loguru import logger
 from langchain.tools.retriever import create_retriever_tool
+from langchain_core.tools import BaseTool, ToolException, tool as create_tool
+from langchain_core.tools.retriever import RetrieverInput
+from langchain_core.runnables import RunnableConfig
 from .rag.connect import VectorDB
+from .http_client import http_client_kwargs
 from dotenv import load_dotenv
 
 load_dotenv()
 
+KEDB_TOOL_NAME = "query_kedb"
+KEDB_TOOL_DESCRIPTION = "Search in KEDB (Known Errors Database) and return information."
+
 def get_retriever_tool():
-    db = VectorDB()
+    db = VectorDB(**http_client_kwargs())
     collection_name = os.getenv("COLLECTION_NAME")
 
     try:
@@ -17,10 +25,43 @@ def get_retriever_tool():
 
         retriever_tool = create_retriever_tool(
             retriever,
-            "query_kedb",
-            "Search in KEDB (Known Errors Database) and return information.",
+            KEDB_TOOL_NAME,
+            KEDB_TOOL_DESCRIPTION,
         )
 
         return retriever_tool
     except Exception as e:
-        logger.error(f"Connection Error: {e}")
\ No newline at end of file
+        logger.error(f"Connection Error: {e}")
+
+def get_lazy_retriever_tool() -> BaseTool:
+    """
+    The KEDB tool, connecting to Milvus on its first call instead of at startup.
+
+    Concurrent first calls share one connection attempt. A failed attempt is
+    reported to the model as a tool error and retried on the next call.
+    """
+    retriever_tool = None
+    lock = asyncio.Lock()
+
+    async def connect() -> BaseTool:
+        nonlocal retriever_tool
+        async with lock:
+            if retriever_tool is None:
+                # Creating the embeddings client and connecting to Milvus block
+                tool = await asyncio.to_thread(get_retriever_tool)
+                if tool is None:
+                    raise ToolException("KEDB is unavailable, try again later")
+                logger.info("KEDB retriever connected on first use")
+                retriever_tool = tool
+        return retriever_tool
+
+    @create_tool(
+        KEDB_TOOL_NAME,
+        description=KEDB_TOOL_DESCRIPTION,
+        args_schema=RetrieverInput
+    )
+    async def call_retriever(config: RunnableConfig, **tool_input):
+        tool = retriever_tool or await connect()
+        return await tool.ainvoke(tool_input, config)
+
+    return call_retriever